@@ -1,10 +1,18 @@
-from flask import Blueprint, jsonify, request, current_app, render_template
+from flask import Blueprint, jsonify, request, render_template, Response, stream_with_context
 # Importações necessárias para JWT
 from flask_jwt_extended import jwt_required, get_jwt
 from functools import wraps
+from utils.indice_email import indice_email
+from utils.inicializacao import obter_db
+import base64
+import json
 
 admin_bp = Blueprint('admin', __name__)
 
+CAMPOS_LISTAGEM = ['nome', 'email', 'ativo', 'status']
+LIMITE_MAXIMO_PAGINA = 1000
+LIMITE_LOTE_FIRESTORE = 500  # Máximo de operações por batch no Firestore
+
 # ====================================================================
 # 🔹 DECORATOR DE VERIFICAÇÃO DE CARGO
 # ====================================================================
@@ -47,31 +55,123 @@ def admin_page():
 @jwt_required()
 @verify_admin_role()
 def listar_alunos():
-    db_client = current_app.config.get('DB')
+    """
+    Lista os alunos. Parâmetros opcionais:
+      - limite: tamanho da página (ativa a paginação; resposta {alunos, proximo})
+      - apos: token 'proximo' devolvido pela página anterior
+      - ativo: true/false, filtra pelo status
+      - prefixo: filtra pelo início do nome (ordenado por nome)
+      - formato=ndjson: envia um aluno por linha, à medida que chegam do Firestore
+    Sem 'limite' e sem 'formato', devolve o array completo (formato antigo do painel).
+    Obs.: combinar 'ativo' com 'prefixo' exige um índice composto (ativo, nome, __name__).
+    O filtro 'ativo' só enxerga alunos com o campo gravado: os cadastrados antes
+    dele precisam passar uma vez por POST /admin/alunos/preencher-ativo.
+    """
+    db_client = obter_db()
     
     if not db_client:
         return jsonify({"erro": "Serviço de banco de dados indisponível."}), 503
 
-    alunos = []
     try:
-        # Busca todos os documentos na coleção 'alunos'
-        docs = db_client.collection('alunos').stream()
-
-        for doc in docs:
-            aluno_data = doc.to_dict()
-            aluno = {
-                'id': doc.id,
-                'nome': aluno_data.get('nome', 'Nome Desconhecido'),
-                'email': aluno_data.get('email', 'Email Desconhecido'),
-                'ativo': aluno_data.get('ativo', False)
-            }
-            alunos.append(aluno)
+        limite = request.args.get('limite', type=int)
+        if limite is not None and not 1 <= limite <= LIMITE_MAXIMO_PAGINA:
+            raise ValueError(f"'limite' deve estar entre 1 e {LIMITE_MAXIMO_PAGINA}.")
+        query = _montar_consulta_alunos(db_client, limite)
+    except ValueError as e:
+        return jsonify({"erro": f"Parâmetros inválidos: {e}"}), 400
+
+    if request.args.get('formato') == 'ndjson':
+        def gerar_linhas():
+            ultimo, total = None, 0
+            try:
+                for doc in query.stream():
+                    ultimo, total = doc, total + 1
+                    yield json.dumps(_resumo_aluno(doc), ensure_ascii=False) + "\n"
+            except Exception as e:
+                print(f"Erro ao listar alunos: {e}")
+                yield json.dumps({"erro": f"Erro interno ao listar alunos: {e}"}, ensure_ascii=False) + "\n"
+                return
+            if limite is not None:
+                proximo = _token_da_pagina(ultimo) if total == limite else None
+                yield json.dumps({"proximo": proximo}) + "\n"
+
+        return Response(stream_with_context(gerar_linhas()), mimetype='application/x-ndjson')
 
-        return jsonify(alunos), 200
+    try:
+        # Busca os documentos na coleção 'alunos' (só os campos exibidos no painel)
+        alunos = [_resumo_aluno(doc) for doc in query.stream()]
     except Exception as e:
         print(f"Erro ao listar alunos: {e}")
         return jsonify({"erro": f"Erro interno ao listar alunos: {e}"}), 500
 
+    if limite is None:
+        return jsonify(alunos), 200
+
+    proximo = _token_da_pagina(alunos[-1]) if len(alunos) == limite else None
+    return jsonify({"alunos": alunos, "proximo": proximo}), 200
+
+
+def _ativo_do_aluno(aluno_data):
+    """
+    Situação do aluno. Sem o campo 'ativo' (cadastros antigos), vale o 'status'
+    gravado no cadastro, e o aluno conta como ativo. É o mesmo valor que
+    preencher_campo_ativo() grava, para a listagem e o filtro concordarem.
+    """
+    if 'ativo' in aluno_data:
+        return aluno_data['ativo']
+    status = aluno_data.get('status')
+    return status if isinstance(status, bool) else True
+
+
+def _resumo_aluno(doc):
+    aluno_data = doc.to_dict()
+    return {
+        'id': doc.id,
+        'nome': aluno_data.get('nome', 'Nome Desconhecido'),
+        'email': aluno_data.get('email', 'Email Desconhecido'),
+        'ativo': _ativo_do_aluno(aluno_data)
+    }
+
+
+def _token_da_pagina(ultimo):
+    """Cursor opaco com a posição do último aluno da página (nome + ID)."""
+    if ultimo is None:
+        return None
+    if not isinstance(ultimo, dict):
+        ultimo = _resumo_aluno(ultimo)
+    posicao = [ultimo['nome'], ultimo['id']] if request.args.get('prefixo') else [ultimo['id']]
+    return base64.urlsafe_b64encode(json.dumps(posicao).encode('utf-8')).decode('ascii')
+
+
+def _montar_consulta_alunos(db_client, limite):
+    query = db_client.collection('alunos').select(CAMPOS_LISTAGEM)
+
+    ativo = request.args.get('ativo')
+    if ativo is not None:
+        if ativo.lower() not in ('true', 'false'):
+            raise ValueError("'ativo' deve ser true ou false.")
+        query = query.where('ativo', '==', ativo.lower() == 'true')
+
+    prefixo = request.args.get('prefixo')
+    if prefixo:
+        # Intervalo [prefixo, prefixo + '\uf8ff') cobre todos os nomes que começam com o prefixo
+        query = query.where('nome', '>=', prefixo).where('nome', '<', prefixo + '\uf8ff').order_by('nome')
+    query = query.order_by('__name__')
+
+    apos = request.args.get('apos')
+    if apos:
+        try:
+            posicao = json.loads(base64.urlsafe_b64decode(apos.encode('ascii')))
+        except (ValueError, TypeError):
+            raise ValueError("token 'apos' inválido.")
+        if not isinstance(posicao, list) or len(posicao) != (2 if prefixo else 1):
+            raise ValueError("token 'apos' inválido.")
+        query = query.start_after(posicao)
+
+    if limite is not None:
+        query = query.limit(limite)
+    return query
+
 # ====================================================================
 # 🔹 ROTA 2: Ativar ou Desativar Aluno (PROTEGIDA)
 # ====================================================================
@@ -79,7 +179,7 @@ def listar_alunos():
 @jwt_required()
 @verify_admin_role()
 def alterar_status_aluno(aluno_id):
-    db_client = current_app.config.get('DB')
+    db_client = obter_db()
     
     if not db_client:
         return jsonify({"erro": "Serviço de banco de dados indisponível."}), 503
@@ -93,7 +193,8 @@ def alterar_status_aluno(aluno_id):
     aluno_ref = db_client.collection('alunos').document(aluno_id)
 
     try:
-        if not aluno_ref.get().exists:
+        existe = aluno_ref.get().exists
+        if not existe:
             return jsonify({"erro": "Aluno não encontrado."}), 404
 
         aluno_ref.update({'ativo': novo_status})
@@ -111,7 +212,7 @@ def alterar_status_aluno(aluno_id):
 @jwt_required()
 @verify_admin_role()
 def excluir_aluno(aluno_id):
-    db_client = current_app.config.get('DB')
+    db_client = obter_db()
     
     if not db_client:
         return jsonify({"erro": "Serviço de banco de dados indisponível."}), 503
@@ -119,10 +220,12 @@ def excluir_aluno(aluno_id):
     aluno_ref = db_client.collection('alunos').document(aluno_id)
 
     try:
-        if not aluno_ref.get().exists:
+        existe = aluno_ref.get().exists
+        if not existe:
             return jsonify({"erro": "Aluno não encontrado."}), 404
 
         aluno_ref.delete()
+        indice_email.invalidar_aluno(aluno_id)
 
         return jsonify({"mensagem": f"Aluno {aluno_id} excluído com sucesso."}), 200
     except Exception as e:
@@ -135,7 +238,7 @@ def excluir_aluno(aluno_id):
 @jwt_required()
 @verify_admin_role()
 def alterar_email_aluno(aluno_id):
-    db_client = current_app.config.get('DB')
+    db_client = obter_db()
     
     if not db_client:
         return jsonify({"erro": "Serviço de banco de dados indisponível."}), 503
@@ -155,11 +258,13 @@ def alterar_email_aluno(aluno_id):
 
     try:
         # 2. Verifica se o aluno existe
-        if not aluno_ref.get().exists:
+        existe = aluno_ref.get().exists
+        if not existe:
             return jsonify({"erro": "Aluno não encontrado."}), 404
 
         # 3. Atualiza o email no Firestore
         aluno_ref.update({'email': novo_email})
+        indice_email.invalidar_aluno(aluno_id)
 
         return jsonify({"mensagem": f"E-mail do aluno {aluno_id} alterado para {novo_email} com sucesso."}), 200
         
@@ -174,7 +279,7 @@ def alterar_email_aluno(aluno_id):
 @jwt_required()
 @verify_admin_role()
 def alterar_nome_aluno(aluno_id):
-    db_client = current_app.config.get('DB')
+    db_client = obter_db()
     
     if not db_client:
         return jsonify({"erro": "Serviço de banco de dados indisponível."}), 503
@@ -190,7 +295,8 @@ def alterar_nome_aluno(aluno_id):
 
     try:
         # 2. Verifica se o aluno existe
-        if not aluno_ref.get().exists:
+        existe = aluno_ref.get().exists
+        if not existe:
             return jsonify({"erro": "Aluno não encontrado."}), 404
 
         # 3. Atualiza o nome no Firestore
@@ -200,4 +306,166 @@ def alterar_nome_aluno(aluno_id):
         
     except Exception as e:
         print(f"ERRO CRÍTICO DB: {e}")
-        return jsonify({"erro": f"Erro ao atualizar nome do aluno: {e}"}), 500
\ No newline at end of file
+        return jsonify({"erro": f"Erro ao atualizar nome do aluno: {e}"}), 500
+
+# ====================================================================
+# 🆕 🔹 ROTA 6: Operações em Lote (PROTEGIDA)
+# ====================================================================
+def _validar_operacao(operacao):
+    """
+    Converte uma operação do lote em (aluno_id, alteracoes, erro).
+    'alteracoes' é o dicionário do update, ou None quando a ação é excluir.
+    """
+    if not isinstance(operacao, dict) or not operacao.get('id'):
+        return None, None, "O campo 'id' é obrigatório."
+
+    aluno_id = str(operacao['id'])
+    acao = operacao.get('acao')
+    valor = operacao.get('valor')
+
+    if acao == 'excluir':
+        return aluno_id, None, None
+    if acao == 'status':
+        if not isinstance(valor, bool):
+            return aluno_id, None, "O campo 'valor' (booleano) é obrigatório para 'status'."
+        return aluno_id, {'ativo': valor}, None
+    if acao == 'email':
+        if not isinstance(valor, str) or "@" not in valor or "." not in valor:
+            return aluno_id, None, "Formato de e-mail inválido."
+        return aluno_id, {'email': valor}, None
+    if acao == 'nome':
+        if not isinstance(valor, str) or not valor.strip():
+            return aluno_id, None, "O campo 'valor' (nome) é obrigatório e não pode ser vazio."
+        return aluno_id, {'nome': valor}, None
+    return aluno_id, None, "Ação inválida. Use: status, excluir, email ou nome."
+
+
+def _registrar_no_batch(batch, aluno_ref, alteracoes, so_se_existir):
+    if alteracoes is None:
+        batch.delete(aluno_ref, option=so_se_existir)
+    else:
+        batch.update(aluno_ref, alteracoes)
+
+
+def _executar_operacao(aluno_ref, alteracoes, so_se_existir):
+    if alteracoes is None:
+        aluno_ref.delete(option=so_se_existir)
+    else:
+        aluno_ref.update(alteracoes)
+
+
+@admin_bp.route('/alunos/lote', methods=['POST'])
+@jwt_required()
+@verify_admin_role()
+def operacoes_em_lote():
+    """
+    Aplica várias operações de uma vez. Corpo:
+      {"operacoes": [{"id": "12", "acao": "status|excluir|email|nome", "valor": ...}, ...]}
+    As operações válidas são gravadas em batched writes de até 500 itens, sem
+    a leitura prévia de existência. Se um batch falhar (ex.: aluno inexistente),
+    as operações dele são refeitas uma a uma para apontar qual item falhou.
+    """
+    db_client = obter_db()
+
+    if not db_client:
+        return jsonify({"erro": "Serviço de banco de dados indisponível."}), 503
+
+    dados = request.json or {}
+    operacoes = dados.get('operacoes')
+    if not isinstance(operacoes, list) or not operacoes:
+        return jsonify({"erro": "O campo 'operacoes' (lista não vazia) é obrigatório."}), 400
+
+    resultados = [None] * len(operacoes)
+    falha_no_banco = False
+    validas = []
+    for indice, operacao in enumerate(operacoes):
+        aluno_id, alteracoes, erro = _validar_operacao(operacao)
+        if erro:
+            resultados[indice] = {"indice": indice, "id": aluno_id, "sucesso": False, "erro": erro}
+        else:
+            validas.append((indice, aluno_id, alteracoes))
+
+    from google.api_core.exceptions import NotFound
+
+    alunos_ref = db_client.collection('alunos')
+    # Pré-condição do Firestore: a exclusão falha se o aluno não existir (como o update)
+    so_se_existir = db_client.write_option(exists=True)
+    for inicio in range(0, len(validas), LIMITE_LOTE_FIRESTORE):
+        fatia = validas[inicio:inicio + LIMITE_LOTE_FIRESTORE]
+        batch = db_client.batch()
+        for _, aluno_id, alteracoes in fatia:
+            _registrar_no_batch(batch, alunos_ref.document(aluno_id), alteracoes, so_se_existir)
+
+        try:
+            batch.commit()
+            concluidas = [(indice, aluno_id, alteracoes, None) for indice, aluno_id, alteracoes in fatia]
+        except Exception as e:
+            # O batch é atômico: refaz item a item para saber qual operação falhou
+            print(f"⚠️ Batch de operações falhou ({e}). Refazendo operações individualmente...")
+            concluidas = []
+            for indice, aluno_id, alteracoes in fatia:
+                try:
+                    _executar_operacao(alunos_ref.document(aluno_id), alteracoes, so_se_existir)
+                    concluidas.append((indice, aluno_id, alteracoes, None))
+                except NotFound:
+                    concluidas.append((indice, aluno_id, alteracoes, "Aluno não encontrado."))
+                except Exception as erro_item:
+                    print(f"ERRO CRÍTICO DB: {erro_item}")
+                    falha_no_banco = True
+                    concluidas.append((indice, aluno_id, alteracoes, f"Erro ao aplicar operação: {erro_item}"))
+
+        for indice, aluno_id, alteracoes, erro in concluidas:
+            if erro:
+                resultados[indice] = {"indice": indice, "id": aluno_id, "sucesso": False, "erro": erro}
+                continue
+            if alteracoes is None or 'email' in alteracoes:
+                indice_email.invalidar_aluno(aluno_id)
+            resultados[indice] = {"indice": indice, "id": aluno_id, "sucesso": True}
+
+    sucessos = sum(1 for resultado in resultados if resultado['sucesso'])
+    if sucessos == len(operacoes):
+        status = 200
+    elif sucessos:
+        status = 207
+    else:
+        # Nada foi aplicado: 500 se o banco falhou, 422 se todas as operações eram inválidas
+        status = 500 if falha_no_banco else 422
+    return jsonify({"sucessos": sucessos, "falhas": len(operacoes) - sucessos, "resultados": resultados}), status
+
+# ====================================================================
+# 🔹 ROTA 7: Preencher o campo 'ativo' dos alunos antigos (PROTEGIDA)
+# ====================================================================
+@admin_bp.route('/alunos/preencher-ativo', methods=['POST'])
+@jwt_required()
+@verify_admin_role()
+def preencher_campo_ativo():
+    """
+    Grava 'ativo' nos alunos cadastrados antes de o campo existir (o Firestore
+    não filtra por campo ausente, então ?ativo= não os encontraria). Pode ser
+    chamada de novo sem efeito: só os documentos sem o campo são alterados.
+    """
+    db_client = obter_db()
+
+    if not db_client:
+        return jsonify({"erro": "Serviço de banco de dados indisponível."}), 503
+
+    atualizados = 0
+    try:
+        pendentes = [
+            (doc.reference, _ativo_do_aluno(doc.to_dict()))
+            for doc in db_client.collection('alunos').select(['ativo', 'status']).stream()
+            if 'ativo' not in doc.to_dict()
+        ]
+        for inicio in range(0, len(pendentes), LIMITE_LOTE_FIRESTORE):
+            batch = db_client.batch()
+            fatia = pendentes[inicio:inicio + LIMITE_LOTE_FIRESTORE]
+            for aluno_ref, ativo in fatia:
+                batch.update(aluno_ref, {'ativo': ativo})
+            batch.commit()
+            atualizados += len(fatia)
+    except Exception as e:
+        print(f"ERRO CRÍTICO DB: {e}")
+        return jsonify({"erro": f"Erro ao preencher o campo 'ativo': {e}", "atualizados": atualizados}), 500
+
+    print(f"✅ Campo 'ativo' preenchido em {atualizados} alunos.")
+    return jsonify({"mensagem": f"Campo 'ativo' preenchido em {atualizados} alunos.", "atualizados": atualizados}), 200
@@ -1,58 +1,192 @@
 # api/andromeda.py
 
 from flask import Blueprint, request, jsonify
-import json
 from utils.groq_firebase import chamar_groq
+from utils.extrator_json import extrair_json
+from utils.controle_admissao import STATUS_RECUSADA
+from utils.identidade import aluno_atual
+from utils.pool_textos import PoolTextos, id_do_texto
+from utils.correcao_local import avaliar_correcao
+from utils.metricas import registrar_interpretacao
+from utils.inicializacao import obter_db
 
 andromeda_bp = Blueprint('andromeda', __name__)
 
+PROMPT_TEXTO_COM_ERROS = (
+    "Você é um professor de Língua Portuguesa criando um exercício com erros gramaticais. "
+    "Crie um parágrafo curto (3 a 5 linhas), informal, com 4 a 6 erros. "
+    "Os erros podem envolver figuras de linguagem, vozes, paralinguagem, variação linguística, morfologia, tempos verbais, sintaxe, conjunções e regência. "
+    "Não corrija nem explique os erros. Apenas gere o texto com os desvios inseridos."
+    "O texto deve ser informal, como se fosse uma conversa entre amigos. "
+    "Não use palavras difíceis ou jargões técnicos. "
+    "Responda somente com um JSON neste formato, sem mensagem ao usuário: "
+    '{"texto": "o parágrafo com os erros", '
+    '"erros": [{"trecho": "o trecho errado, copiado exatamente como está no texto", '
+    '"correcao": "o mesmo trecho corrigido", "tipo": "regência"}]}'
+)
+MENSAGEM_SISTEMA_TEXTO = "Você é um professor gerando textos com erros para correção de alunos."
+MENSAGEM_SISTEMA_CORRECAO = "Você é um professor corrigindo redações de alunos. Avalie a correção do aluno. Seja didático. Use linguagem clara e adequada ao ensino médio."
+MAX_TRECHOS_FEEDBACK = 20  # limite de trechos enviados à IA por correção
+
+def interpretar_texto_gerado(resposta):
+    """
+    Converte a resposta da IA em {'texto', 'erros'}. Os erros cujo trecho não
+    aparece no texto (ou que não vêm como texto) são descartados; se a IA
+    ignorar o formato JSON, o texto é aproveitado sem gabarito.
+    """
+    try:
+        dados = extrair_json(resposta, tipo=dict)
+    except ValueError:
+        registrar_interpretacao('texto_andromeda', False)
+        return {"texto": resposta.strip(), "erros": []}
+    registrar_interpretacao('texto_andromeda', True)
+
+    texto = str(dados.get('texto') or '').strip()
+    if not texto:
+        return None
+    erros = [
+        {"trecho": erro['trecho'], "correcao": erro['correcao'], "tipo": erro.get('tipo', '')}
+        for erro in (dados.get('erros') if isinstance(dados.get('erros'), list) else [])
+        if isinstance(erro, dict) and isinstance(erro.get('trecho'), str) and isinstance(erro.get('correcao'), str)
+        and erro['trecho'].strip() and erro['correcao'].strip() and erro['trecho'].lower() in texto.lower()
+    ]
+    return {"texto": texto, "erros": erros}
+
+def gerar_texto_para_pool():
+    """Gera um texto com erros para o pool (roda na thread de reposição)."""
+    resposta, status = chamar_groq(PROMPT_TEXTO_COM_ERROS, MENSAGEM_SISTEMA_TEXTO, usar_cache=False, prioridade='lote')
+    if not resposta or status != 200:
+        return None
+    return interpretar_texto_gerado(resposta)
+
+# Textos prontos (persistidos no Firestore), repostos em segundo plano
+pool_textos = PoolTextos(gerador=gerar_texto_para_pool)
+
 @andromeda_bp.route('/texto_usuario', methods=['GET'])
 def gerar_texto_com_erros():
-    prompt = (
-        "Você é um professor de Língua Portuguesa criando um exercício com erros gramaticais. "
-        "Crie um parágrafo curto (3 a 5 linhas), informal, com 4 a 6 erros. "
-        "Os erros podem envolver figuras de linguagem, vozes, paralinguagem, variação linguística, morfologia, tempos verbais, sintaxe, conjunções e regência. "
-        "Não corrija nem explique os erros. Apenas gere o texto com os desvios inseridos."
-        "O texto deve ser informal, como se fosse uma conversa entre amigos. "
-        "Não use palavras difíceis ou jargões técnicos. "
-        "Retorne somente o texto com erros, sem mensagem ao usuário no final"
+    db_client = obter_db()
+
+    # 1. Texto pronto do pool, sem repetir os últimos que o aluno viu
+    aluno = aluno_atual()
+    texto = pool_textos.retirar(db_client, aluno)
+    if texto:
+        return jsonify({"texto_com_erros": texto['texto'], "id_texto": texto['id']}), 200
+
+    # 2. Pool vazio: gera na hora (sem cache, cada aluno deve receber um texto novo)
+    resposta, status = chamar_groq(PROMPT_TEXTO_COM_ERROS, MENSAGEM_SISTEMA_TEXTO, usar_cache=False, prioridade='lote')
+    if status == STATUS_RECUSADA:
+        return jsonify({"erro": "Muitos pedidos à IA no momento. Tente novamente em instantes."}), status
+    texto = interpretar_texto_gerado(resposta) if resposta else None
+    if not texto:
+        return jsonify({"erro": "Erro ao gerar texto"}), status if status != 200 else 500
+
+    # O texto gerado na hora entra no pool se houver espaço; o gabarito é guardado de qualquer forma
+    id_texto = id_do_texto(texto['texto'])
+    pool_textos.admitir(texto)
+    pool_textos.marcar_visto(aluno, id_texto)
+    return jsonify({"texto_com_erros": texto['texto'], "id_texto": id_texto}), 200
+
+@andromeda_bp.route('/texto_usuario/pool', methods=['GET'])
+def estado_pool_textos():
+    return jsonify(pool_textos.estado()), 200
+
+SITUACOES = {
+    'corrigido': "corrigiu como esperado",
+    'nao_corrigido': "não alterou o trecho",
+    'alterado_diferente': "alterou de um jeito diferente do esperado",
+}
+
+def montar_prompt_correcao(resultado):
+    """Prompt só com os trechos que mudaram (e os erros esquecidos), não com os textos inteiros."""
+    linhas = []
+    for numero, erro in enumerate(resultado['avaliacao_erros'][:MAX_TRECHOS_FEEDBACK], start=1):
+        linhas.append(
+            f'{numero}. Erro: "{erro["trecho"]}" (correção esperada: "{erro["correcao_esperada"]}"). '
+            f'O aluno escreveu: "{erro["resposta_aluno"]}" — {SITUACOES[erro["situacao"]]}.'
+        )
+    extras = resultado['alteracoes_extras'] if resultado['avaliacao_erros'] else resultado['alteracoes']
+    for alteracao in extras[:MAX_TRECHOS_FEEDBACK]:
+        linhas.append(f'- Alteração: "{alteracao["original"]}" → "{alteracao["aluno"]}".')
+
+    return (
+        "Um aluno corrigiu um texto com erros gramaticais inseridos de propósito. "
+        "Estes são os trechos relevantes da correção dele:\n\n" + "\n".join(linhas) + "\n\n"
+        "Escreva um feedback curto e didático para o aluno sobre esses trechos. "
+        'Responda somente com um JSON: {"feedback": "...", '
+        '"alternativas_aceitas": [números dos erros alterados de um jeito diferente em que a forma do aluno também está correta], '
+        '"nota": nota de 0 a 10 (só se não houver erros numerados acima)}'
     )
-    resposta, status = chamar_groq(prompt, "Você é um professor gerando textos com erros para correção de alunos.")
-    if not resposta:
-        return jsonify({"erro": "Erro ao gerar texto"}), status
-    return jsonify({"texto_com_erros": resposta}), 200
+
+def feedback_local(resultado):
+    if resultado['nota'] is None:
+        return "Correção registrada. Não foi possível gerar o comentário detalhado agora."
+    return (f"Você corrigiu {resultado['erros_corrigidos']} de {resultado['total_erros']} erros. "
+            "Revise os trechos marcados como não corrigidos.")
+
+def aplicar_avaliacao_ia(resultado, avaliacao_ia):
+    """Junta a avaliação da IA ao resultado local (alternativas aceitas e, sem gabarito, a nota)."""
+    for numero in avaliacao_ia.get('alternativas_aceitas') or []:
+        if isinstance(numero, int) and 1 <= numero <= len(resultado['avaliacao_erros']):
+            erro = resultado['avaliacao_erros'][numero - 1]
+            if erro['situacao'] == 'alterado_diferente':
+                erro['situacao'] = 'corrigido_alternativo'
+
+    if resultado['avaliacao_erros']:
+        corrigidos = sum(1 for erro in resultado['avaliacao_erros'] if erro['situacao'].startswith('corrigido'))
+        resultado['erros_corrigidos'] = corrigidos
+        resultado['nota'] = round(10 * corrigidos / resultado['total_erros'], 1)
+    elif isinstance(avaliacao_ia.get('nota'), (int, float)):
+        resultado['nota'] = max(0, min(10, avaliacao_ia['nota']))
 
 @andromeda_bp.route('/correcao', methods=['POST'])
 def analisar_correcao():
+    """
+    Corrige localmente, comparando o texto do aluno com o original palavra a
+    palavra e conferindo o gabarito gerado junto com o texto. A IA só é
+    chamada para o comentário qualitativo, e recebe apenas os trechos que
+    mudaram. Envios sem alteração ou com tudo corrigido nem chegam à IA.
+    O gabarito é buscado pelo 'id_texto' devolvido por /texto_usuario; sem
+    ele, pelo hash do 'original' (que precisa vir idêntico ao entregue).
+    """
     dados = request.json
     texto_original = dados.get("original", "")
     texto_usuario = dados.get("correcao", "")
+    id_texto = dados.get("id_texto")
     if not texto_original or not texto_usuario:
         return jsonify({"erro": "Dados incompletos"}), 400
+    if id_texto is not None and (not isinstance(id_texto, str) or not id_texto.strip()):
+        return jsonify({"erro": "O campo 'id_texto' deve ser o identificador devolvido por /texto_usuario."}), 400
 
-    prompt = f"""
-        "Você é um professor corrigindo texto de alunos. Avalie a correção do aluno. Seja didático. Use linguagem clara e adequada ao ensino médio.\\n\\n"
-        "Texto com erros:\\n\\n{texto_original}\\n\\n"
-        "Texto corrigido pelo aluno:\\n\\n{texto_usuario}\\n\\n"
-        # ... (Restante do prompt com a estrutura JSON, como no seu código original) ...
-    """
+    db_client = obter_db()
+    if id_texto:
+        gabarito = pool_textos.obter_gabarito(db_client, id_texto=id_texto)
+        if gabarito and gabarito.get('texto'):
+            # O texto guardado é a referência: espaços ou normalização alterados no cliente não importam
+            texto_original = gabarito['texto']
+    else:
+        gabarito = pool_textos.obter_gabarito(db_client, texto_original)
+    resultado = avaliar_correcao(texto_original, texto_usuario, (gabarito or {}).get('erros'))
 
-    resposta, status = chamar_groq(prompt, "Você é um professor corrigindo redações de alunos. Avalie a correção do aluno. Seja didático. Use linguagem clara e adequada ao ensino médio.")
+    # 1. Atalhos locais: nada alterado, ou todos os erros corrigidos sem mexer no resto
+    if resultado['inalterado']:
+        feedback = "Você não alterou o texto. Procure os erros e tente de novo!"
+        return jsonify(dict(resultado, feedback=feedback, origem_avaliacao='local')), 200
+    if resultado['total_erros'] and resultado['erros_corrigidos'] == resultado['total_erros'] and not resultado['alteracoes_extras']:
+        feedback = "Parabéns! Você encontrou e corrigiu todos os erros do texto."
+        return jsonify(dict(resultado, feedback=feedback, origem_avaliacao='local')), 200
 
+    # 2. Comentário da IA só sobre os trechos alterados
+    resposta, status = chamar_groq(montar_prompt_correcao(resultado), MENSAGEM_SISTEMA_CORRECAO)
     if not resposta:
-        return jsonify({"erro": "Erro ao avaliar correção"}), status
+        # IA indisponível (ou recusada): a correção local continua valendo
+        return jsonify(dict(resultado, feedback=feedback_local(resultado), origem_avaliacao='local')), 200
 
     try:
-        # Lógica para extrair JSON da resposta da IA (como no seu código original)
-        start_index = resposta.find('{')
-        end_index = resposta.rfind('}')
-        if start_index != -1 and end_index != -1 and start_index < end_index:
-            json_string = resposta[start_index : end_index + 1]
-            return jsonify(json.loads(json_string)), 200
-        else:
-            return jsonify({"erro": "Não foi possível extrair um JSON válido da resposta da IA", "resposta_bruta": resposta}), 500
-
-    except json.JSONDecodeError as e:
-        return jsonify({"erro": f"Erro ao decodificar JSON: {e}", "resposta_bruta": resposta}), 500
-    except Exception as e:
-        return jsonify({"erro": f"Erro inesperado: {e}", "resposta_bruta": resposta}), 500
\ No newline at end of file
+        # Extração tolerante (cercas ```json, texto extra, vírgulas sobrando)
+        avaliacao_ia = extrair_json(resposta, tipo=dict)
+        registrar_interpretacao('correcao_andromeda', True)
+    except ValueError:
+        registrar_interpretacao('correcao_andromeda', False)
+        avaliacao_ia = {"feedback": resposta}
+    aplicar_avaliacao_ia(resultado, avaliacao_ia)
+    return jsonify(dict(resultado, feedback=avaliacao_ia.get('feedback') or feedback_local(resultado), origem_avaliacao='ia')), 200
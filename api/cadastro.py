@@ -1,45 +1,21 @@
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required
+from api.admin import verify_admin_role
+from utils.alocador_ids import alocador_ids
+from utils.inicializacao import obter_db
 
 cadastro_bp = Blueprint('cadastro', __name__)
 
-@cadastro_bp.route('/cadastro', methods=['POST'])
-def cadastro():
-    # Acessa o cliente Firestore (DB) a partir da configuração do app
-    db = current_app.config.get('DB')
-    if not db:
-        return jsonify({"erro": "Conexão com o banco de dados indisponível"}), 500
-
-    dados = request.json
-
-    # 1. Validação de campos obrigatórios
-    campos_obrigatorios = ['nome', 'email', 'senha', 'data_nasc', 'ia_consentimento']
-    for campo in campos_obrigatorios:
-        if dados is None or campo not in dados:
-            return jsonify({"erro": f"Campo obrigatório faltando: {campo}"}), 400
-        
-    # 2. Lógica de Contador e Geração de ID (USAR TRANSAÇÃO em produção!)
-    try:
-        contador_ref = db.collection('controle_id').document('contador')
-        
-        contador_doc = contador_ref.get().to_dict()
-        if not contador_doc or contador_doc.get('id') is None:
-            return jsonify({"erro": "Documento de controle de ID inválido."}), 500
-            
-        ultimo_id = contador_doc.get('id')
-        novo_id = int(ultimo_id) + 1
-        
-        contador_ref.update({'id': novo_id})
-        
-    except Exception as e:
-        print(f"Erro ao acessar ou atualizar o contador de ID: {e}")
-        return jsonify({"erro": "Erro interno ao gerar o ID do aluno."}), 500
+CAMPOS_OBRIGATORIOS = ['nome', 'email', 'senha', 'data_nasc', 'ia_consentimento']
+LIMITE_LOTE_FIRESTORE = 500  # Máximo de operações por batch no Firestore
 
 
-    # 3. Preparação dos dados padrão do novo aluno
-    dados_padrao = {
+def montar_dados_aluno(novo_id, dados):
+    """Monta o documento padrão de um novo aluno."""
+    return {
         "id": novo_id,
         "email": dados['email'],
-        "senha": dados['senha'], 
+        "senha": dados['senha'],
         "nome": dados['nome'],
         "cargo":'usuario',
         "datanasc": dados['data_nasc'],
@@ -47,6 +23,7 @@ def cadastro():
         "correct_answers": 1,
         "total_questions_answered": 1,
         "status": True,
+        "ativo": True,
         "processo": {
             "via_lactea": {
                 "estrelas_por_fase": {},
@@ -62,10 +39,111 @@ def cadastro():
         ]
     }
 
+
+def campo_faltando(dados):
+    """Retorna o primeiro campo obrigatório ausente (ou None)."""
+    for campo in CAMPOS_OBRIGATORIOS:
+        if not isinstance(dados, dict) or campo not in dados:
+            return campo
+    return None
+
+
+@cadastro_bp.route('/cadastro', methods=['POST'])
+def cadastro():
+    # Acessa o cliente Firestore (DB) a partir da configuração do app
+    db = obter_db()
+    if not db:
+        return jsonify({"erro": "Conexão com o banco de dados indisponível"}), 500
+
+    dados = request.json
+
+    # 1. Validação de campos obrigatórios
+    campo = campo_faltando(dados)
+    if campo:
+        return jsonify({"erro": f"Campo obrigatório faltando: {campo}"}), 400
+
+    # 2. Geração de ID (bloco reservado por transação em utils.alocador_ids)
+    try:
+        novo_id = alocador_ids.proximo_id(db)
+    except ValueError as e:
+        return jsonify({"erro": str(e)}), 500
+    except Exception as e:
+        print(f"Erro ao acessar ou atualizar o contador de ID: {e}")
+        return jsonify({"erro": "Erro interno ao gerar o ID do aluno."}), 500
+
+
+    # 3. Preparação dos dados padrão do novo aluno
+    dados_padrao = montar_dados_aluno(novo_id, dados)
+
     # 4. Salvar no Firestore
     try:
         db.collection('alunos').document(str(novo_id)).set(dados_padrao)
         return jsonify({'mensagem':'Sucesso!! Aluno cadastrado!'}), 201
     except Exception as e:
         print(f"Erro ao salvar aluno no Firestore: {e}")
-        return jsonify({"erro": "Erro ao salvar dados do aluno."}), 500
\ No newline at end of file
+        return jsonify({"erro": "Erro ao salvar dados do aluno."}), 500
+
+
+# ====================================================================
+# 🔹 ROTA: Cadastro em lote (matrícula de uma escola inteira)
+# ====================================================================
+@cadastro_bp.route('/cadastro/lote', methods=['POST'])
+@jwt_required()
+@verify_admin_role()
+def cadastro_em_lote():
+    db = obter_db()
+    if not db:
+        return jsonify({"erro": "Conexão com o banco de dados indisponível"}), 500
+
+    dados = request.json or {}
+    alunos = dados.get('alunos')
+    if not isinstance(alunos, list) or not alunos:
+        return jsonify({"erro": "O campo 'alunos' (lista não vazia) é obrigatório."}), 400
+
+    # 1. Validação individual: alunos inválidos não impedem o restante do lote
+    resultados = []
+    validos = []
+    for indice, aluno in enumerate(alunos):
+        campo = campo_faltando(aluno)
+        if campo:
+            resultados.append({"indice": indice, "erro": f"Campo obrigatório faltando: {campo}"})
+        else:
+            validos.append((indice, aluno))
+
+    if not validos:
+        return jsonify({"cadastrados": 0, "resultados": resultados}), 400
+
+    # 2. Um único incremento do contador reserva os IDs de todo o lote
+    try:
+        novos_ids = alocador_ids.reservar(db, len(validos))
+    except Exception as e:
+        print(f"Erro ao reservar IDs para o cadastro em lote: {e}")
+        return jsonify({"erro": "Erro interno ao gerar os IDs dos alunos."}), 500
+
+    # 3. Gravação com batched writes (até 500 operações por commit)
+    cadastrados = 0
+    alunos_ref = db.collection('alunos')
+    pares = list(zip(novos_ids, validos))
+    for inicio in range(0, len(pares), LIMITE_LOTE_FIRESTORE):
+        fatia = pares[inicio:inicio + LIMITE_LOTE_FIRESTORE]
+        batch = db.batch()
+        for novo_id, (_, aluno) in fatia:
+            batch.set(alunos_ref.document(str(novo_id)), montar_dados_aluno(novo_id, aluno))
+
+        try:
+            batch.commit()
+            cadastrados += len(fatia)
+            resultados.extend({"indice": indice, "id": novo_id} for novo_id, (indice, _) in fatia)
+        except Exception as e:
+            print(f"Erro ao salvar lote de alunos no Firestore: {e}")
+            resultados.extend({"indice": indice, "erro": "Erro ao salvar dados do aluno."} for _, (indice, _) in fatia)
+
+    resultados.sort(key=lambda resultado: resultado['indice'])
+    if cadastrados == len(alunos):
+        status = 201
+    elif cadastrados:
+        status = 207
+    else:
+        # Os alunos válidos não foram gravados (falha no banco): nenhum cadastro aconteceu
+        status = 500
+    return jsonify({"cadastrados": cadastrados, "resultados": resultados}), status
@@ -1,25 +1,77 @@
-from flask import Blueprint, request, jsonify, current_app
-from config_data import trilhas_de_atividades, metas_pontuacao_via_lactea, metas_pontuacao_andromeda
+import hmac
+import os
+from flask import Blueprint, request, jsonify, Response
+from flask_jwt_extended import jwt_required
+from api.admin import verify_admin_role
+from utils.registro_jogos import obter_jogo
+from utils.http_cache import campos_solicitados, etag_do_documento, responder_com_etag
+from utils.disjuntor import disjuntor_groq
+from utils.controle_admissao import controle_admissao
+from utils.metricas import registro_metricas, TIPO_CONTEUDO_PROMETHEUS
+from utils.inicializacao import obter_db, transacional, tempos_inicializacao
 
 
 gerais_bp = Blueprint('gerais', __name__)
 
+
+def _valor_transformado(resultado):
+    """Extrai o valor final do primeiro Increment de um WriteResult (ou None)."""
+    valores = getattr(resultado, 'transform_results', None)
+    if not valores:
+        return None
+    valor = valores[0]
+    # `in` diz qual campo do Value (oneof) veio preenchido, inclusive quando o valor é 0
+    for campo in ('integer_value', 'double_value'):
+        if campo in valor:
+            return getattr(valor, campo)
+    return None
+
+
+@transacional
+def _atualizar_nivel(transaction, aluno_ref, jogo):
+    """Relê a pontuação dentro da transação e grava o nível correspondente."""
+    snapshot = aluno_ref.get(field_paths=[f'processo.{jogo.nome}'], transaction=transaction)
+    progresso = (snapshot.to_dict() or {}).get('processo', {}).get(jogo.nome, {})
+    pontuacao = progresso.get('pontuacao_total', 0)
+    nivel = jogo.nivel_para(pontuacao)
+    if progresso.get('nivel') != nivel:
+        transaction.update(aluno_ref, {f'processo.{jogo.nome}.nivel': nivel})
+    return pontuacao, nivel
+
 # 🔹 Rota para obter as fases de um jogo específico
 @gerais_bp.route('/fases/<jogo>', methods=['GET'])
 def get_fases_do_jogo(jogo):
-    if jogo not in trilhas_de_atividades:
+    registro = obter_jogo(jogo)
+    if not registro:
         return jsonify({"erro": "Jogo não encontrado."}), 404
-    return jsonify(trilhas_de_atividades[jogo]), 200
+    return jsonify(registro.fases), 200
 
 # 🔹 Rota para obter o progresso de um usuário em um jogo
 @gerais_bp.route('/progresso/<usuario_id>/<jogo>', methods=['GET'])
 def get_progresso_do_jogo(usuario_id, jogo):
-    db_client = current_app.config.get('DB')
+    db_client = obter_db()
     if not db_client:
         return jsonify({"erro": "Serviço de banco de dados indisponível."}), 503
 
+    registro = obter_jogo(jogo)
+
+    # ?campos=nivel,pontuacao_total,... limita a leitura (projeção no Firestore)
+    try:
+        campos = campos_solicitados()
+    except ValueError as e:
+        return jsonify({"erro": str(e)}), 400
+
+    # Lê apenas o mapa do jogo (ou os subcampos pedidos), não o documento inteiro
+    if campos:
+        subcampos = set(campos) - {'nome_planeta_atual'}
+        if 'nome_planeta_atual' in campos:
+            subcampos.add('nivel')
+        field_paths = [db_client.field_path('processo', jogo, campo) for campo in sorted(subcampos)]
+    else:
+        field_paths = [db_client.field_path('processo', jogo)]
+
     aluno_ref = db_client.collection('alunos').document(usuario_id)
-    aluno_doc = aluno_ref.get()
+    aluno_doc = aluno_ref.get(field_paths=field_paths)
 
     if not aluno_doc.exists:
         return jsonify({"erro": "Aluno não encontrado."}), 404
@@ -36,17 +88,19 @@ def get_progresso_do_jogo(usuario_id, jogo):
         
     # --- LÓGICA DE INICIALIZAÇÃO REMOVIDA ---
 
-    if jogo == 'andromeda':
-        progresso_do_jogo['nome_planeta_atual'] = metas_pontuacao_andromeda.get(progresso_do_jogo['nivel'], {}).get('nome', 'Sirius')
-    elif jogo == 'via_lactea':
-        progresso_do_jogo['nome_planeta_atual'] = metas_pontuacao_via_lactea.get(progresso_do_jogo['nivel'], {}).get('nome', 'Netuno')
+    if registro and (not campos or 'nome_planeta_atual' in campos):
+        progresso_do_jogo['nome_planeta_atual'] = registro.nome_planeta(progresso_do_jogo.get('nivel', 1))
+    if campos:
+        progresso_do_jogo = {campo: progresso_do_jogo[campo] for campo in campos if campo in progresso_do_jogo}
 
-    return jsonify(progresso_do_jogo), 200
+    # ETag pela data de alteração do documento: quem consulta o progresso
+    # periodicamente recebe 304 enquanto nada mudar
+    return responder_com_etag(progresso_do_jogo, etag_do_documento(aluno_doc, jogo, ','.join(campos or [])))
 
 # 🔹 Rota para pontuar uma atividade de um jogo
 @gerais_bp.route('/progresso/<usuario_id>/<jogo>/pontuar', methods=['POST'])
 def pontuar_atividade_do_jogo(usuario_id, jogo):
-    db_client = current_app.config.get('DB')
+    db_client = obter_db()
 
     if not db_client:
         return jsonify({"erro": "Serviço de banco de dados indisponível."}), 503
@@ -68,71 +122,55 @@ def pontuar_atividade_do_jogo(usuario_id, jogo):
     if not usuario_id or not jogo or not fase or estrelas is None or estrelas < 0 or estrelas > 3:
         return jsonify({"erro": "Dados inválidos: Verifique usuario_id, jogo, fase e estrelas (0-3)."}), 400
 
-    aluno_ref = db_client.collection('alunos').document(usuario_id)
-    aluno_doc = aluno_ref.get()
-
-    if not aluno_doc.exists:
-        return jsonify({"erro": "Aluno não encontrado."}), 404
+    registro = obter_jogo(jogo)
+    if not registro:
+        return jsonify({"erro": "Jogo não encontrado."}), 404
 
-    # ✅ CORREÇÃO 2: Busca o progresso aninhado em 'processo'
-    progresso_do_jogo = aluno_doc.to_dict().get('processo', {}).get(jogo)
-
-    if not progresso_do_jogo:
-        return jsonify({"erro": f"Progresso do jogo '{jogo}' não encontrado no campo 'processo'. Estrutura de dados ausente."}), 404
+    # O cliente já está conectado aqui, então estas importações não custam nada
+    from firebase_admin import firestore
+    from google.api_core.exceptions import NotFound
 
+    aluno_ref = db_client.collection('alunos').document(usuario_id)
     pontos_ganhos = estrelas * 100
-    nova_pontuacao = progresso_do_jogo.get('pontuacao_total', 0) + pontos_ganhos
 
-    metas = {}
-    if jogo == 'andromeda':
-        metas = metas_pontuacao_andromeda
-    elif jogo == 'via_lactea':
-        metas = metas_pontuacao_via_lactea
-
-    novo_nivel = progresso_do_jogo.get('nivel', 1) # Mantém o nível atual como padrão
-    niveis_ordenados = sorted(metas.keys())
-    
-    # Lógica para determinar o novo nível
-    for nivel_alvo in niveis_ordenados:
-        meta_requerida = metas[nivel_alvo]['meta']
-        
-        if nova_pontuacao >= meta_requerida:
-            novo_nivel = nivel_alvo 
-            
-            if nivel_alvo + 1 in metas:
-                 novo_nivel = nivel_alvo + 1
-            else:
-                 novo_nivel = nivel_alvo 
-        else:
-            break
-            
-    # O objeto progressos_do_jogo é totalmente reconstruído
-    update_data = {
-        'pontuacao_total': nova_pontuacao,
-        'nivel': novo_nivel,
-        'fase_atual': fase, 
-        # Atualiza ou adiciona as estrelas para a fase específica
-        'estrelas_por_fase': {
-            **progresso_do_jogo.get('estrelas_por_fase', {}), 
-            fase: estrelas
-        }
-    }
+    # Leitura projetada (só o nível) antes de escrever: confirma que o aluno
+    # existe e diz se o mapa do jogo já tem a estrutura (alunos antigos e o
+    # jogo andromeda, que o cadastro não cria, ainda não têm 'nivel').
+    nivel_path = db_client.field_path('processo', jogo, 'nivel')
+    aluno_doc = aluno_ref.get(field_paths=[nivel_path])
+    if not aluno_doc.exists:
+        return jsonify({"erro": "Aluno não encontrado."}), 404
+    tem_estrutura = 'nivel' in ((aluno_doc.to_dict() or {}).get('processo', {}).get(jogo) or {})
 
-    # ✅ CORREÇÃO 3: Atualiza o campo 'processo.<jogo>' usando a notação de ponto
-    # Para atualizar o mapa aninhado sem recriar o campo superior 'processo' ou 'aluno', 
-    # precisamos usar a notação de ponto para o caminho completo.
+    # ✅ Pontuação atômica: o próprio Firestore soma os pontos (Increment), então
+    # envios simultâneos não perdem pontos. Campos ausentes são criados pela
+    # própria escrita (Increment parte de 0), sem apagar o que já existe no mapa.
+    # field_path() protege nomes de fase com caracteres especiais.
     firebase_update = {
-        f'processo.{jogo}.{k}': v for k, v in update_data.items()
+        f'processo.{jogo}.pontuacao_total': firestore.Increment(pontos_ganhos),
+        f'processo.{jogo}.fase_atual': fase,
+        db_client.field_path('processo', jogo, 'estrelas_por_fase', fase): estrelas,
     }
-    
-    aluno_ref.update(firebase_update)
+
+    try:
+        resultado = aluno_ref.update(firebase_update)
+    except NotFound:
+        return jsonify({"erro": "Aluno não encontrado."}), 404
+
+    # O Firestore devolve o valor final do Increment junto com a escrita
+    nova_pontuacao = _valor_transformado(resultado)
+
+    # O nível é regravado numa transação que relê a pontuação (evita que um envio
+    # antigo rebaixe o nível) quando a pontuação cruza uma meta ou quando o mapa
+    # ainda não tinha 'nivel' (a transação completa a estrutura).
+    if (not tem_estrutura or nova_pontuacao is None
+            or registro.nivel_para(nova_pontuacao) != registro.nivel_para(nova_pontuacao - pontos_ganhos)):
+        nova_pontuacao, novo_nivel = _atualizar_nivel(db_client.transaction(), aluno_ref, registro)
+    else:
+        novo_nivel = registro.nivel_para(nova_pontuacao)
     
     # O restante do código prepara a resposta JSON
-    nome_planeta = ''
-    if jogo == 'andromeda':
-        nome_planeta = metas_pontuacao_andromeda.get(novo_nivel, {}).get('nome', 'Sirius')
-    elif jogo == 'via_lactea':
-        nome_planeta = metas_pontuacao_via_lactea.get(novo_nivel, {}).get('nome', 'Netuno')
+    nome_planeta = registro.nome_planeta(novo_nivel)
 
     return jsonify({
         "mensagem": f"Pontuação atualizada em {jogo}. {pontos_ganhos} pontos adicionados.",
@@ -140,4 +178,45 @@ def pontuar_atividade_do_jogo(usuario_id, jogo):
         "nivel_atual": novo_nivel,
         "estrelas_da_fase": estrelas,
         "nome_planeta": nome_planeta
-    }), 200
\ No newline at end of file
+    }), 200
+
+# 🔹 Rota para consultar a saúde da IA (circuito e controle de admissão)
+@gerais_bp.route('/status/ia', methods=['GET'])
+def get_status_ia():
+    circuito = disjuntor_groq.estado()
+    return jsonify({
+        "disponivel": circuito['estado'] != 'aberto',
+        "circuito": circuito,
+        "admissao": controle_admissao.estado()
+    }), 200
+
+# Valores instantâneos do controle de admissão e do circuito, lidos a cada coleta
+registro_metricas.medidor('groq_admissao_em_andamento', 'Chamadas à Groq em andamento.',
+                          lambda: controle_admissao.estado()['em_andamento'])
+registro_metricas.medidor('groq_admissao_na_fila', 'Chamadas à Groq esperando vaga.',
+                          lambda: controle_admissao.estado()['na_fila'])
+registro_metricas.medidor('groq_circuito_aberto', 'Circuito da IA: 0 fechado, 1 meio aberto, 2 aberto.',
+                          lambda: {'fechado': 0, 'meio_aberto': 1, 'aberto': 2}[disjuntor_groq.estado()['estado']])
+registro_metricas.medidor('inicializacao_segundos', 'Tempo de cada etapa da inicialização do processo.',
+                          lambda: {(etapa,): segundos for etapa, segundos in tempos_inicializacao.items()},
+                          rotulos=('etapa',))
+
+def _token_de_metricas_valido():
+    """True se a requisição traz 'Bearer <METRICAS_TOKEN>' (o JWT expira, o coletor precisa de um token fixo)."""
+    token = os.getenv('METRICAS_TOKEN')
+    if not token:
+        return False
+    return hmac.compare_digest(request.headers.get('Authorization', '').encode(), f"Bearer {token}".encode())
+
+@jwt_required()
+@verify_admin_role()
+def _exportar_metricas_para_admin():
+    return Response(registro_metricas.exportar(), content_type=TIPO_CONTEUDO_PROMETHEUS)
+
+# 🔹 Rota com as métricas do processo no formato do Prometheus (PROTEGIDA)
+# Aceita o token de METRICAS_TOKEN (para o Prometheus) ou o JWT de um administrador
+@gerais_bp.route('/metrics', methods=['GET'])
+def get_metricas():
+    if not _token_de_metricas_valido():
+        return _exportar_metricas_para_admin()
+    return Response(registro_metricas.exportar(), content_type=TIPO_CONTEUDO_PROMETHEUS)
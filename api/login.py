@@ -1,12 +1,14 @@
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token
+from utils.indice_email import indice_email
+from utils.inicializacao import obter_db
 
 login_bp = Blueprint('login', __name__)
 
 @login_bp.route('/login', methods=['POST'])
 def login():
     # Acessa o cliente Firestore (DB) a partir da configuração do app
-    db = current_app.config.get('DB')
+    db = obter_db()
     if not db:
         return jsonify({'msgerro': 'Erro! Conexão com o banco de dados indisponível'}), 500
         
@@ -17,18 +19,10 @@ def login():
     if not email or not senha:
         return jsonify({'msgerro': 'Erro! Todos os campos devem ser preenchidos'}), 400
     
-    aluno_ref = db.collection('alunos')
-    
-    # Consulta (query) no Firestore: busca aluno por email e senha
-    busca = aluno_ref.where('email', '==', email).where('senha', '==', senha)
-    
-    # Busca o documento completo para garantir que o campo 'cargo' seja recuperado
-    select = busca.stream() 
-
-    aluno_encontrado = None
-    for doc in select:
-        aluno_encontrado = doc.to_dict()
-        break 
+    # Busca o aluno por email e senha (leitura direta quando o ID já está no índice local);
+    # o documento completo já traz o campo 'cargo'
+    aluno_doc = indice_email.autenticar(db, email, senha)
+    aluno_encontrado = aluno_doc.to_dict() if aluno_doc is not None else None
 
     if aluno_encontrado is None:
         return jsonify({'msg': 'Senha ou email inválidos!!'}), 400
@@ -1,11 +1,17 @@
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify
 from flask_jwt_extended import (
     jwt_required, 
     get_jwt_identity # Usado para obter o email do usuário
 )
+from utils.indice_email import indice_email
+from utils.http_cache import campos_solicitados, etag_do_documento, responder_com_etag
+from utils.inicializacao import obter_db
 
 perfil_bp = Blueprint('perfil', __name__)
 
+# Campos que nunca são devolvidos pelo perfil
+CAMPOS_OCULTOS = {'senha'}
+
 @perfil_bp.route('/perfil', methods=["GET"])
 @jwt_required()
 def get_perfil_aluno():
@@ -13,33 +19,43 @@ def get_perfil_aluno():
     email_aluno = get_jwt_identity()
     
     # Acessa o cliente Firestore
-    db = current_app.config.get('DB')
+    db = obter_db()
     if not db:
         return jsonify({"erro": "Conexão com o banco de dados indisponível"}), 500
 
-    # 2. Busca o documento completo do aluno no Firestore
+    # ?campos=nome,email,... limita a leitura (projeção no Firestore) e a resposta
     try:
-        aluno_ref = db.collection('alunos')
-        
-        # Busca o documento do aluno pelo email
-        busca = aluno_ref.where('email', '==', email_aluno).limit(1)
-        
-        aluno_doc = next(busca.stream(), None)
+        campos = campos_solicitados()
+    except ValueError as e:
+        return jsonify({"erro": str(e)}), 400
+    if campos:
+        campos = [campo for campo in campos if campo not in CAMPOS_OCULTOS]
+        if not campos:
+            return jsonify({"erro": "Nenhum campo permitido foi solicitado."}), 400
+
+    # 2. Busca o documento do aluno no Firestore
+    try:
+        # Busca o documento do aluno pelo email (leitura direta via índice local)
+        aluno_doc = indice_email.buscar_aluno(db, email_aluno, campos)
 
         if aluno_doc is None:
              # Isso pode acontecer se o token for válido, mas o aluno tiver sido excluído
              return jsonify({'msgerro': 'Aluno não encontrado no banco de dados.'}), 404
 
-        # 3. Retorna todos os dados do aluno
+        # 3. Retorna os dados do aluno (sem a senha)
         aluno_data = aluno_doc.to_dict()
+        if campos:
+            aluno_data = {campo: aluno_data[campo] for campo in campos if campo in aluno_data}
+        for campo in CAMPOS_OCULTOS:
+            aluno_data.pop(campo, None)
         
         # O Firestore pode retornar objetos de Data/Hora que não são serializáveis para JSON.
         # Se for o caso, você pode precisar de uma função auxiliar para converter datas.
         # No entanto, como você armazena 'datanasc' como string, deve funcionar.
         
-
-        return jsonify(aluno_data), 200
+        # ETag pela data de alteração do documento: o cliente recebe 304 se nada mudou
+        return responder_com_etag(aluno_data, etag_do_documento(aluno_doc, ','.join(campos or [])))
     
     except Exception as e:
         print(f"Erro ao buscar perfil do aluno no Firestore: {e}")
-        return jsonify({"erro": "Erro interno ao carregar o perfil."}), 500
\ No newline at end of file
+        return jsonify({"erro": "Erro interno ao carregar o perfil."}), 500
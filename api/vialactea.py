@@ -1,34 +1,39 @@
 # api/vialactea.py
 
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 import json
-from config_data import temas_disponiveis, contexto_dificuldade
-from utils.groq_firebase import chamar_groq, obter_perguntas_reservas
+import asyncio
+import math
+import os
+from config_data import temas_disponiveis, contexto_dificuldade, subtemas_por_tema
+from utils.groq_firebase import chamar_groq, chamar_groq_stream, obter_perguntas_reservas
+from utils.groq_async import chamar_groq_async, rodar_no_loop
+from utils.pool_perguntas import PoolPerguntas
+from utils.extrator_json import ExtratorObjetosJSON, extrair_perguntas, validar_pergunta
+from utils.cache_reservas import cache_reservas
+from utils.coleta_reservas import coletor_reservas
+from utils.controle_admissao import STATUS_RECUSADA
+from utils.identidade import aluno_atual
+from utils.impressao_perguntas import IndiceSimilaridade, assinatura, filtrar_distintas, vistas_recentes
+from utils.metricas import perguntas_contingencia, registrar_interpretacao
+from utils.inicializacao import obter_db
 
 vialactea_bp = Blueprint('vialactea', __name__)
 
+NUM_PERGUNTAS = 12
+# Geração paralela: modo padrão ('unico' ou 'paralelo'), número de partes e prazo de cada parte
+PERGUNTAS_MODO_PADRAO = os.getenv("PERGUNTAS_MODO_PADRAO", "unico")
+PERGUNTAS_PARTES = int(os.getenv("PERGUNTAS_PARTES", "3"))
+PERGUNTAS_PRAZO_PARTE = float(os.getenv("PERGUNTAS_PRAZO_PARTE", "8"))
+MENSAGEM_SISTEMA_PERGUNTAS = "Você é um professor de português criando um quiz de múltipla escolha. Retorne as questões em JSON."
+
 # ----------------------------------------------------------------------
-# 🔹 Rota para gerar perguntas (COM LÓGICA DE CONTINGÊNCIA)
+# 🔹 Funções auxiliares de geração (usadas pela rota e pelo pool)
 # ----------------------------------------------------------------------
-@vialactea_bp.route('/perguntas', methods=['GET'])
-def gerar_perguntas():
-    db_client = current_app.config.get('DB')
-
-    nivel = request.args.get('nivel', 'medio').lower()
-    tema_solicitado = request.args.get('tema', '').lower()
-    num_perguntas = 12
-
-    if nivel not in ['facil', 'medio', 'dificil']:
-        return jsonify({"erro": "Nível inválido. Use: fácil, médio ou difícil."}), 400
-
-    if not tema_solicitado:
-        return jsonify({"erro": "O parâmetro 'tema' é obrigatório para gerar as perguntas."}), 400
-
-    tema_para_prompt = temas_disponiveis.get(tema_solicitado)
-    if not tema_para_prompt:
-        return jsonify({"erro": "Tema inválido. Temas disponíveis: " + ', '.join(temas_disponiveis.keys())}), 400
-
-    prompt = (
+def montar_prompt_perguntas(nivel, tema_solicitado, num_perguntas=NUM_PERGUNTAS, subtema=None):
+    tema_para_prompt = temas_disponiveis[tema_solicitado]
+    foco_subtema = f"Concentre todas as questões no subtópico: {subtema}. " if subtema else ""
+    return (
     # ===================================================================
     # 1. INSTRUÇÃO DE FORMATO (Movemos para cima para priorizar a saída)
     # ===================================================================
@@ -43,6 +48,7 @@ def gerar_perguntas():
     f"Crie questões de gramática contextualizadas, de múltipla escolha, com 4 alternativas (A, B, C, D), sendo apenas uma correta."
     f"A dificuldade deve ser de nível '{nivel}'. {contexto_dificuldade[nivel]} "
     f"As questões devem abordar conteúdos como: {tema_para_prompt} "
+    f"{foco_subtema}"
     
     # ===================================================================
     # 3. INSTRUÇÃO DE CAMPOS NECESSÁRIOS
@@ -74,87 +80,357 @@ def gerar_perguntas():
             "subtema": "Sujeito e Predicado",
             "explicacao": "O sujeito é a entidade que realiza a ação descrita no verbo. Nesse caso, o sujeito é 'O professor', pois é ele que está realizando a ação de distribuir os cadernos."
         }
-        // ... mais 11 objetos
-    ]
     """
+    f"    // ... mais {num_perguntas - 1} objetos\n"
+    "    ]\n"
+)
+
+def interpretar_perguntas(resposta_groq):
+    """Converte o texto da IA em lista de perguntas válidas (lança ValueError se nada for aproveitável)."""
+    try:
+        perguntas = extrair_perguntas(resposta_groq)
+    except ValueError:
+        registrar_interpretacao('perguntas', False)
+        raise
+    registrar_interpretacao('perguntas', True)
+    return perguntas
+
+def gerar_lote_perguntas(nivel, tema_solicitado, num_perguntas=NUM_PERGUNTAS):
+    """Gera um lote de perguntas pela IA. Retorna lista vazia em caso de falha."""
+    resposta_groq, status = chamar_groq(montar_prompt_perguntas(nivel, tema_solicitado, num_perguntas), MENSAGEM_SISTEMA_PERGUNTAS, usar_cache=False, prioridade='lote')
+    if not resposta_groq or status != 200:
+        return []
+    try:
+        return interpretar_perguntas(resposta_groq)
+    except (json.JSONDecodeError, ValueError) as e:
+        print(f"🚨 Erro ao processar JSON da IA para o pool ({nivel}/{tema_solicitado}): {e}")
+        return []
+
+async def gerar_perguntas_em_paralelo(nivel, tema_solicitado, num_perguntas=NUM_PERGUNTAS,
+                                      num_partes=PERGUNTAS_PARTES, prazo_parte=PERGUNTAS_PRAZO_PARTE):
+    """
+    Divide a geração em `num_partes` chamadas simultâneas menores, cada uma
+    focada em um subtópico diferente do tema. Junta as questões sem repetir
+    (nem quase repetir) e retorna assim que atingir `num_perguntas`. As partes que não terminarem
+    em `prazo_parte` segundos são abandonadas (a rota completa com reservas).
+    """
+    por_parte = math.ceil(num_perguntas / num_partes)
+    subtemas = subtemas_por_tema.get(tema_solicitado) or [None]
+
+    async def gerar_parte(indice):
+        prompt = montar_prompt_perguntas(nivel, tema_solicitado, por_parte, subtema=subtemas[indice % len(subtemas)])
+        resposta, status = await chamar_groq_async(prompt, MENSAGEM_SISTEMA_PERGUNTAS, prazo=prazo_parte, usar_cache=False, prioridade='lote')
+        if not resposta or status != 200:
+            return []
+        try:
+            return interpretar_perguntas(resposta)
+        except ValueError as e:
+            print(f"🚨 Parte {indice + 1} da geração paralela veio inválida: {e}")
+            return []
+
+    tarefas = [asyncio.ensure_future(gerar_parte(i)) for i in range(num_partes)]
+    perguntas, indice = [], IndiceSimilaridade()
+    try:
+        for proxima in asyncio.as_completed(tarefas, timeout=prazo_parte):
+            for pergunta in await proxima:
+                if indice.adicionar_se_inedita(assinatura(pergunta)):
+                    perguntas.append(pergunta)
+            if len(perguntas) >= num_perguntas:
+                break
+    except asyncio.TimeoutError:
+        print(f"⚠️ Geração paralela: prazo de {prazo_parte}s esgotado com {len(perguntas)}/{num_perguntas} perguntas.")
+    finally:
+        # Cancela as partes que ainda estão rodando (e as chamadas à Groq delas)
+        for tarefa in tarefas:
+            tarefa.cancel()
+
+    perguntas = perguntas[:num_perguntas]
+    for i, pergunta in enumerate(perguntas):
+        pergunta['id'] = i + 1
+    return perguntas
+
+def _completar_com_reservas(db_client, nivel, tema_solicitado, perguntas, num_perguntas, evitar=None,
+                            motivo='incompleta'):
+    """
+    Remove as quase-repetidas, completa a lista com perguntas de reserva
+    (sem repetir as que já estão nela nem as de `evitar`) e renumera.
+    `motivo` identifica a contingência na métrica perguntas_contingencia_total.
+    """
+    perguntas = filtrar_distintas(perguntas)
+    faltantes = num_perguntas - len(perguntas)
+    if faltantes > 0:
+        perguntas_contingencia.incrementar(motivo=motivo)
+        # Pede algumas a mais, pois as parecidas com as geradas são descartadas
+        reservas = obter_perguntas_reservas(db_client, nivel, tema_solicitado, faltantes * 2, evitar)
+        perguntas = perguntas + filtrar_distintas(reservas, existentes=perguntas)[:faltantes]
+    perguntas = perguntas[:num_perguntas]
+    for i, pergunta in enumerate(perguntas):
+        pergunta['id'] = i + 1
+    return perguntas
+
+# Pool de perguntas pré-geradas, reposto em segundo plano por (nivel, tema)
+pool_perguntas = PoolPerguntas(
+    gerador=gerar_lote_perguntas,
+    chaves=[(nivel, tema) for nivel in contexto_dificuldade for tema in temas_disponiveis]
 )
 
+def _entregar_perguntas(aluno, perguntas):
+    """Registra as perguntas como vistas pelo aluno e monta a resposta."""
+    vistas_recentes.registrar(aluno, perguntas)
+    return jsonify(perguntas), 200
+
+def _ler_parametros_perguntas():
+    """Valida ?nivel e ?tema. Retorna (nivel, tema, None) ou (None, None, resposta_de_erro)."""
+    nivel = request.args.get('nivel', 'medio').lower()
+    tema_solicitado = request.args.get('tema', '').lower()
+
+    if nivel not in ['facil', 'medio', 'dificil']:
+        return None, None, (jsonify({"erro": "Nível inválido. Use: fácil, médio ou difícil."}), 400)
+
+    if not tema_solicitado:
+        return None, None, (jsonify({"erro": "O parâmetro 'tema' é obrigatório para gerar as perguntas."}), 400)
+
+    if tema_solicitado not in temas_disponiveis:
+        return None, None, (jsonify({"erro": "Tema inválido. Temas disponíveis: " + ', '.join(temas_disponiveis.keys())}), 400)
+
+    return nivel, tema_solicitado, None
+
+# ----------------------------------------------------------------------
+# 🔹 Rota para gerar perguntas (COM LÓGICA DE CONTINGÊNCIA)
+# ----------------------------------------------------------------------
+@vialactea_bp.route('/perguntas', methods=['GET'])
+def gerar_perguntas():
+    db_client = obter_db()
+
+    nivel, tema_solicitado, erro = _ler_parametros_perguntas()
+    if erro:
+        return erro
+    num_perguntas = NUM_PERGUNTAS
+
+    # Questões vistas recentemente pelo aluno (se autenticado) não são repetidas
+    aluno = aluno_atual()
+    evitar = vistas_recentes.obter(aluno)
+
+    # 0. Perguntas já prontas no pool (resposta imediata)
+    perguntas_pool = pool_perguntas.retirar(nivel, tema_solicitado, num_perguntas, evitar)
+    if perguntas_pool:
+        coletor_reservas.coletar(db_client, nivel, tema_solicitado, perguntas_pool)
+        return _entregar_perguntas(aluno, perguntas_pool)
+
+    # 0.1 Modo paralelo (?modo=paralelo): várias chamadas menores ao mesmo tempo
+    modo = request.args.get('modo', PERGUNTAS_MODO_PADRAO).lower()
+    if modo == 'paralelo':
+        # As partes rodam juntas no loop dedicado; a view só espera o resultado
+        perguntas = rodar_no_loop(gerar_perguntas_em_paralelo(nivel, tema_solicitado, num_perguntas))
+        coletor_reservas.coletar(db_client, nivel, tema_solicitado, perguntas)
+        perguntas = _completar_com_reservas(db_client, nivel, tema_solicitado, perguntas, num_perguntas, evitar,
+                                            motivo='paralelo_incompleta')
+        if perguntas:
+            return _entregar_perguntas(aluno, perguntas)
+        return jsonify({"erro": "Erro na chamada da Groq API e o banco de perguntas de reserva está indisponível ou vazio para o tema/nível solicitado."}), 503
+
+    prompt = montar_prompt_perguntas(nivel, tema_solicitado, num_perguntas)
+
     # 1. Tenta chamar a IA (Groq)
-    resposta_groq, status = chamar_groq(prompt, "Você é um professor de português criando um quiz de múltipla escolha. Retorne as questões em JSON.")
+    # Sem cache: cada quiz deve trazer perguntas novas
+    resposta_groq, status = chamar_groq(prompt, MENSAGEM_SISTEMA_PERGUNTAS, usar_cache=False, prioridade='lote')
 
     # 2. Lógica de Contingência (Falha na API)
     if not resposta_groq or status != 200:
         print(f"🚨 Falha na Groq API (Status: {status}). Ativando plano de contingência do Firebase...")
 
-        perguntas_reservas = obter_perguntas_reservas(db_client,nivel, tema_solicitado, num_perguntas)
+        motivo = 'recusada' if status == STATUS_RECUSADA else 'falha_ia'
+        perguntas_reservas = _completar_com_reservas(db_client, nivel, tema_solicitado, [], num_perguntas, evitar, motivo)
 
         if perguntas_reservas:
-            return jsonify(perguntas_reservas), 200
+            return _entregar_perguntas(aluno, perguntas_reservas)
+        elif status == STATUS_RECUSADA:
+            return jsonify({"erro": "Muitos pedidos à IA no momento e o banco de perguntas de reserva está vazio para o tema/nível solicitado. Tente novamente em instantes."}), STATUS_RECUSADA
         else:
             return jsonify({"erro": "Erro na chamada da Groq API e o banco de perguntas de reserva está indisponível ou vazio para o tema/nível solicitado."}), 503 
 
     # 3. Processamento normal da resposta da IA
     try:
-        # Lógica de limpeza e validação de JSON (como no seu código original)
-        resposta_limpa = resposta_groq.strip().lstrip('`json\n').lstrip('`python\n').rstrip('`')
-        perguntas = json.loads(resposta_limpa)
-
-        if not isinstance(perguntas, list):
-            raise ValueError(f"A resposta da IA não é uma lista.")
-        # ... (Restante da validação e atribuição de ID) ...
+        perguntas = interpretar_perguntas(resposta_groq)
+        # Write-behind: as perguntas boas também alimentam o banco de reservas
+        coletor_reservas.coletar(db_client, nivel, tema_solicitado, perguntas)
 
-        for i, pergunta in enumerate(perguntas):
-            pergunta['id'] = i + 1 
-
-        return jsonify(perguntas), 200
+        # Resposta parcialmente aproveitada: completa com reservas em vez de gerar de novo
+        return _entregar_perguntas(aluno, _completar_com_reservas(db_client, nivel, tema_solicitado, perguntas, num_perguntas, evitar))
 
     except (json.JSONDecodeError, ValueError) as e:
         print(f"🚨 Erro ao processar JSON da IA: {e}. Tentando contingência do Firebase...")
 
         # 4. Segundo ponto de contingência (JSON inválido)
-        perguntas_reservas = obter_perguntas_reservas(db_client,nivel, tema_solicitado, num_perguntas)
+        perguntas_reservas = _completar_com_reservas(db_client, nivel, tema_solicitado, [], num_perguntas, evitar, 'json_invalido')
 
         if perguntas_reservas:
-            return jsonify(perguntas_reservas), 200
+            return _entregar_perguntas(aluno, perguntas_reservas)
         else:
             return jsonify({"erro": f"Erro ao processar a resposta da IA: {e} e o banco de perguntas de reserva está indisponível ou vazio.", "resposta_bruta": resposta_groq}), 500
 
+# ----------------------------------------------------------------------
+# 🔹 Rota para gerar perguntas em streaming (Server-Sent Events)
+# ----------------------------------------------------------------------
+def _evento_sse(evento, dados):
+    return f"event: {evento}\ndata: {json.dumps(dados, ensure_ascii=False)}\n\n"
+
+@vialactea_bp.route('/perguntas/stream', methods=['GET'])
+def gerar_perguntas_stream():
+    """
+    Mesmo conteúdo de /perguntas, mas cada questão é enviada como um evento
+    SSE ('pergunta') assim que fica pronta. Se a IA parar antes do total,
+    as questões que faltam vêm do banco de reservas. Termina com o evento
+    'fim' ({"total": n}) ou 'erro'.
+    """
+    db_client = obter_db()
+
+    nivel, tema_solicitado, erro = _ler_parametros_perguntas()
+    if erro:
+        return erro
+    num_perguntas = NUM_PERGUNTAS
+    aluno = aluno_atual()
+    evitar = vistas_recentes.obter(aluno)
+
+    def gerar_eventos():
+        enviadas = 0
+
+        # 0. Perguntas já prontas no pool
+        perguntas_pool = pool_perguntas.retirar(nivel, tema_solicitado, num_perguntas, evitar)
+        if perguntas_pool:
+            for pergunta in perguntas_pool:
+                yield _evento_sse('pergunta', pergunta)
+            coletor_reservas.coletar(db_client, nivel, tema_solicitado, perguntas_pool)
+            vistas_recentes.registrar(aluno, perguntas_pool)
+            yield _evento_sse('fim', {"total": len(perguntas_pool)})
+            return
+
+        entregues = []
+        indice = IndiceSimilaridade()
+
+        # 1. Cada questão é enviada assim que o objeto JSON fecha no stream da IA
+        extrator = ExtratorObjetosJSON()
+        prompt = montar_prompt_perguntas(nivel, tema_solicitado, num_perguntas)
+        for trecho in chamar_groq_stream(prompt, MENSAGEM_SISTEMA_PERGUNTAS, prioridade='lote'):
+            for pergunta in extrator.alimentar(trecho):
+                if not validar_pergunta(pergunta) or not indice.adicionar_se_inedita(assinatura(pergunta)):
+                    continue
+                enviadas += 1
+                pergunta['id'] = enviadas
+                entregues.append(pergunta)
+                yield _evento_sse('pergunta', pergunta)
+                if enviadas == num_perguntas:
+                    break
+            if enviadas == num_perguntas:
+                break
+
+        coletor_reservas.coletar(db_client, nivel, tema_solicitado, entregues)
+
+        # 2. Contingência: completa com perguntas de reserva
+        if enviadas < num_perguntas:
+            print(f"🚨 Stream da IA terminou com {enviadas}/{num_perguntas} perguntas. Completando com reservas...")
+            faltantes = num_perguntas - enviadas
+            perguntas_contingencia.incrementar(motivo='stream_incompleta')
+            reservas = obter_perguntas_reservas(db_client, nivel, tema_solicitado, faltantes * 2, evitar)
+            for pergunta in filtrar_distintas(reservas, existentes=entregues)[:faltantes]:
+                enviadas += 1
+                pergunta['id'] = enviadas
+                entregues.append(pergunta)
+                yield _evento_sse('pergunta', pergunta)
+
+        vistas_recentes.registrar(aluno, entregues)
+        if enviadas:
+            yield _evento_sse('fim', {"total": enviadas})
+        else:
+            yield _evento_sse('erro', {"erro": "Erro na chamada da Groq API e o banco de perguntas de reserva está indisponível ou vazio para o tema/nível solicitado."})
+
+    return Response(
+        stream_with_context(gerar_eventos()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+# ----------------------------------------------------------------------
+# 🔹 Rota para consultar o estado do pool de perguntas
+# ----------------------------------------------------------------------
+@vialactea_bp.route('/perguntas/pool', methods=['GET'])
+def estado_pool_perguntas():
+    return jsonify(pool_perguntas.estado()), 200
+
+# ----------------------------------------------------------------------
+# 🔹 Rota para consultar as métricas do cache de reservas
+# ----------------------------------------------------------------------
+@vialactea_bp.route('/reservas/metricas', methods=['GET'])
+def metricas_reservas():
+    metricas = cache_reservas.metricas()
+    metricas['coleta'] = coletor_reservas.metricas()
+    return jsonify(metricas), 200
+
 # ----------------------------------------------------------------------
 # 🔹 Rota para verificar resposta
 # ----------------------------------------------------------------------
+MODOS_FEEDBACK = ('nenhum', 'erros', 'sempre')
+
 @vialactea_bp.route('/verificar', methods=['POST'])
 def verificar_resposta():
+    """
+    Corrige a resposta localmente (comparando as letras) e devolve a explicação
+    armazenada na questão. O feedback escrito pela IA é opcional:
+    ?feedback=nenhum (padrão) | erros (só quando o aluno erra) | sempre.
+    """
     dados = request.json
     pergunta = dados.get("pergunta", "")
     alternativas = dados.get("alternativas", {})
-    resposta_usuario = dados.get("resposta", "")
+    # 'resposta_usuario'/'resposta_correta' são os campos explícitos; 'resposta' é aceito por compatibilidade
+    resposta_usuario = dados.get("resposta_usuario", dados.get("resposta", ""))
+    resposta_correta = dados.get("resposta_correta", dados.get("resposta", ""))
     explicacao_texto = dados.get("explicacao", "")
     if not pergunta or not alternativas or not resposta_usuario:
         return jsonify({"erro": "Dados incompletos"}), 400
 
-    pergunta_completa = pergunta + "\n\n"
-    for letra, texto in alternativas.items():
-        pergunta_completa += f"{letra}) {texto}\n"
+    modo_feedback = request.args.get('feedback', 'nenhum').lower()
+    if modo_feedback not in MODOS_FEEDBACK:
+        return jsonify({"erro": "Modo de feedback inválido. Use: " + ', '.join(MODOS_FEEDBACK)}), 400
 
-    resposta_correta = dados.get("resposta", "").strip().upper()
+    resposta_correta = resposta_correta.strip().upper()
     resposta_usuario = resposta_usuario.strip().upper()
+    correta = resposta_usuario == resposta_correta
 
-    prompt = (
-        f"Aqui está uma pergunta de português:\n\n{pergunta_completa}\n"
-        f"Resposta correta: {resposta_correta}\n"
-        f"O usuário escolheu: {resposta_usuario}\n"
-        f"Avalie se ele acertou ou errou, se ele errou retorne a {resposta_correta} e o {explicacao_texto} de forma simples e didática.\n"
-        f"Use linguagem clara e adequada ao ensino médio."
-        f"Se a resposta estiver correta, retorne 'Correto'. Se estiver errada, retorne 'Incorreto'."
-        f"Evite usar frases longas ou complexas. "
-    )
+    # 1. Correção local (resposta imediata, sem chamar a IA)
+    if correta:
+        avaliacao = f"Correto! {explicacao_texto}".strip()
+    else:
+        avaliacao = f"Incorreto. A resposta correta é a alternativa {resposta_correta}. {explicacao_texto}".strip()
+    origem_avaliacao = 'local'
+
+    # 2. Feedback opcional da IA. O prompt só depende da questão e da alternativa
+    # escolhida, então o cache de respostas (utils.cache_respostas) reaproveita o
+    # feedback entre alunos, e pedidos iguais simultâneos viram uma única chamada.
+    if modo_feedback == 'sempre' or (modo_feedback == 'erros' and not correta):
+        pergunta_completa = pergunta + "\n\n"
+        for letra, texto in alternativas.items():
+            pergunta_completa += f"{letra}) {texto}\n"
+
+        prompt = (
+            f"Aqui está uma pergunta de português:\n\n{pergunta_completa}\n"
+            f"Resposta correta: {resposta_correta}\n"
+            f"O usuário escolheu: {resposta_usuario}\n"
+            f"Avalie se ele acertou ou errou, se ele errou retorne a {resposta_correta} e o {explicacao_texto} de forma simples e didática.\n"
+            f"Use linguagem clara e adequada ao ensino médio."
+            f"Se a resposta estiver correta, retorne 'Correto'. Se estiver errada, retorne 'Incorreto'."
+            f"Evite usar frases longas ou complexas. "
+        )
 
-    resposta, status = chamar_groq(prompt, "Você é um corretor experiente de provas de Língua Portuguesa. Avalie a resposta do aluno.")
+        resposta, status = chamar_groq(prompt, "Você é um corretor experiente de provas de Língua Portuguesa. Avalie a resposta do aluno.")
 
-    if not resposta:
-        return jsonify({"erro": "Erro ao verificar resposta"}), status
+        # Se a IA falhar, a correção local continua valendo
+        if resposta:
+            avaliacao, origem_avaliacao = resposta, 'ia'
 
     return jsonify({
-        "avaliacao": resposta,
-        "correta": resposta_usuario == resposta_correta
-    }), 200
\ No newline at end of file
+        "avaliacao": avaliacao,
+        "correta": correta,
+        "resposta_correta": resposta_correta,
+        "explicacao": explicacao_texto,
+        "origem_avaliacao": origem_avaliacao
+    }), 200
@@ -1,23 +1,27 @@
 # app.py
 
+import time
+_inicio_importacoes = time.perf_counter()
+
 from flask import Flask
 from flask_cors import CORS
 import os
 import sys
-import json
 from dotenv import load_dotenv
 
 # IMPORTS PARA JWT
 from flask_jwt_extended import JWTManager 
 from datetime import timedelta 
 
-# Imports do Firebase
-import firebase_admin
-from firebase_admin import credentials, firestore
+# O Firebase (gRPC, protobuf) só é importado quando o Firestore é conectado
+from utils.inicializacao import conectar_firestore, registrar_etapa, relatorio_inicializacao
+
+registrar_etapa('importacoes', time.perf_counter() - _inicio_importacoes)
 
 
 # A função create_app() é a Factory Function que inicializa a aplicação
 def create_app():
+    inicio = time.perf_counter()
     load_dotenv()
     app = Flask(__name__)
     CORS(app)
@@ -34,25 +38,11 @@ def create_app():
     # =========================================================
     # 1. INICIALIZAÇÃO DO FIREBASE E FIRESTORE
     # =========================================================
-    try:
-        firebase_config = os.getenv('CONFIG_FIREBASE')
-        if firebase_config:
-            FBKEY = json.loads(firebase_config)
-            cred = credentials.Certificate(FBKEY)
-            
-            # Inicializa apenas se não estiver inicializado
-            if not firebase_admin._apps:
-                firebase_admin.initialize_app(cred)
-                
-            # Armazena o cliente Firestore na configuração do app
-            app.config['DB']= firestore.client()
-            print("✅ Conectado ao Firebase com sucesso!")
-        else:
-            app.config['DB']= None
-            print("⚠️ CONFIG_FIREBASE não encontrado no .env. Firebase não conectado.")
-    except Exception as e:
-        print(f"❌ Erro ao conectar ao Firebase: {e}")
-        app.config['DB']= None
+    # Adiada por padrão: o cliente é criado na primeira rota que usa o banco
+    # (utils.inicializacao.obter_db), então '/' e '/fases/<jogo>' respondem
+    # sem esperar o Firebase. FIREBASE_INICIALIZACAO_ADIADA=0 conecta já aqui.
+    if os.getenv('FIREBASE_INICIALIZACAO_ADIADA', '1') != '1':
+        app.config['DB'] = conectar_firestore()
 
     # =========================================================
     # 2. IMPORTAÇÃO E REGISTRO DE BLUEPRINTS
@@ -82,11 +72,17 @@ def create_app():
     
     print("✅ Blueprints registrados com sucesso.")
 
+    # Latência, status e operações no Firestore de cada requisição (GET /metrics)
+    from utils.metricas import instrumentar
+    instrumentar(app)
+
     # 🔹 Rota raiz (mantida no app principal)
     @app.route('/')
     def home():
         return "<h1>API está on</h1>"
 
+    registrar_etapa('create_app', time.perf_counter() - inicio)
+    print(relatorio_inicializacao())
     return app
 
 # =========================================================
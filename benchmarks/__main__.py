@@ -0,0 +1,211 @@
+# benchmarks/__main__.py
+"""
+Benchmarks de carga da API, sem Groq nem Firebase de verdade.
+
+Sobe o app de app.py contra um LLM falso local (benchmarks.llm_falso) e um
+Firestore em memória (benchmarks.firestore_memoria) e executa os cenários
+de benchmarks.cenarios, informando latência p50/p95/p99, vazão e pico de
+memória (tracemalloc) de cada um.
+
+Uso:
+    python -m benchmarks                      # todos os cenários
+    python -m benchmarks turma pontuar        # só alguns
+    python -m benchmarks --escala 0.2         # versão reduzida (ex.: 10 mil alunos no 'admin')
+    python -m benchmarks --salvar base.json   # guarda os resultados
+    python -m benchmarks --comparar base.json # falha (código 1) se algum cenário piorar além da tolerância
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, deque
+
+from benchmarks.llm_falso import ConfiguracaoLLM, ServidorLLMFalso
+
+
+def _configurar_ambiente(url_llm):
+    """Variáveis lidas na importação dos módulos: precisam vir antes de importar o app."""
+    os.environ['GROQ_URL'] = url_llm
+    os.environ['GROQ_API_KEY'] = 'chave-de-benchmark'
+    os.environ['CONFIG_FIREBASE'] = ''  # nunca conectar ao Firebase de verdade
+    os.environ.setdefault('CONFIG_JWT', 'segredo-de-benchmark-com-pelo-menos-32-bytes')
+    # Threads de segundo plano desligadas: cada cenário mede só o caminho da requisição
+    for variavel in ('POOL_PERGUNTAS_ATIVO', 'POOL_TEXTOS_ATIVO', 'COLETA_RESERVAS_ATIVA'):
+        os.environ.setdefault(variavel, '0')
+    os.environ.pop('GROQ_CACHE_SQLITE', None)
+
+
+def percentil(valores_ordenados, p):
+    if not valores_ordenados:
+        return None
+    indice = min(int(round(p / 100 * (len(valores_ordenados) - 1))), len(valores_ordenados) - 1)
+    return valores_ordenados[indice]
+
+
+def executar_cenario(cenario, app, configuracao_llm, escala, concorrencia=None, medir_memoria=True):
+    from benchmarks.firestore_memoria import FirestoreMemoria
+    from utils.cache_reservas import cache_reservas
+    from utils.firestore_contado import contar_operacoes
+
+    # O cache de reservas é do processo: sem limpar, um cenário herdaria o banco do anterior
+    cache_reservas.invalidar()
+    db = FirestoreMemoria(latencia=cenario.latencia_firestore)
+    app.config['DB'] = contar_operacoes(db)  # como em conectar_firestore(): as operações entram nas métricas
+    for atributo, valor in cenario.llm.items():
+        setattr(configuracao_llm, atributo, valor)
+    chamadas_llm_antes = configuracao_llm.chamadas
+
+    tarefas = deque(cenario.preparar(app, db, escala))
+    db.operacoes.update(leituras=0, escritas=0)
+    concorrencia = concorrencia or cenario.concorrencia
+
+    latencias, por_rota, status = [], {}, Counter()
+    lock = threading.Lock()
+
+    def medir(rotulo, requisicao):
+        inicio = time.perf_counter()
+        resposta = requisicao()
+        resposta.get_data()  # consome o corpo inteiro (streams e NDJSON)
+        duracao = time.perf_counter() - inicio
+        with lock:
+            latencias.append(duracao)
+            por_rota.setdefault(rotulo, []).append(duracao)
+            status[resposta.status_code] += 1
+        return resposta
+
+    def trabalhador():
+        cliente = app.test_client()
+        while True:
+            with lock:
+                if not tarefas:
+                    return
+                tarefa = tarefas.popleft()
+            try:
+                tarefa(cliente, medir)
+            except Exception as e:
+                with lock:
+                    status['excecao'] += 1
+                print(f"❌ Erro em uma tarefa do cenário {cenario.nome}: {e!r}")
+
+    if medir_memoria:
+        tracemalloc.reset_peak()
+        memoria_inicial = tracemalloc.get_traced_memory()[0]
+
+    inicio = time.perf_counter()
+    threads = [threading.Thread(target=trabalhador, daemon=True) for _ in range(concorrencia)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    duracao = time.perf_counter() - inicio
+
+    pico = (tracemalloc.get_traced_memory()[1] - memoria_inicial) / 2 ** 20 if medir_memoria else None
+    latencias.sort()
+    milissegundos = lambda valor: round(valor * 1000, 1) if valor is not None else None
+    return {
+        "cenario": cenario.nome,
+        "requisicoes": len(latencias),
+        "concorrencia": concorrencia,
+        "duracao_s": round(duracao, 2),
+        "vazao_rps": round(len(latencias) / duracao, 1) if duracao else None,
+        "p50_ms": milissegundos(percentil(latencias, 50)),
+        "p95_ms": milissegundos(percentil(latencias, 95)),
+        "p99_ms": milissegundos(percentil(latencias, 99)),
+        "max_ms": milissegundos(latencias[-1] if latencias else None),
+        "p95_por_rota_ms": {rotulo: milissegundos(percentil(sorted(valores), 95)) for rotulo, valores in por_rota.items()},
+        "status": {str(codigo): quantidade for codigo, quantidade in sorted(status.items(), key=str)},
+        "memoria_pico_mb": round(pico, 1) if pico is not None else None,
+        "firestore_leituras": db.operacoes['leituras'],
+        "firestore_escritas": db.operacoes['escritas'],
+        "chamadas_llm": configuracao_llm.chamadas - chamadas_llm_antes,
+    }
+
+
+def imprimir(resultados):
+    colunas = ("cenario", "requisicoes", "vazao_rps", "p50_ms", "p95_ms", "p99_ms", "max_ms",
+               "memoria_pico_mb", "firestore_leituras", "firestore_escritas", "chamadas_llm")
+    larguras = {coluna: max(len(coluna), *(len(str(r[coluna])) for r in resultados)) for coluna in colunas}
+    print()
+    print("  ".join(coluna.ljust(larguras[coluna]) for coluna in colunas))
+    for resultado in resultados:
+        print("  ".join(str(resultado[coluna]).ljust(larguras[coluna]) for coluna in colunas))
+    for resultado in resultados:
+        print(f"  {resultado['cenario']}: status {resultado['status']}, p95 por rota {resultado['p95_por_rota_ms']}")
+
+
+def comparar(resultados, arquivo_base, tolerancia):
+    """Lista as regressões de p95 e vazão em relação a um resultado salvo."""
+    with open(arquivo_base, encoding='utf-8') as arquivo:
+        base = {resultado['cenario']: resultado for resultado in json.load(arquivo)}
+    regressoes = []
+    for resultado in resultados:
+        anterior = base.get(resultado['cenario'])
+        if not anterior:
+            continue
+        if anterior['p95_ms'] and resultado['p95_ms'] > anterior['p95_ms'] * (1 + tolerancia):
+            regressoes.append(f"{resultado['cenario']}: p95 {anterior['p95_ms']}ms -> {resultado['p95_ms']}ms")
+        if anterior['vazao_rps'] and resultado['vazao_rps'] < anterior['vazao_rps'] * (1 - tolerancia):
+            regressoes.append(f"{resultado['cenario']}: vazão {anterior['vazao_rps']} -> {resultado['vazao_rps']} req/s")
+    return regressoes
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description="Benchmarks de carga da API.")
+    parser.add_argument('cenarios', nargs='*', help="cenários a executar (padrão: todos)")
+    parser.add_argument('--escala', type=float, default=1.0, help="multiplica o tamanho dos cenários")
+    parser.add_argument('--concorrencia', type=int, help="número de clientes simultâneos (padrão: o de cada cenário)")
+    parser.add_argument('--sem-memoria', action='store_true', help="não medir memória (tracemalloc deixa tudo mais lento)")
+    parser.add_argument('--salvar', help="arquivo JSON onde guardar os resultados")
+    parser.add_argument('--comparar', help="arquivo JSON de uma execução anterior")
+    parser.add_argument('--tolerancia', type=float, default=0.25, help="piora aceita na comparação (padrão: 0.25)")
+    args = parser.parse_args(argumentos)
+
+    configuracao_llm = ConfiguracaoLLM()
+    servidor = ServidorLLMFalso(configuracao_llm).iniciar()
+    _configurar_ambiente(servidor.url)
+
+    # Importados só agora, depois das variáveis de ambiente. O app é o mesmo objeto que
+    # app.py já cria na importação (o da Vercel): chamar create_app() de novo construiria
+    # um segundo app e misturaria os tempos de inicialização dos dois.
+    from app import app
+    from benchmarks.cenarios import CENARIOS
+
+    nomes = args.cenarios or list(CENARIOS)
+    desconhecidos = [nome for nome in nomes if nome not in CENARIOS]
+    if desconhecidos:
+        parser.error(f"cenário(s) desconhecido(s): {', '.join(desconhecidos)}. Disponíveis: {', '.join(CENARIOS)}")
+
+    if not args.sem_memoria:
+        tracemalloc.start()
+
+    resultados = []
+    try:
+        for nome in nomes:
+            cenario = CENARIOS[nome]
+            print(f"▶️ {nome}: {cenario.descrever(args.escala)}")
+            resultados.append(executar_cenario(cenario, app, configuracao_llm, args.escala, args.concorrencia,
+                                               medir_memoria=not args.sem_memoria))
+    finally:
+        servidor.parar()
+
+    imprimir(resultados)
+    if args.salvar:
+        with open(args.salvar, 'w', encoding='utf-8') as arquivo:
+            json.dump(resultados, arquivo, ensure_ascii=False, indent=2)
+        print(f"✅ Resultados salvos em {args.salvar}")
+    if args.comparar:
+        regressoes = comparar(resultados, args.comparar, args.tolerancia)
+        for regressao in regressoes:
+            print(f"🚨 Regressão em {regressao}")
+        if regressoes:
+            return 1
+        print("✅ Nenhuma regressão acima da tolerância.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,145 @@
+# benchmarks/cenarios.py
+
+import random
+from flask_jwt_extended import create_access_token
+from config_data import contexto_dificuldade, temas_disponiveis
+from benchmarks.llm_falso import gerar_perguntas
+
+
+class Cenario:
+    """
+    Um cenário de carga: `preparar(app, db, escala)` popula o Firestore em
+    memória e devolve a lista de tarefas. Cada tarefa é uma função
+    (cliente, medir) que faz uma ou mais requisições com medir(rotulo, funcao).
+    `descricao(escala)` descreve o cenário com os tamanhos já escalados.
+    """
+
+    def __init__(self, nome, descricao, preparar, concorrencia, llm=None, latencia_firestore=0.002):
+        self.nome = nome
+        self.descrever = descricao
+        self.preparar = preparar
+        self.concorrencia = concorrencia
+        self.llm = llm or {}
+        self.latencia_firestore = latencia_firestore
+
+
+def escalar(quantidade, escala):
+    """Tamanho do cenário com --escala (no mínimo 1)."""
+    return max(int(quantidade * escala), 1)
+
+
+def _token(app, email, cargo='usuario'):
+    with app.app_context():
+        return create_access_token(identity=email, additional_claims={'cargo': cargo})
+
+
+def _aluno(indice, aleatorio):
+    return {
+        "id": indice,
+        "nome": f"Aluno {aleatorio.randrange(10 ** 6):06d}",
+        "email": f"aluno{indice}@escola.br",
+        "senha": "123456",
+        "cargo": "usuario",
+        "ativo": aleatorio.random() < 0.9,
+        "processo": {
+            "via_lactea": {"estrelas_por_fase": {}, "fase_atual": "via_lactea_fase_1", "nivel": 1, "pontuacao_total": 0},
+            "andromeda": {"estrelas_por_fase": {}, "fase_atual": "andromeda_fase_1", "nivel": 1, "pontuacao_total": 0},
+        },
+    }
+
+
+def _popular_reservas(db, aleatorio, por_tema=40):
+    documentos = {}
+    for nivel in contexto_dificuldade:
+        for tema in temas_disponiveis:
+            for pergunta in gerar_perguntas(aleatorio, por_tema):
+                pergunta.update(nivel=nivel, tema=tema)
+                documentos[f"{nivel}-{tema}-{len(documentos)}"] = pergunta
+    db.carregar('perguntas_reserva', documentos)
+
+
+# ======================================================================
+# 🔹 Turma inteira pedindo o quiz ao mesmo tempo
+# ======================================================================
+def _preparar_turma(rota):
+    def preparar(app, db, escala):
+        aleatorio = random.Random(1)
+        _popular_reservas(db, aleatorio)
+        alunos = escalar(30, escala)
+        tokens = [_token(app, f"aluno{i}@escola.br") for i in range(alunos)]
+        tema = 'sintaxe'
+
+        def tarefa(token):
+            def executar(cliente, medir):
+                # Cada aluno faz três quizzes seguidos
+                for _ in range(3):
+                    medir(rota, lambda: cliente.get(f'/vialactea{rota}?nivel=medio&tema={tema}',
+                                                    headers={'Authorization': f'Bearer {token}'}))
+            return executar
+
+        return [tarefa(token) for token in tokens]
+    return preparar
+
+
+# ======================================================================
+# 🔹 Envio rápido de pontuações
+# ======================================================================
+def _preparar_pontuar(app, db, escala):
+    aleatorio = random.Random(2)
+    alunos = 200
+    db.carregar('alunos', {i: _aluno(i, aleatorio) for i in range(alunos)})
+    envios = escalar(2000, escala)
+
+    def tarefa(aluno_id, estrelas):
+        def executar(cliente, medir):
+            medir('/pontuar', lambda: cliente.post(f'/progresso/{aluno_id}/via_lactea/pontuar',
+                                                   json={'fase': 'via_lactea_fase_1', 'estrelas': estrelas}))
+        return executar
+
+    return [tarefa(aleatorio.randrange(alunos), aleatorio.randint(0, 3)) for _ in range(envios)]
+
+
+# ======================================================================
+# 🔹 Painel do administrador com uma rede inteira de escolas
+# ======================================================================
+def _preparar_admin(app, db, escala):
+    aleatorio = random.Random(3)
+    alunos = escalar(50000, escala)
+    db.carregar('alunos', {i: _aluno(i, aleatorio) for i in range(alunos)})
+    cabecalho = {'Authorization': f"Bearer {_token(app, 'admin@escola.br', 'admin')}"}
+
+    def paginar(cliente, medir):
+        apos = ''
+        while True:
+            resposta = medir('/admin/alunos?limite=1000',
+                             lambda: cliente.get(f'/admin/alunos?limite=1000{apos}', headers=cabecalho))
+            proximo = (resposta.get_json(silent=True) or {}).get('proximo')
+            if not proximo:
+                return
+            apos = f'&apos={proximo}'
+
+    def listar_tudo(cliente, medir):
+        medir('/admin/alunos', lambda: cliente.get('/admin/alunos', headers=cabecalho))
+
+    def listar_ndjson(cliente, medir):
+        medir('/admin/alunos?formato=ndjson', lambda: cliente.get('/admin/alunos?formato=ndjson', headers=cabecalho))
+
+    return [paginar, listar_tudo, listar_ndjson, listar_tudo, listar_ndjson]
+
+
+CENARIOS = {
+    cenario.nome: cenario for cenario in (
+        Cenario('turma', lambda escala: f"{escalar(30, escala)} alunos pedindo 3 quizzes cada em /vialactea/perguntas "
+                                        "(LLM lento, 5% de erros e 5% de JSON quebrado).",
+                _preparar_turma('/perguntas'), concorrencia=30,
+                llm={'latencia': 0.8, 'taxa_erro': 0.05, 'taxa_json_invalido': 0.05}),
+        Cenario('turma_stream', lambda escala: f"{escalar(30, escala)} alunos pedindo 3 quizzes cada em "
+                                               "/vialactea/perguntas/stream (SSE).",
+                _preparar_turma('/perguntas/stream'), concorrencia=30,
+                llm={'latencia': 0.3, 'taxa_erro': 0.05, 'taxa_json_invalido': 0.05}),
+        Cenario('pontuar', lambda escala: f"{escalar(2000, escala)} envios de /pontuar para 200 alunos, 20 ao mesmo tempo.",
+                _preparar_pontuar, concorrencia=20),
+        Cenario('admin', lambda escala: f"Listagem de {escalar(50000, escala)} alunos no painel: paginada, completa e em NDJSON.",
+                _preparar_admin, concorrencia=2, latencia_firestore=0.0),
+    )
+}
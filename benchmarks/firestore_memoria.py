@@ -0,0 +1,326 @@
+# benchmarks/firestore_memoria.py
+
+import copy
+import datetime
+import threading
+import time
+from google.api_core.exceptions import AlreadyExists, NotFound
+from google.cloud.firestore_v1 import transforms
+from google.cloud.firestore_v1.client import Client
+from google.cloud.firestore_v1.types import Value, WriteResult
+
+_OPERADORES = {
+    '==': lambda a, b: a == b,
+    '!=': lambda a, b: a is not None and a != b,
+    '<': lambda a, b: a is not None and a < b,
+    '<=': lambda a, b: a is not None and a <= b,
+    '>': lambda a, b: a is not None and a > b,
+    '>=': lambda a, b: a is not None and a >= b,
+}
+
+
+def _dividir_caminho(caminho):
+    """'processo.`via_lactea`.nivel' -> ['processo', 'via_lactea', 'nivel'] (respeita as crases)."""
+    partes, atual, entre_crases = [], '', False
+    for caractere in caminho:
+        if caractere == '`':
+            entre_crases = not entre_crases
+        elif caractere == '.' and not entre_crases:
+            partes.append(atual)
+            atual = ''
+        else:
+            atual += caractere
+    partes.append(atual)
+    return partes
+
+
+def _ler_campo(dados, caminho):
+    for parte in _dividir_caminho(caminho):
+        if not isinstance(dados, dict) or parte not in dados:
+            return None
+        dados = dados[parte]
+    return dados
+
+
+def _projetar(dados, caminhos):
+    """Só os campos pedidos (como o field_paths/select do Firestore)."""
+    projetado = {}
+    for caminho in caminhos:
+        valor = _ler_campo(dados, caminho)
+        if valor is None:
+            continue
+        partes = _dividir_caminho(caminho)
+        destino = projetado
+        for parte in partes[:-1]:
+            destino = destino.setdefault(parte, {})
+        destino[partes[-1]] = copy.deepcopy(valor)
+    return projetado
+
+
+class Snapshot:
+    def __init__(self, referencia, dados, update_time=None):
+        self.reference = referencia
+        self.id = referencia.id
+        self.exists = dados is not None
+        self.update_time = update_time
+        self._dados = dados
+
+    def to_dict(self):
+        return copy.deepcopy(self._dados) if self._dados is not None else None
+
+
+class Documento:
+    def __init__(self, banco, colecao, id_documento):
+        self._banco = banco
+        self._colecao = colecao
+        self.id = str(id_documento)
+
+    def get(self, field_paths=None, transaction=None):
+        return self._banco._ler(self, field_paths)
+
+    def set(self, dados):
+        self._banco._escrever(self, dados)
+
+    def create(self, dados):
+        self._banco._escrever(self, dados, criar=True)
+
+    def update(self, alteracoes):
+        return self._banco._atualizar(self, alteracoes)
+
+    def delete(self, option=None):
+        self._banco._excluir(self, exigir_existencia=option is not None)
+
+
+class Consulta:
+    def __init__(self, banco, colecao, filtros=(), limite=None, ordem=(), apos=None, campos=None):
+        self._banco = banco
+        self._colecao = colecao
+        self._filtros = tuple(filtros)
+        self._limite = limite
+        self._ordem = tuple(ordem)
+        self._apos = apos
+        self._campos = campos
+
+    def _copiar(self, **alteracoes):
+        atributos = dict(filtros=self._filtros, limite=self._limite, ordem=self._ordem, apos=self._apos,
+                         campos=self._campos)
+        atributos.update(alteracoes)
+        return Consulta(self._banco, self._colecao, **atributos)
+
+    def document(self, id_documento):
+        return Documento(self._banco, self._colecao, id_documento)
+
+    def where(self, campo=None, operador=None, valor=None, filter=None):
+        if filter is not None:
+            campo, operador, valor = filter.field_path, filter.op_string, filter.value
+        return self._copiar(filtros=self._filtros + ((campo, operador, valor),))
+
+    def order_by(self, campo, direction=None):
+        return self._copiar(ordem=self._ordem + (campo,))
+
+    def limit(self, quantidade):
+        return self._copiar(limite=quantidade)
+
+    def start_after(self, posicao):
+        return self._copiar(apos=tuple(posicao))
+
+    def select(self, campos):
+        return self._copiar(campos=list(campos))
+
+    def stream(self):
+        return iter(self._banco._consultar(self))
+
+
+class _Lote:
+    """Batched write: as operações só são aplicadas no commit, todas ou nenhuma."""
+
+    def __init__(self, banco):
+        self._banco = banco
+        self._operacoes = []
+
+    def set(self, referencia, dados):
+        self._operacoes.append(lambda: self._banco._escrever(referencia, dados, rpc=False))
+
+    def create(self, referencia, dados):
+        self._operacoes.append(lambda: self._banco._escrever(referencia, dados, rpc=False, criar=True))
+
+    def update(self, referencia, alteracoes):
+        self._operacoes.append(lambda: self._banco._atualizar(referencia, alteracoes, rpc=False))
+
+    def delete(self, referencia, option=None):
+        self._operacoes.append(lambda: self._banco._excluir(referencia, option is not None, rpc=False))
+
+    def commit(self):
+        self._banco._esperar_rpc()
+        with self._banco._lock:
+            copia = copy.deepcopy(self._banco.dados)
+            try:
+                for operacao in self._operacoes:
+                    operacao()
+            except Exception:
+                self._banco.dados = copia
+                raise
+
+
+class _Transacao(_Lote):
+    """Transação aceita por @firestore.transactional (as escritas vão no commit)."""
+
+    _read_only = False
+    _max_attempts = 5
+    _id = b'transacao-em-memoria'
+
+    def _begin(self, retry_id=None):
+        self._operacoes = []
+
+    def _clean_up(self):
+        self._operacoes = []
+
+    def _commit(self):
+        self.commit()
+
+    def _rollback(self):
+        self._operacoes = []
+
+
+class FirestoreMemoria:
+    """
+    Substituto em memória do cliente do Firestore, com a parte da API que o
+    projeto usa (documentos, consultas com where/order_by/start_after/limit/
+    select, batches, transações, Increment, DELETE_FIELD e SERVER_TIMESTAMP). Cada
+    chamada ao "servidor" espera `latencia` segundos, e as leituras e
+    escritas são contadas em `operacoes`. Seguro para várias threads.
+    """
+
+    field_path = staticmethod(Client.field_path)
+
+    def __init__(self, latencia=0.0):
+        self.latencia = latencia
+        self.dados = {}  # colecao -> {id: documento}
+        self.operacoes = {'leituras': 0, 'escritas': 0}
+        self._alterado_em = {}
+        self._lock = threading.RLock()
+
+    # ------------------------------------------------------------------
+    # Interface do cliente
+    # ------------------------------------------------------------------
+    def collection(self, nome):
+        return Consulta(self, nome)
+
+    def batch(self):
+        return _Lote(self)
+
+    def transaction(self):
+        return _Transacao(self)
+
+    def write_option(self, **condicoes):
+        return condicoes
+
+    def carregar(self, colecao, documentos):
+        """Preenche uma coleção de uma vez ({id: dados}), sem contar operações."""
+        agora = datetime.datetime.now(datetime.timezone.utc)
+        with self._lock:
+            destino = self.dados.setdefault(colecao, {})
+            for id_documento, dados in documentos.items():
+                destino[str(id_documento)] = dados
+                self._alterado_em[(colecao, str(id_documento))] = agora
+
+    # ------------------------------------------------------------------
+    # Operações (chamadas pelas referências)
+    # ------------------------------------------------------------------
+    def _esperar_rpc(self):
+        if self.latencia:
+            time.sleep(self.latencia)
+
+    def _contar(self, tipo, quantidade=1):
+        with self._lock:
+            self.operacoes[tipo] += quantidade
+
+    def _tocar(self, referencia):
+        self._alterado_em[(referencia._colecao, referencia.id)] = datetime.datetime.now(datetime.timezone.utc)
+
+    def _ler(self, referencia, campos=None):
+        self._esperar_rpc()
+        with self._lock:
+            self.operacoes['leituras'] += 1
+            dados = self.dados.get(referencia._colecao, {}).get(referencia.id)
+            dados = _projetar(dados, campos) if dados is not None and campos else copy.deepcopy(dados)
+            return Snapshot(referencia, dados, self._alterado_em.get((referencia._colecao, referencia.id)))
+
+    def _resolver_sentinelas(self, dados):
+        if isinstance(dados, dict):
+            return {chave: self._resolver_sentinelas(valor) for chave, valor in dados.items()}
+        if dados is transforms.SERVER_TIMESTAMP:
+            return datetime.datetime.now(datetime.timezone.utc)
+        return copy.deepcopy(dados)
+
+    def _escrever(self, referencia, dados, rpc=True, criar=False):
+        if rpc:
+            self._esperar_rpc()
+        with self._lock:
+            if criar and referencia.id in self.dados.get(referencia._colecao, {}):
+                raise AlreadyExists(f"Documento {referencia._colecao}/{referencia.id} já existe.")
+            self.operacoes['escritas'] += 1
+            self.dados.setdefault(referencia._colecao, {})[referencia.id] = self._resolver_sentinelas(dados)
+            self._tocar(referencia)
+
+    def _atualizar(self, referencia, alteracoes, rpc=True):
+        if rpc:
+            self._esperar_rpc()
+        with self._lock:
+            self.operacoes['escritas'] += 1
+            documento = self.dados.get(referencia._colecao, {}).get(referencia.id)
+            if documento is None:
+                raise NotFound(f"Documento {referencia._colecao}/{referencia.id} não existe.")
+            resultados = []
+            for caminho, valor in alteracoes.items():
+                partes = _dividir_caminho(caminho)
+                destino = documento
+                for parte in partes[:-1]:
+                    destino = destino.setdefault(parte, {})
+                if isinstance(valor, transforms.Increment):
+                    destino[partes[-1]] = destino.get(partes[-1], 0) + valor.value
+                    resultados.append(Value(integer_value=destino[partes[-1]]))
+                elif valor is transforms.DELETE_FIELD:
+                    destino.pop(partes[-1], None)
+                else:
+                    destino[partes[-1]] = self._resolver_sentinelas(valor)
+            self._tocar(referencia)
+            return WriteResult(transform_results=resultados)
+
+    def _excluir(self, referencia, exigir_existencia=False, rpc=True):
+        if rpc:
+            self._esperar_rpc()
+        with self._lock:
+            self.operacoes['escritas'] += 1
+            colecao = self.dados.get(referencia._colecao, {})
+            if exigir_existencia and referencia.id not in colecao:
+                raise NotFound(f"Documento {referencia._colecao}/{referencia.id} não existe.")
+            colecao.pop(referencia.id, None)
+
+    def _consultar(self, consulta):
+        self._esperar_rpc()
+        with self._lock:
+            itens = [
+                (id_documento, dados) for id_documento, dados in self.dados.get(consulta._colecao, {}).items()
+                if all(_OPERADORES[operador](_ler_campo(dados, campo), valor)
+                       for campo, operador, valor in consulta._filtros)
+            ]
+
+            def chave(item):
+                return tuple(item[0] if campo == '__name__' else _ler_campo(item[1], campo) for campo in consulta._ordem)
+
+            if consulta._ordem:
+                itens.sort(key=chave)
+                if consulta._apos is not None:
+                    itens = [item for item in itens if chave(item) > consulta._apos]
+            if consulta._limite is not None:
+                itens = itens[:consulta._limite]
+
+            # Consulta sem resultado também é cobrada como uma leitura
+            self.operacoes['leituras'] += max(len(itens), 1)
+            return [
+                Snapshot(Documento(self, consulta._colecao, id_documento),
+                         _projetar(dados, consulta._campos) if consulta._campos is not None else copy.deepcopy(dados),
+                         self._alterado_em.get((consulta._colecao, id_documento)))
+                for id_documento, dados in itens
+            ]
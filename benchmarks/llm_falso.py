@@ -0,0 +1,165 @@
+# benchmarks/llm_falso.py
+
+import json
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PALAVRAS = (
+    "aluno professor livro escola cidade jardim viagem caderno janela música praia ciência "
+    "história amigo planeta estrela rio montanha floresta verão inverno cozinha festa rua "
+    "biblioteca computador bicicleta pintura teatro cinema mercado ponte navio trem"
+).split()
+_NUMERO_PERGUNTAS = re.compile(r"mais (\d+) objetos")
+
+
+class ConfiguracaoLLM:
+    """Comportamento do LLM falso (pode ser alterado com o servidor rodando)."""
+
+    def __init__(self, latencia=0.3, variacao=0.1, taxa_erro=0.0, taxa_json_invalido=0.0,
+                 atraso_trecho=0.005, tamanho_trecho=24, semente=42):
+        self.latencia = latencia                      # segundos até a resposta (ou o 1º trecho)
+        self.variacao = variacao                      # ± aleatório somado à latência
+        self.taxa_erro = taxa_erro                    # fração de respostas 503
+        self.taxa_json_invalido = taxa_json_invalido  # fração de respostas com JSON quebrado
+        self.atraso_trecho = atraso_trecho            # intervalo entre trechos no streaming
+        self.tamanho_trecho = tamanho_trecho          # caracteres por trecho no streaming
+        self.aleatorio = random.Random(semente)
+        self.lock = threading.Lock()
+        self.chamadas = 0
+
+
+def _frase(aleatorio, palavras=8):
+    return ' '.join(aleatorio.choice(PALAVRAS) for _ in range(palavras))
+
+
+def gerar_perguntas(aleatorio, quantidade):
+    return [{
+        "id": i + 1,
+        "pergunta": f"Na frase '{_frase(aleatorio)}', qual é a função de '{aleatorio.choice(PALAVRAS)}'?",
+        "alternativas": {letra: _frase(aleatorio, 3) for letra in "ABCD"},
+        "resposta": aleatorio.choice("ABCD"),
+        "subtema": "Sujeito e Predicado",
+        "explicacao": _frase(aleatorio, 12),
+    } for i in range(quantidade)]
+
+
+def gerar_conteudo(mensagens, aleatorio):
+    """Resposta plausível para cada tipo de prompt do projeto."""
+    sistema = mensagens[0]['content'] if mensagens else ''
+    usuario = mensagens[-1]['content'] if mensagens else ''
+    if 'quiz' in sistema:
+        encontrado = _NUMERO_PERGUNTAS.search(usuario)
+        quantidade = int(encontrado.group(1)) + 1 if encontrado else 12
+        return json.dumps(gerar_perguntas(aleatorio, quantidade), ensure_ascii=False)
+    if 'textos com erros' in sistema:
+        trecho = "a gente vamos"
+        texto = f"Ontem {trecho} na {aleatorio.choice(PALAVRAS)} e {_frase(aleatorio, 10)}."
+        return json.dumps({"texto": texto, "erros": [{"trecho": trecho, "correcao": "a gente foi", "tipo": "concordância"}]},
+                          ensure_ascii=False)
+    if 'corrigindo' in sistema:
+        return json.dumps({"feedback": _frase(aleatorio, 20), "alternativas_aceitas": []}, ensure_ascii=False)
+    return _frase(aleatorio, 30)
+
+
+class _Manipulador(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    configuracao = None
+
+    def log_message(self, *args):
+        pass
+
+    def _sortear(self, mensagens):
+        cfg = self.configuracao
+        with cfg.lock:
+            cfg.chamadas += 1
+            espera = max(cfg.latencia + cfg.aleatorio.uniform(-cfg.variacao, cfg.variacao), 0)
+            falhar = cfg.aleatorio.random() < cfg.taxa_erro
+            quebrar = cfg.aleatorio.random() < cfg.taxa_json_invalido
+            conteudo = gerar_conteudo(mensagens, cfg.aleatorio)
+        if quebrar:
+            conteudo = conteudo[:len(conteudo) // 3]
+        return espera, falhar, conteudo
+
+    def _enviar(self, status, corpo, tipo='application/json'):
+        dados = corpo.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', tipo)
+        self.send_header('Content-Length', str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def _enviar_trecho(self, evento):
+        dados = f"data: {evento}\n\n".encode('utf-8')
+        self.wfile.write(b'%x\r\n%s\r\n' % (len(dados), dados))
+        self.wfile.flush()
+
+    def do_POST(self):
+        corpo = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        mensagens = corpo.get('messages', [])
+        espera, falhar, conteudo = self._sortear(mensagens)
+        time.sleep(espera)
+
+        if falhar:
+            self._enviar(503, json.dumps({"error": {"message": "Serviço indisponível (simulado)."}}))
+            return
+
+        uso = {
+            "prompt_tokens": sum(len(m.get('content', '')) for m in mensagens) // 4,
+            "completion_tokens": len(conteudo) // 4,
+        }
+        if not corpo.get('stream'):
+            self._enviar(200, json.dumps({"choices": [{"message": {"role": "assistant", "content": conteudo}}], "usage": uso}))
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        try:
+            tamanho = self.configuracao.tamanho_trecho
+            for inicio in range(0, len(conteudo), tamanho):
+                self._enviar_trecho(json.dumps({"choices": [{"delta": {"content": conteudo[inicio:inicio + tamanho]}}]}))
+                time.sleep(self.configuracao.atraso_trecho)
+            self._enviar_trecho(json.dumps({"choices": [{"delta": {}, "finish_reason": "stop"}], "x_groq": {"usage": uso}}))
+            self._enviar_trecho("[DONE]")
+            self.wfile.write(b'0\r\n\r\n')
+        except (BrokenPipeError, ConnectionResetError):
+            # O cliente parou de ler (ex.: já recebeu as perguntas de que precisava)
+            pass
+
+
+class _ServidorHTTP(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Cliente que desiste no meio (ex.: prazo da chamada esgotado) não é erro do servidor
+        if not isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            super().handle_error(request, client_address)
+
+
+class ServidorLLMFalso:
+    """Servidor HTTP local no formato de chat completions da Groq (com e sem streaming)."""
+
+    def __init__(self, configuracao=None, porta=0):
+        self.configuracao = configuracao or ConfiguracaoLLM()
+        manipulador = type('Manipulador', (_Manipulador,), {'configuracao': self.configuracao})
+        self._servidor = _ServidorHTTP(('127.0.0.1', porta), manipulador)
+        self._thread = None
+
+    @property
+    def url(self):
+        host, porta = self._servidor.server_address[:2]
+        return f"http://{host}:{porta}/openai/v1/chat/completions"
+
+    def iniciar(self):
+        self._thread = threading.Thread(target=self._servidor.serve_forever, name="llm-falso", daemon=True)
+        self._thread.start()
+        return self
+
+    def parar(self):
+        self._servidor.shutdown()
+        self._servidor.server_close()
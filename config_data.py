@@ -28,6 +28,12 @@ metas_pontuacao_andromeda = {
     5: {'meta': 7500, 'nome': 'Kepler-186f'},
 }
 
+# 🔹 Metas de cada trilha (novas trilhas só precisam ser registradas aqui)
+metas_por_jogo = {
+    'via_lactea': metas_pontuacao_via_lactea,
+    'andromeda': metas_pontuacao_andromeda,
+}
+
 # 🔹 Temas e Contextos de Dificuldade para geração de perguntas
 temas_disponiveis = {
     'sintaxe': 'Sintaxe, com foco em Sujeito e Predicado (tipos, concordância), e Objetos Direto e Indireto (diferenciação, uso da preposição). Inclua exemplos práticos para identificar essas funções.',
@@ -36,6 +42,14 @@ temas_disponiveis = {
     'revisao_geral': "Revise os conceitos de sintaxe, morfologia e pragmática, focando na identificação de erros de concordância, regência, crase e pontuação. As questões devem apresentar textos com desvios gramaticais para o aluno corrigir ou identificar o erro."
 }
 
+# 🔹 Subtópicos de cada tema (usados para dividir a geração em partes sem repetir assunto)
+subtemas_por_tema = {
+    'sintaxe': ['Sujeito e seus tipos', 'Predicado e concordância verbal', 'Objeto direto e objeto indireto', 'Uso da preposição nos complementos verbais'],
+    'pragmatica': ['Atos de fala diretos e indiretos', 'Ironia e humor', 'Pressuposição e implicatura', 'Dêixis e regras de cortesia'],
+    'morfologia': ['Radical e afixos (prefixos e sufixos)', 'Vogal temática', 'Desinências e flexão das palavras', 'Classificação morfológica das palavras'],
+    'revisao_geral': ['Concordância verbal e nominal', 'Regência verbal e nominal', 'Uso da crase', 'Pontuação'],
+}
+
 contexto_dificuldade = {
     'facil': "Elabore a pergunta com vocabulário mais simples, com foco em conteúdos básicos e exemplos acessíveis.",
     'medio': "Use nível intermediário de complexidade, com exemplos contextualizados e exigência razoável de análise.",
@@ -0,0 +1,73 @@
+# tests/test_andromeda.py
+
+import os
+import unicodedata
+
+# Sem Firebase e sem threads de reposição: o teste controla o pool
+os.environ.setdefault('CONFIG_JWT', 'x' * 40)
+os.environ['CONFIG_FIREBASE'] = ''
+for variavel in ('POOL_PERGUNTAS_ATIVO', 'POOL_TEXTOS_ATIVO', 'COLETA_RESERVAS_ATIVA'):
+    os.environ[variavel] = '0'
+
+import pytest
+
+import api.andromeda as andromeda
+from app import create_app
+from benchmarks.firestore_memoria import FirestoreMemoria
+from utils.pool_textos import id_do_texto
+
+TEXTO = "Ontem eu fui na escola, e a gente se divertimos muito."
+ERROS = [
+    {"trecho": "na escola", "correcao": "à escola", "tipo": "regência"},
+    {"trecho": "a gente se divertimos", "correcao": "a gente se divertiu", "tipo": "concordância"},
+]
+CORRECAO = "Ontem eu fui à escola, e a gente se divertiu muito."
+
+
+@pytest.fixture
+def cliente(monkeypatch):
+    app = create_app()
+    app.config['DB'] = FirestoreMemoria()
+    andromeda.pool_textos.admitir({"texto": TEXTO, "erros": ERROS}, persistir=False)
+
+    monkeypatch.setattr(andromeda, 'chamar_groq', lambda *args, **kwargs: (None, 503))
+    return app.test_client()
+
+
+def test_correcao_encontra_o_gabarito_pelo_id_mesmo_com_o_original_alterado(cliente):
+    # O cliente devolveu o original com espaços a mais e em outra normalização Unicode
+    original_alterado = unicodedata.normalize('NFD', "  " + TEXTO.replace(" ", "  ") + "\n")
+    resposta = cliente.post('/andromeda/correcao', json={
+        "original": original_alterado, "correcao": CORRECAO, "id_texto": id_do_texto(TEXTO)
+    })
+
+    dados = resposta.get_json()
+    assert resposta.status_code == 200
+    assert dados['total_erros'] == 2
+    assert dados['nota'] == 10
+    assert dados['origem_avaliacao'] == 'local'
+
+
+def test_correcao_sem_id_usa_o_hash_do_original(cliente):
+    resposta = cliente.post('/andromeda/correcao', json={"original": TEXTO, "correcao": CORRECAO})
+    dados = resposta.get_json()
+    assert dados['total_erros'] == 2
+    assert dados['nota'] == 10
+
+
+def test_correcao_sem_id_e_original_alterado_fica_sem_gabarito(cliente):
+    resposta = cliente.post('/andromeda/correcao', json={"original": TEXTO.replace(" ", "  "), "correcao": CORRECAO})
+    dados = resposta.get_json()
+    assert resposta.status_code == 200
+    assert dados['total_erros'] == 0
+    assert dados['nota'] is None
+
+
+def test_correcao_com_id_desconhecido_nao_usa_o_hash(cliente):
+    resposta = cliente.post('/andromeda/correcao', json={"original": TEXTO, "correcao": CORRECAO, "id_texto": "nao-existe"})
+    assert resposta.get_json()['nota'] is None
+
+
+def test_correcao_com_id_invalido(cliente):
+    resposta = cliente.post('/andromeda/correcao', json={"original": TEXTO, "correcao": CORRECAO, "id_texto": 42})
+    assert resposta.status_code == 400
@@ -0,0 +1,148 @@
+# tests/test_controle_admissao.py
+
+import asyncio
+import threading
+import time
+
+from utils.controle_admissao import ControleAdmissao, estimar_tokens
+
+
+def _controle(**parametros):
+    padrao = dict(max_simultaneas=2, reserva_interativas=0, requisicoes_por_minuto=0, tokens_por_minuto=0, fila_maxima=10)
+    padrao.update(parametros)
+    return ControleAdmissao(**padrao)
+
+
+def _esperar(condicao, prazo=2):
+    limite = time.monotonic() + prazo
+    while not condicao():
+        assert time.monotonic() < limite, "condição não atingida a tempo"
+        time.sleep(0.005)
+
+
+def _em_thread(controle, resultados, rotulo, **kwargs):
+    def admitir():
+        resultados.append((rotulo, controle.admitir(**kwargs)))
+    thread = threading.Thread(target=admitir)
+    thread.start()
+    return thread
+
+
+def test_estimar_tokens_soma_prompt_e_saida_esperada():
+    assert estimar_tokens("a" * 400, "b" * 400, 'interativa') == 200 + 300
+    assert estimar_tokens("", "", 'lote') == 2500
+
+
+def test_recusa_por_prazo_quando_nao_ha_vaga():
+    controle = _controle()
+    assert controle.admitir(espera_maxima=0.05)
+    assert controle.admitir(espera_maxima=0.05)
+    assert not controle.admitir(espera_maxima=0.05)
+
+    estado = controle.estado()
+    assert estado['em_andamento'] == 2
+    assert estado['na_fila'] == 0
+    assert estado['recusadas_prazo'] == 1
+
+
+def test_liberar_admite_quem_esta_esperando():
+    controle = _controle(max_simultaneas=1)
+    assert controle.admitir()
+    resultados = []
+    thread = _em_thread(controle, resultados, 'segunda', espera_maxima=2)
+    _esperar(lambda: controle.estado()['na_fila'] == 1)
+
+    controle.liberar()
+    thread.join()
+    assert resultados == [('segunda', True)]
+    assert controle.estado()['em_andamento'] == 1
+
+
+def test_vagas_reservadas_para_interativas():
+    controle = _controle(max_simultaneas=2, reserva_interativas=1)
+    assert controle.admitir('lote', espera_maxima=0.05)
+    assert not controle.admitir('lote', espera_maxima=0.05)
+    assert controle.admitir('interativa', espera_maxima=0.05)
+
+
+def test_interativa_passa_na_frente_do_lote():
+    controle = _controle(max_simultaneas=1)
+    assert controle.admitir()
+    resultados = []
+    lote = _em_thread(controle, resultados, 'lote', prioridade='lote', espera_maxima=2)
+    _esperar(lambda: controle.estado()['na_fila'] == 1)
+    interativa = _em_thread(controle, resultados, 'interativa', espera_maxima=2)
+    _esperar(lambda: controle.estado()['na_fila'] == 2)
+
+    controle.liberar()
+    interativa.join()
+    assert resultados == [('interativa', True)]
+    controle.liberar()
+    lote.join()
+    assert resultados == [('interativa', True), ('lote', True)]
+
+
+def test_fila_cheia_recusa_na_hora():
+    controle = _controle(max_simultaneas=1, fila_maxima=1)
+    assert controle.admitir()
+    resultados = []
+    thread = _em_thread(controle, resultados, 'na_fila', espera_maxima=2)
+    _esperar(lambda: controle.estado()['na_fila'] == 1)
+
+    inicio = time.monotonic()
+    assert not controle.admitir(espera_maxima=2)
+    assert time.monotonic() - inicio < 0.5
+    assert controle.estado()['recusadas_fila_cheia'] == 1
+
+    controle.liberar()
+    thread.join()
+
+
+def test_balde_de_tokens_segura_ate_reabastecer():
+    # 600 tokens por minuto = 10 por segundo; o primeiro pedido esvazia o balde
+    controle = _controle(max_simultaneas=10, tokens_por_minuto=600)
+    assert controle.admitir(tokens=600, espera_maxima=0.05)
+
+    # Faltam 2 tokens (0,2 s): não dá dentro de 50 ms...
+    assert not controle.admitir(tokens=2, espera_maxima=0.05)
+    # ...mas dá dentro de 2 s, sem ninguém liberar vaga
+    inicio = time.monotonic()
+    assert controle.admitir(tokens=2, espera_maxima=2)
+    assert time.monotonic() - inicio < 1
+
+
+def test_pedido_acima_da_capacidade_do_balde_nao_trava():
+    controle = _controle(tokens_por_minuto=60)
+    assert controle.admitir(tokens=10_000, espera_maxima=0.05)
+
+
+def test_admitir_async_respeita_vaga_e_prazo():
+    controle = _controle(max_simultaneas=1)
+
+    async def cenario():
+        assert await controle.admitir_async(espera_maxima=0.05)
+        assert not await controle.admitir_async(espera_maxima=0.05)
+        esperando = asyncio.create_task(controle.admitir_async(espera_maxima=2))
+        await asyncio.sleep(0.05)
+        controle.liberar()
+        return await esperando
+
+    assert asyncio.run(cenario())
+    assert controle.estado()['em_andamento'] == 1
+
+
+def test_admitir_async_cancelado_devolve_a_vaga():
+    controle = _controle(max_simultaneas=1)
+
+    async def cenario():
+        assert await controle.admitir_async()
+        esperando = asyncio.create_task(controle.admitir_async(espera_maxima=2))
+        await asyncio.sleep(0.05)
+        esperando.cancel()
+        await asyncio.gather(esperando, return_exceptions=True)
+        controle.liberar()
+
+    asyncio.run(cenario())
+    estado = controle.estado()
+    assert estado['em_andamento'] == 0
+    assert estado['na_fila'] == 0
@@ -0,0 +1,81 @@
+# tests/test_correcao_local.py
+
+from utils.correcao_local import avaliar_correcao, juntar_tokens, tokenizar
+
+ORIGINAL = "Ontem eu fui na escola, mas a professora faltou."
+GABARITO = [{"trecho": "na escola", "correcao": "à escola"}]
+
+
+def test_tokenizar_separa_pontuacao_e_juntar_remonta():
+    tokens = tokenizar(ORIGINAL)
+    assert tokens[:4] == ["Ontem", "eu", "fui", "na"]
+    assert "," in tokens and tokens[-1] == "."
+    assert juntar_tokens(tokens) == ORIGINAL
+    assert tokenizar(None) == []
+
+
+def test_texto_inalterado():
+    resultado = avaliar_correcao(ORIGINAL, ORIGINAL)
+    assert resultado["inalterado"]
+    assert resultado["alteracoes"] == []
+    assert resultado["nota"] is None
+
+
+def test_sem_gabarito_lista_so_as_alteracoes():
+    resultado = avaliar_correcao(ORIGINAL, "Ontem eu fui à escola, mas a professora faltou.")
+    assert not resultado["inalterado"]
+    assert resultado["alteracoes"] == [{"original": "na", "aluno": "à"}]
+    assert resultado["total_erros"] == 0
+    assert resultado["alteracoes_extras"] == []
+
+
+def test_erro_corrigido():
+    resultado = avaliar_correcao(ORIGINAL, "Ontem eu fui à escola, mas a professora faltou.", GABARITO)
+    erro, = resultado["avaliacao_erros"]
+    assert erro["situacao"] == "corrigido"
+    assert erro["resposta_aluno"] == "à escola"
+    assert resultado["nota"] == 10
+
+
+def test_erro_nao_corrigido():
+    resultado = avaliar_correcao(ORIGINAL, ORIGINAL, GABARITO)
+    assert resultado["avaliacao_erros"][0]["situacao"] == "nao_corrigido"
+    assert resultado["nota"] == 0
+
+
+def test_erro_alterado_de_outro_jeito():
+    resultado = avaliar_correcao(ORIGINAL, "Ontem eu fui para a escola, mas a professora faltou.", GABARITO)
+    erro, = resultado["avaliacao_erros"]
+    assert erro["situacao"] == "alterado_diferente"
+    assert erro["resposta_aluno"] == "para a escola"
+
+
+def test_comparacao_ignora_maiusculas():
+    resultado = avaliar_correcao(ORIGINAL, "Ontem eu fui À ESCOLA, mas a professora faltou.", GABARITO)
+    assert resultado["avaliacao_erros"][0]["situacao"] == "corrigido"
+
+
+def test_correcao_que_contem_o_trecho_errado():
+    # A segunda correção contém o trecho errado inteiro: precisa ser testada antes dele
+    original = "Eles foi ao cinema."
+    erros = [{"trecho": "foi", "correcao": "foram"}, {"trecho": "ao cinema", "correcao": "ao cinema ontem"}]
+    resultado = avaliar_correcao(original, "Eles foram ao cinema ontem.", erros)
+    assert [erro["situacao"] for erro in resultado["avaliacao_erros"]] == ["corrigido", "corrigido"]
+
+
+def test_alteracoes_fora_do_gabarito_e_nota_parcial():
+    original = "Ontem eu fui na escola e vi o Pedro, mas a professora faltou."
+    erros = GABARITO + [{"trecho": "o Pedro,", "correcao": "o Pedro;"}]
+    aluno = "Ontem eu fui à escola e vi o Pedro, mas a diretora faltou."
+    resultado = avaliar_correcao(original, aluno, erros)
+
+    assert [erro["situacao"] for erro in resultado["avaliacao_erros"]] == ["corrigido", "nao_corrigido"]
+    assert resultado["alteracoes_extras"] == [{"original": "professora", "aluno": "diretora"}]
+    assert resultado["erros_corrigidos"] == 1
+    assert resultado["nota"] == 5
+
+
+def test_trecho_que_nao_esta_no_texto_e_ignorado():
+    resultado = avaliar_correcao(ORIGINAL, ORIGINAL, [{"trecho": "nos livros", "correcao": "nos livros"}])
+    assert resultado["avaliacao_erros"] == []
+    assert resultado["nota"] is None
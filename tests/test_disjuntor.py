@@ -0,0 +1,152 @@
+# tests/test_disjuntor.py
+
+import pytest
+
+import utils.disjuntor as modulo_disjuntor
+from utils.disjuntor import ABERTO, FECHADO, MEIO_ABERTO, Disjuntor
+
+
+class Relogio:
+    """Substitui o módulo time do disjuntor para o teste controlar o tempo."""
+
+    def __init__(self):
+        self.agora = 1000.0
+
+    def monotonic(self):
+        return self.agora
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    relogio = Relogio()
+    monkeypatch.setattr(modulo_disjuntor, 'time', relogio)
+    return relogio
+
+
+def _disjuntor(**parametros):
+    padrao = dict(janela=4, minimo=4, taxa_erro=0.5, latencia_lenta=10, tempo_aberto=30, sondas=2)
+    padrao.update(parametros)
+    return Disjuntor(**padrao)
+
+
+def _chamar(disjuntor, status, latencia=0.1):
+    permissao = disjuntor.permitir()
+    assert permissao is not None
+    disjuntor.registrar(permissao, status, latencia)
+    return permissao
+
+
+def _abrir(disjuntor):
+    for _ in range(4):
+        _chamar(disjuntor, 503)
+    assert disjuntor.estado()['estado'] == ABERTO
+
+
+def test_fecha_abaixo_da_taxa_de_erro(relogio):
+    disjuntor = _disjuntor()
+    for status in (200, 500, 200, 200):
+        _chamar(disjuntor, status)
+    assert disjuntor.estado()['estado'] == FECHADO
+
+
+def test_espera_o_minimo_de_chamadas_antes_de_abrir(relogio):
+    disjuntor = _disjuntor()
+    for _ in range(3):
+        _chamar(disjuntor, 500)
+    assert disjuntor.estado()['estado'] == FECHADO
+    _chamar(disjuntor, 500)
+    assert disjuntor.estado()['estado'] == ABERTO
+
+
+def test_chamadas_lentas_contam_como_falha(relogio):
+    disjuntor = _disjuntor()
+    for _ in range(2):
+        _chamar(disjuntor, 200, latencia=0.1)
+    for _ in range(2):
+        _chamar(disjuntor, 200, latencia=12)
+    assert disjuntor.estado()['estado'] == ABERTO
+
+
+def test_erro_da_requisicao_nao_conta_como_falha(relogio):
+    disjuntor = _disjuntor()
+    for _ in range(4):
+        _chamar(disjuntor, 400)
+    assert disjuntor.estado()['estado'] == FECHADO
+
+
+def test_aberto_recusa_ate_o_fim_do_prazo(relogio):
+    disjuntor = _disjuntor()
+    _abrir(disjuntor)
+
+    relogio.agora += 29
+    assert disjuntor.permitir() is None
+    estado = disjuntor.estado()
+    assert estado['recusadas'] == 1
+    assert estado['proxima_sonda_em'] == 1
+
+
+def test_meio_aberto_deixa_passar_so_as_sondas(relogio):
+    disjuntor = _disjuntor()
+    _abrir(disjuntor)
+    relogio.agora += 30
+
+    assert disjuntor.permitir() == 'sonda'
+    assert disjuntor.estado()['estado'] == MEIO_ABERTO
+    assert disjuntor.permitir() == 'sonda'
+    assert disjuntor.permitir() is None
+
+
+def test_sondas_bem_sucedidas_fecham_o_circuito(relogio):
+    disjuntor = _disjuntor()
+    _abrir(disjuntor)
+    relogio.agora += 30
+
+    primeira, segunda = disjuntor.permitir(), disjuntor.permitir()
+    disjuntor.registrar(primeira, 200, 0.1)
+    assert disjuntor.estado()['estado'] == MEIO_ABERTO
+    # Uma sonda já deu certo: só cabe mais a que está em andamento
+    assert disjuntor.permitir() is None
+    disjuntor.registrar(segunda, 200, 0.1)
+
+    estado = disjuntor.estado()
+    assert estado['estado'] == FECHADO
+    assert estado['chamadas_recentes'] == 0
+    assert disjuntor.permitir() == 'normal'
+
+
+def test_sonda_que_falha_abre_de_novo(relogio):
+    disjuntor = _disjuntor()
+    _abrir(disjuntor)
+    relogio.agora += 30
+
+    disjuntor.registrar(disjuntor.permitir(), 503, 0.1)
+    estado = disjuntor.estado()
+    assert estado['estado'] == ABERTO
+    assert estado['aberturas'] == 2
+    assert disjuntor.permitir() is None
+
+
+def test_sonda_nao_realizada_devolve_a_vaga(relogio):
+    disjuntor = _disjuntor(sondas=1)
+    _abrir(disjuntor)
+    relogio.agora += 30
+
+    sonda = disjuntor.permitir()
+    assert disjuntor.permitir() is None
+    disjuntor.registrar(sonda, None, 0)
+    assert disjuntor.estado()['estado'] == MEIO_ABERTO
+    assert disjuntor.permitir() == 'sonda'
+
+
+def test_chamada_antiga_nao_interfere_depois_de_abrir(relogio):
+    disjuntor = _disjuntor()
+    antiga = disjuntor.permitir()
+    _abrir(disjuntor)
+    relogio.agora += 30
+    sonda = disjuntor.permitir()
+
+    # Chamada normal que terminou com o circuito já meio aberto: ignorada
+    disjuntor.registrar(antiga, 503, 0.1)
+    assert disjuntor.estado()['estado'] == MEIO_ABERTO
+    disjuntor.registrar(sonda, 200, 0.1)
+    assert disjuntor.estado()['estado'] == MEIO_ABERTO
@@ -0,0 +1,117 @@
+# tests/test_extrator_json.py
+
+import json
+
+import pytest
+
+from utils.extrator_json import (
+    ExtratorObjetosJSON, extrair_json, extrair_perguntas, remover_virgulas_finais, validar_pergunta
+)
+
+
+def _pergunta(**campos):
+    pergunta = {
+        "pergunta": "Qual é o plural de 'cidadão'?",
+        "alternativas": {"A": "cidadões", "B": "cidadãos", "C": "cidadães", "D": "cidadãoes"},
+        "resposta": "B",
+        "explicacao": "O plural de 'cidadão' é 'cidadãos'."
+    }
+    pergunta.update(campos)
+    return pergunta
+
+
+# ============================================================
+# 🔹 validar_pergunta
+# ============================================================
+def test_pergunta_completa_e_valida():
+    assert validar_pergunta(_pergunta())
+    assert validar_pergunta(_pergunta(resposta=" b "))
+
+
+@pytest.mark.parametrize("campos", [
+    {"pergunta": "  "},
+    {"resposta": "E"},
+    {"resposta": None},
+    {"explicacao": ""},
+    {"alternativas": {"A": "x", "B": "y", "C": "z"}},
+    {"alternativas": {"A": "x", "B": "y", "C": "z", "D": " "}},
+])
+def test_pergunta_incompleta_e_invalida(campos):
+    assert not validar_pergunta(_pergunta(**campos))
+
+
+def test_pergunta_que_nao_e_dicionario_e_invalida():
+    assert not validar_pergunta(["pergunta"])
+
+
+# ============================================================
+# 🔹 extrair_json
+# ============================================================
+def test_remove_virgulas_finais_fora_das_strings():
+    assert remover_virgulas_finais('{"a": [1, 2,], "b": ",}",}') == '{"a": [1, 2], "b": ",}"}'
+    assert remover_virgulas_finais('[{"a": 1},\n  ]') == '[{"a": 1}\n  ]'
+    assert remover_virgulas_finais('{"a": "x\\",", "b": 2}') == '{"a": "x\\",", "b": 2}'
+
+
+def test_remove_virgulas_finais_em_texto_grande():
+    texto = '[' + '{"a": [1,],},' * 50_000 + ']'
+    assert json.loads(remover_virgulas_finais(texto)) == [{"a": [1]}] * 50_000
+
+
+def test_extrai_json_com_cerca_e_texto_em_volta():
+    texto = 'Claro! Aqui está:\n```json\n{"erros": [{"trecho": "a", "correcao": "b",}],}\n```\nBons estudos!'
+    assert extrair_json(texto) == {"erros": [{"trecho": "a", "correcao": "b"}]}
+
+
+def test_tipo_restringe_o_que_e_procurado():
+    texto = 'Resumo {não é JSON} e a lista: [1, 2, 3]'
+    assert extrair_json(texto, list) == [1, 2, 3]
+
+
+def test_array_truncado_devolve_os_objetos_completos():
+    texto = '[{"id": 1}, {"id": 2}, {"id": 3, "pergunta": "Qual'
+    assert extrair_json(texto) == [{"id": 1}, {"id": 2}]
+
+
+@pytest.mark.parametrize("texto", [None, "", "sem json nenhum", '{"a": 1'])
+def test_sem_json_aproveitavel_lanca_value_error(texto):
+    with pytest.raises(ValueError):
+        extrair_json(texto)
+
+
+# ============================================================
+# 🔹 extrair_perguntas
+# ============================================================
+def test_descarta_invalidas_e_renumera():
+    texto = json.dumps([_pergunta(id=7), _pergunta(resposta="Z"), _pergunta(id=9, resposta="c")])
+    perguntas = extrair_perguntas(texto)
+
+    assert [pergunta["id"] for pergunta in perguntas] == [1, 2]
+    assert [pergunta["resposta"] for pergunta in perguntas] == ["B", "C"]
+
+
+def test_aceita_array_embrulhado_em_objeto():
+    texto = json.dumps({"perguntas": [_pergunta()]})
+    assert len(extrair_perguntas(texto)) == 1
+
+
+def test_sem_pergunta_valida_lanca_value_error():
+    with pytest.raises(ValueError):
+        extrair_perguntas(json.dumps([_pergunta(resposta="X")]))
+
+
+# ============================================================
+# 🔹 ExtratorObjetosJSON (streaming)
+# ============================================================
+def test_extrator_devolve_cada_objeto_quando_fecha():
+    extrator = ExtratorObjetosJSON()
+    pedacos = ['```json\n[{"id": 1, "texto": "chave } e', ' aspas \\" dentro"}', ', {"id"', ': 2, "sub": {"x": 1}}]']
+
+    resultados = [extrator.alimentar(pedaco) for pedaco in pedacos]
+
+    assert resultados == [[], [{"id": 1, "texto": 'chave } e aspas " dentro'}], [], [{"id": 2, "sub": {"x": 1}}]]
+
+
+def test_extrator_descarta_so_o_objeto_malformado():
+    objetos = ExtratorObjetosJSON().alimentar('[{"id": 1}, {"id": }, {"id": 3,}]')
+    assert objetos == [{"id": 1}, {"id": 3}]
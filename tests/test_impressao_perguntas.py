@@ -0,0 +1,59 @@
+# tests/test_impressao_perguntas.py
+
+from utils.impressao_perguntas import (
+    IndiceSimilaridade, VistasRecentemente, assinatura, filtrar_distintas, impressao, normalizar_texto, similaridade
+)
+
+
+def _pergunta(enunciado, alternativas=("casa", "casas", "casaes", "casões")):
+    return {"pergunta": enunciado, "alternativas": dict(zip("ABCD", alternativas))}
+
+
+ORIGINAL = _pergunta("Qual é o plural correto da palavra casa na norma padrão da língua portuguesa?")
+PARAFRASE = _pergunta("Qual é o plural correto da palavra casa na norma padrão da língua portuguesa hoje?")
+OUTRA = _pergunta("Em qual frase o uso da crase está correto?", ("Vou à escola", "Vou à pé", "Refiro-me à você", "Fui à Roma"))
+
+
+def test_normalizar_tira_acentos_pontuacao_e_espacos():
+    assert normalizar_texto("  Qual É a   CRASE, afinal?! ") == "qual e a crase afinal"
+    assert normalizar_texto(None) == ""
+
+
+def test_impressao_ignora_diferencas_de_forma():
+    assert impressao({"pergunta": "Qual é a crase?"}) == impressao({"pergunta": "qual  e a CRASE"})
+    assert impressao({"pergunta": "Qual é a crase?"}) != impressao({"pergunta": "Qual é o acento?"})
+
+
+def test_similaridade_separa_parafrase_de_questao_diferente():
+    base = assinatura(ORIGINAL)
+    assert similaridade(base, assinatura(ORIGINAL)) == 1
+    assert similaridade(base, assinatura(PARAFRASE)) >= 0.6
+    assert similaridade(base, assinatura(OUTRA)) < 0.3
+
+
+def test_indice_adiciona_so_as_ineditas():
+    indice = IndiceSimilaridade(limiar=0.6)
+    assert indice.adicionar_se_inedita(assinatura(ORIGINAL))
+    assert not indice.adicionar_se_inedita(assinatura(PARAFRASE))
+    assert indice.adicionar_se_inedita(assinatura(OUTRA))
+    assert indice.similar(assinatura(OUTRA))
+
+
+def test_filtrar_distintas_mantem_a_ordem_e_respeita_existentes():
+    assert filtrar_distintas([OUTRA, ORIGINAL, PARAFRASE]) == [OUTRA, ORIGINAL]
+    assert filtrar_distintas([PARAFRASE, OUTRA], existentes=[ORIGINAL]) == [OUTRA]
+
+
+def test_vistas_recentes_guarda_as_ultimas_por_aluno():
+    vistas = VistasRecentemente(max_por_aluno=2, ttl=60, max_alunos=10)
+    vistas.registrar("aluno1", [ORIGINAL, OUTRA])
+    vistas.registrar("aluno1", [PARAFRASE])
+
+    assert vistas.obter("aluno1") == {impressao(OUTRA), impressao(PARAFRASE)}
+    assert vistas.obter("aluno2") == set()
+
+
+def test_vistas_recentes_ignora_aluno_anonimo():
+    vistas = VistasRecentemente(max_por_aluno=2, ttl=60, max_alunos=10)
+    vistas.registrar(None, [ORIGINAL])
+    assert vistas.obter(None) == set()
@@ -0,0 +1,56 @@
+# utils/alocador_ids.py
+
+import os
+import threading
+from utils.inicializacao import transacional
+
+TAMANHO_BLOCO_IDS = int(os.getenv("TAMANHO_BLOCO_IDS", "10"))
+
+
+@transacional
+def _incrementar_contador(transaction, contador_ref, quantidade):
+    """Soma `quantidade` ao contador dentro de uma transação e devolve o último ID usado antes."""
+    contador_doc = contador_ref.get(transaction=transaction).to_dict()
+    if not contador_doc or contador_doc.get('id') is None:
+        raise ValueError("Documento de controle de ID inválido.")
+
+    ultimo_id = int(contador_doc.get('id'))
+    transaction.update(contador_ref, {'id': ultimo_id + quantidade})
+    return ultimo_id
+
+
+class AlocadorIds:
+    """
+    Gera IDs sequenciais de alunos a partir de 'controle_id/contador'.
+
+    Cada processo reserva um bloco de IDs com uma única transação e distribui
+    os IDs do bloco localmente. Assim os cadastros não disputam o mesmo
+    documento a cada aluno e dois processos nunca recebem o mesmo ID (pode
+    haver lacunas na numeração quando um processo termina com IDs sobrando).
+    """
+
+    def __init__(self, tamanho_bloco=TAMANHO_BLOCO_IDS):
+        self.tamanho_bloco = tamanho_bloco
+        self._proximo = 0
+        self._fim = -1  # último ID do bloco atual (inclusive)
+        self._lock = threading.Lock()
+
+    def reservar(self, db, quantidade):
+        """Reserva `quantidade` IDs consecutivos direto no contador (uma transação)."""
+        contador_ref = db.collection('controle_id').document('contador')
+        ultimo_id = _incrementar_contador(db.transaction(), contador_ref, quantidade)
+        return list(range(ultimo_id + 1, ultimo_id + quantidade + 1))
+
+    def proximo_id(self, db):
+        """Retorna o próximo ID livre, reservando um novo bloco quando o atual acaba."""
+        with self._lock:
+            if self._proximo > self._fim:
+                bloco = self.reservar(db, self.tamanho_bloco)
+                self._proximo, self._fim = bloco[0], bloco[-1]
+
+            novo_id = self._proximo
+            self._proximo += 1
+            return novo_id
+
+
+alocador_ids = AlocadorIds()
@@ -0,0 +1,55 @@
+# utils/cache_lru.py
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class CacheLRU:
+    """
+    Cache em memória com limite de itens (descarta o menos usado) e,
+    opcionalmente, validade em segundos (ttl). Seguro para várias threads.
+    """
+
+    def __init__(self, max_itens=1024, ttl=None):
+        self.max_itens = max_itens
+        self.ttl = ttl
+        self._itens = OrderedDict()  # chave -> (valor, expira_em)
+        self._lock = threading.Lock()
+
+    def obter(self, chave, padrao=None):
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None:
+                return padrao
+            valor, expira_em = item
+            if expira_em is not None and time.monotonic() >= expira_em:
+                del self._itens[chave]
+                return padrao
+            self._itens.move_to_end(chave)
+            return valor
+
+    def definir(self, chave, valor):
+        expira_em = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._itens[chave] = (valor, expira_em)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+
+    def remover(self, chave):
+        with self._lock:
+            self._itens.pop(chave, None)
+
+    def remover_se(self, condicao):
+        """Remove os itens cujo (chave, valor) satisfaz a condição."""
+        with self._lock:
+            for chave in [c for c, (v, _) in self._itens.items() if condicao(c, v)]:
+                del self._itens[chave]
+
+    def limpar(self):
+        with self._lock:
+            self._itens.clear()
+
+    def __len__(self):
+        return len(self._itens)
@@ -0,0 +1,132 @@
+# utils/cache_reservas.py
+
+import os
+import random
+import threading
+import time
+from utils.impressao_perguntas import filtrar_distintas, impressao
+
+CACHE_RESERVAS_TTL = float(os.getenv("CACHE_RESERVAS_TTL", "600"))
+# Posições sorteadas por pergunta pedida, antes de descartar as já vistas pelo aluno
+SORTEIO_FATOR = 4
+
+
+class CacheReservas:
+    """
+    Cópia local do banco 'perguntas_reserva', separada por (nivel, tema).
+
+    Cada partição é carregada do Firestore uma única vez e recarregada quando
+    passa do TTL. Assim, sortear perguntas de reserva vira uma operação em
+    memória, sem varrer a coleção a cada contingência. Se a recarga falhar,
+    a cópia antiga continua sendo usada. Na carga, as quase-repetidas do
+    banco são descartadas e cada pergunta ganha sua impressão digital.
+    """
+
+    def __init__(self, ttl=CACHE_RESERVAS_TTL):
+        self.ttl = ttl
+        self._particoes = {}      # (nivel, tema) -> (lista de (pergunta, impressão), carregado_em)
+        self._locks = {}
+        self._lock = threading.Lock()
+        self._metricas = {'acertos': 0, 'faltas': 0, 'recargas': 0, 'erros_recarga': 0}
+
+    def _lock_da_particao(self, chave):
+        with self._lock:
+            return self._locks.setdefault(chave, threading.Lock())
+
+    def _contar(self, metrica):
+        with self._lock:
+            self._metricas[metrica] += 1
+
+    def _carregar(self, db, nivel, tema):
+        """Lê a partição (nivel, tema) inteira do Firestore."""
+        query = db.collection('perguntas_reserva').where('nivel', '==', nivel).where('tema', '==', tema).stream()
+
+        perguntas = []
+        for doc in query:
+            pergunta_data = doc.to_dict()
+            # Metadados da coleta automática (utils.coleta_reservas), que não vão para o aluno
+            pergunta_data.pop('criado_em', None)
+            pergunta_data.pop('origem', None)
+            # Tenta converter o ID (nome do documento) para int, senão mantém como string
+            try:
+                pergunta_data['id'] = int(doc.id)
+            except ValueError:
+                pergunta_data['id'] = doc.id
+            perguntas.append(pergunta_data)
+
+        distintas = filtrar_distintas(perguntas)
+        if len(distintas) < len(perguntas):
+            print(f"⚠️ {len(perguntas) - len(distintas)} perguntas repetidas ignoradas nas reservas ({nivel}/{tema}).")
+        return [(pergunta, impressao(pergunta)) for pergunta in distintas]
+
+    def obter_particao(self, db, nivel, tema):
+        """Retorna as perguntas da partição, recarregando se estiver vencida."""
+        chave = (nivel, tema)
+        particao = self._particoes.get(chave)
+        if particao and time.monotonic() - particao[1] < self.ttl:
+            self._contar('acertos')
+            return particao[0]
+
+        self._contar('faltas')
+        with self._lock_da_particao(chave):
+            # Outra thread pode ter recarregado enquanto esperávamos o lock
+            particao = self._particoes.get(chave)
+            if particao and time.monotonic() - particao[1] < self.ttl:
+                return particao[0]
+            try:
+                perguntas = self._carregar(db, nivel, tema)
+            except Exception as e:
+                self._contar('erros_recarga')
+                print(f"❌ Erro ao recarregar reservas ({nivel}/{tema}): {e}")
+                return particao[0] if particao else []
+
+            self._particoes[chave] = (perguntas, time.monotonic())
+            self._contar('recargas')
+            return perguntas
+
+    def sortear(self, db, nivel, tema, limite, evitar=None):
+        """
+        Sorteia até `limite` perguntas da partição, dando preferência às que
+        não estão em `evitar` (impressões vistas recentemente pelo aluno).
+        Só repete perguntas vistas se as inéditas não forem suficientes.
+
+        O sorteio é por rejeição: sorteia até SORTEIO_FATOR * limite posições
+        e descarta as vistas, sem percorrer a partição inteira. Só quando o
+        aluno já viu boa parte dela a partição é filtrada por completo.
+        """
+        perguntas = self.obter_particao(db, nivel, tema)
+        if not evitar:
+            selecionadas = random.sample(perguntas, min(limite, len(perguntas)))
+            # Cópias rasas, para a rota não alterar o cache
+            return [dict(pergunta) for pergunta, _ in selecionadas]
+
+        sorteadas = random.sample(perguntas, min(limite * SORTEIO_FATOR, len(perguntas)))
+        ineditas = [item for item in sorteadas if item[1] not in evitar]
+        if len(ineditas) < limite and len(sorteadas) < len(perguntas):
+            # Poucas inéditas entre as sorteadas: procura em toda a partição
+            sorteadas = perguntas
+            ineditas = [item for item in perguntas if item[1] not in evitar]
+            ineditas = random.sample(ineditas, min(limite, len(ineditas)))
+
+        selecionadas = ineditas[:limite]
+        if len(selecionadas) < limite:
+            vistas = [item for item in sorteadas if item[1] in evitar]
+            selecionadas += random.sample(vistas, min(limite - len(selecionadas), len(vistas)))
+        return [dict(pergunta) for pergunta, _ in selecionadas]
+
+    def invalidar(self, nivel=None, tema=None):
+        """Descarta uma partição (ou todas), forçando nova leitura do Firestore."""
+        with self._lock:
+            if nivel is None:
+                self._particoes.clear()
+            else:
+                self._particoes.pop((nivel, tema), None)
+
+    def metricas(self):
+        with self._lock:
+            dados = dict(self._metricas)
+            dados['particoes'] = {f"{nivel}/{tema}": len(perguntas) for (nivel, tema), (perguntas, _) in self._particoes.items()}
+        return dados
+
+
+cache_reservas = CacheReservas()
@@ -0,0 +1,120 @@
+# utils/cache_respostas.py
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from utils.cache_lru import CacheLRU
+
+GROQ_CACHE_MAX_ITENS = int(os.getenv("GROQ_CACHE_MAX_ITENS", "2000"))
+GROQ_CACHE_TTL = float(os.getenv("GROQ_CACHE_TTL", "86400"))
+# Caminho de um arquivo SQLite para manter o cache entre reinícios (opcional)
+GROQ_CACHE_SQLITE = os.getenv("GROQ_CACHE_SQLITE")
+
+
+class CacheRespostas:
+    """
+    Cache de respostas da IA endereçado pelo conteúdo da chamada
+    (modelo, mensagem de sistema, prompt e temperatura).
+
+    Tem dois níveis: um LRU em memória e, se configurado, um arquivo SQLite
+    local. Também faz "single-flight": chamadas idênticas simultâneas esperam
+    a primeira terminar e reaproveitam o resultado, em vez de irem todas à Groq.
+    """
+
+    def __init__(self, max_itens=GROQ_CACHE_MAX_ITENS, ttl=GROQ_CACHE_TTL, caminho_sqlite=GROQ_CACHE_SQLITE):
+        self.ttl = ttl
+        self._memoria = CacheLRU(max_itens, ttl)
+        self._lock = threading.Lock()
+        self._em_andamento = {}  # chave -> (Event, resultado)
+        self._metricas = {'acertos_memoria': 0, 'acertos_disco': 0, 'faltas': 0, 'compartilhadas': 0}
+        self._sqlite = None
+        if caminho_sqlite:
+            try:
+                self._sqlite = sqlite3.connect(caminho_sqlite, check_same_thread=False)
+                self._sqlite.execute(
+                    "CREATE TABLE IF NOT EXISTS respostas (chave TEXT PRIMARY KEY, valor TEXT, expira_em REAL)"
+                )
+                self._sqlite.commit()
+            except sqlite3.Error as e:
+                print(f"⚠️ Cache em disco da Groq desativado: {e}")
+                self._sqlite = None
+
+    @staticmethod
+    def chave(modelo, mensagem_sistema, mensagem_user, temperatura):
+        conteudo = json.dumps([modelo, mensagem_sistema, mensagem_user, temperatura], ensure_ascii=False)
+        return hashlib.sha256(conteudo.encode('utf-8')).hexdigest()
+
+    def _contar(self, metrica):
+        with self._lock:
+            self._metricas[metrica] += 1
+
+    def obter(self, chave):
+        valor = self._memoria.obter(chave)
+        if valor is not None:
+            self._contar('acertos_memoria')
+            return valor
+
+        if self._sqlite is not None:
+            with self._lock:
+                linha = self._sqlite.execute(
+                    "SELECT valor FROM respostas WHERE chave = ? AND expira_em > ?", (chave, time.time())
+                ).fetchone()
+            if linha:
+                self._memoria.definir(chave, linha[0])
+                self._contar('acertos_disco')
+                return linha[0]
+
+        self._contar('faltas')
+        return None
+
+    def definir(self, chave, valor):
+        self._memoria.definir(chave, valor)
+        if self._sqlite is not None:
+            with self._lock:
+                self._sqlite.execute(
+                    "INSERT OR REPLACE INTO respostas (chave, valor, expira_em) VALUES (?, ?, ?)",
+                    (chave, valor, time.time() + self.ttl)
+                )
+                self._sqlite.commit()
+
+    def unico_voo(self, chave, funcao):
+        """
+        Executa funcao() uma única vez por chave entre as chamadas simultâneas;
+        as demais esperam e recebem o mesmo resultado.
+        """
+        with self._lock:
+            em_andamento = self._em_andamento.get(chave)
+            lider = em_andamento is None
+            if lider:
+                em_andamento = (threading.Event(), [])
+                self._em_andamento[chave] = em_andamento
+            else:
+                self._metricas['compartilhadas'] += 1
+
+        evento, caixa = em_andamento
+        if not lider:
+            evento.wait()
+            return caixa[0]
+
+        try:
+            caixa.append(funcao())
+            return caixa[0]
+        except BaseException:
+            caixa.append((None, 500))
+            raise
+        finally:
+            with self._lock:
+                self._em_andamento.pop(chave, None)
+            evento.set()
+
+    def metricas(self):
+        with self._lock:
+            dados = dict(self._metricas)
+        dados['itens_memoria'] = len(self._memoria)
+        return dados
+
+
+cache_respostas = CacheRespostas()
@@ -0,0 +1,168 @@
+# utils/coleta_reservas.py
+
+import os
+import queue
+import threading
+import time
+from utils.cache_lru import CacheLRU
+from utils.extrator_json import validar_pergunta
+from utils.impressao_perguntas import impressao
+
+# Na Vercel (serverless) a thread de gravação fica congelada entre as invocações e a fila se perderia
+COLETA_RESERVAS_ATIVA = os.getenv("COLETA_RESERVAS_ATIVA", "0" if os.getenv("VERCEL") else "1") == "1"
+COLETA_RESERVAS_LOTE = int(os.getenv("COLETA_RESERVAS_LOTE", "100"))
+COLETA_RESERVAS_INTERVALO = float(os.getenv("COLETA_RESERVAS_INTERVALO", "10"))
+COLETA_RESERVAS_FILA = int(os.getenv("COLETA_RESERVAS_FILA", "1000"))
+LIMITE_LOTE_FIRESTORE = 500  # Máximo de operações por batch no Firestore
+
+CAMPOS_PERGUNTA = ('pergunta', 'alternativas', 'resposta', 'explicacao', 'subtema')
+
+
+class ColetorReservas:
+    """
+    Guarda no banco 'perguntas_reserva' as perguntas geradas pela IA que
+    já foram entregues aos alunos (write-behind).
+
+    As rotas só enfileiram as perguntas (coletar() nunca bloqueia); uma
+    thread em segundo plano valida, calcula a impressão digital e grava em
+    batched writes, usando a impressão como ID do documento. Assim a mesma
+    questão nunca vira dois documentos e o banco cresce sozinho.
+    """
+
+    def __init__(self, tamanho_lote=COLETA_RESERVAS_LOTE, intervalo=COLETA_RESERVAS_INTERVALO,
+                 tamanho_fila=COLETA_RESERVAS_FILA):
+        self.tamanho_lote = min(tamanho_lote, LIMITE_LOTE_FIRESTORE)
+        self.intervalo = intervalo
+        self._fila = queue.Queue(maxsize=tamanho_fila)
+        self._gravadas = CacheLRU(max_itens=20000)  # impressões já gravadas por este processo
+        self._lock = threading.Lock()
+        self._worker = None
+        self._metricas = {'enfileiradas': 0, 'gravadas': 0, 'repetidas': 0, 'descartadas': 0, 'erros': 0}
+
+    def _contar(self, metrica, quantidade=1):
+        with self._lock:
+            self._metricas[metrica] += quantidade
+
+    def iniciar(self):
+        """Inicia a thread de gravação (uma única vez por processo)."""
+        if self._worker is not None:
+            return
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._executar, name="coleta-reservas", daemon=True)
+                self._worker.start()
+
+    def coletar(self, db, nivel, tema, perguntas):
+        """Enfileira perguntas geradas pela IA para gravação. Não bloqueia a rota."""
+        if not COLETA_RESERVAS_ATIVA or not db or not perguntas:
+            return
+
+        self.iniciar()
+        for pergunta in perguntas:
+            if not validar_pergunta(pergunta):
+                self._contar('descartadas')
+                continue
+            try:
+                self._fila.put_nowait((db, nivel, tema, dict(pergunta)))
+                self._contar('enfileiradas')
+            except queue.Full:
+                # Fila cheia (Firestore lento ou fora do ar): perde-se só a coleta, não a resposta
+                self._contar('descartadas')
+
+    def _montar_documento(self, nivel, tema, pergunta):
+        from firebase_admin import firestore
+
+        dados = {campo: pergunta[campo] for campo in CAMPOS_PERGUNTA if campo in pergunta}
+        dados.update({
+            'nivel': nivel,
+            'tema': tema,
+            'origem': 'ia',
+            'criado_em': firestore.SERVER_TIMESTAMP
+        })
+        return dados
+
+    def _proximo_lote(self):
+        """Espera a primeira pergunta e junta as seguintes até encher o lote ou passar o intervalo."""
+        lote = [self._fila.get()]
+        limite = time.monotonic() + self.intervalo
+        while len(lote) < self.tamanho_lote:
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                break
+            try:
+                lote.append(self._fila.get(timeout=restante))
+            except queue.Empty:
+                break
+        return lote
+
+    def _gravar(self, lote):
+        # Um batch por cliente do Firestore (na prática, sempre o mesmo)
+        por_db = {}
+        for db, nivel, tema, pergunta in lote:
+            chave = impressao(pergunta)
+            documentos = por_db.setdefault(id(db), (db, {}))[1]
+            if chave in documentos or self._gravadas.obter(chave):
+                self._contar('repetidas')
+                continue
+            documentos[chave] = self._montar_documento(nivel, tema, pergunta)
+
+        from google.api_core.exceptions import AlreadyExists
+
+        for db, documentos in por_db.values():
+            if not documentos:
+                continue
+            batch = db.batch()
+            colecao = db.collection('perguntas_reserva')
+            for chave, dados in documentos.items():
+                # create() e não set(): uma reserva que já tem essa impressão (inclusive as
+                # cadastradas à mão) nunca é sobrescrita
+                batch.create(colecao.document(chave), dados)
+            try:
+                batch.commit()
+                gravadas = len(documentos)
+            except AlreadyExists:
+                # O batch é atômico: se alguma já existe, grava uma a uma e pula as existentes
+                gravadas = self._gravar_uma_a_uma(colecao, documentos)
+            except Exception as e:
+                self._contar('erros')
+                print(f"❌ Erro ao gravar {len(documentos)} perguntas geradas no banco de reservas: {e}")
+                continue
+
+            for chave in documentos:
+                self._gravadas.definir(chave, True)
+            self._contar('gravadas', gravadas)
+            print(f"✅ {gravadas} perguntas geradas adicionadas ao banco de reservas.")
+
+    def _gravar_uma_a_uma(self, colecao, documentos):
+        from google.api_core.exceptions import AlreadyExists
+
+        gravadas = 0
+        for chave, dados in documentos.items():
+            try:
+                colecao.document(chave).create(dados)
+                gravadas += 1
+            except AlreadyExists:
+                self._contar('repetidas')
+            except Exception as e:
+                self._contar('erros')
+                print(f"❌ Erro ao gravar pergunta gerada no banco de reservas ({chave}): {e}")
+        return gravadas
+
+    def _executar(self):
+        print("✅ Coleta de perguntas para o banco de reservas iniciada.")
+        while True:
+            lote = self._proximo_lote()
+            try:
+                self._gravar(lote)
+            except Exception as e:
+                self._contar('erros')
+                print(f"❌ Erro na coleta de perguntas para reservas: {e}")
+
+    def metricas(self):
+        with self._lock:
+            dados = dict(self._metricas)
+        dados['na_fila'] = self._fila.qsize()
+        return dados
+
+
+coletor_reservas = ColetorReservas()
@@ -0,0 +1,221 @@
+# utils/controle_admissao.py
+
+import asyncio
+import heapq
+import itertools
+import os
+import threading
+import time
+
+# 🔹 Limites das chamadas à Groq por processo (0 = sem limite de taxa)
+GROQ_MAX_SIMULTANEAS = int(os.getenv("GROQ_MAX_SIMULTANEAS", "8"))
+GROQ_RESERVA_INTERATIVAS = int(os.getenv("GROQ_RESERVA_INTERATIVAS", "2"))
+GROQ_REQUISICOES_POR_MINUTO = float(os.getenv("GROQ_REQUISICOES_POR_MINUTO", "0"))
+GROQ_TOKENS_POR_MINUTO = float(os.getenv("GROQ_TOKENS_POR_MINUTO", "0"))
+GROQ_FILA_MAXIMA = int(os.getenv("GROQ_FILA_MAXIMA", "50"))
+GROQ_ESPERA_INTERATIVA = float(os.getenv("GROQ_ESPERA_INTERATIVA", "5"))
+GROQ_ESPERA_LOTE = float(os.getenv("GROQ_ESPERA_LOTE", "10"))
+
+# Status devolvido quando a chamada é recusada aqui, sem chegar à Groq
+STATUS_RECUSADA = 429
+
+# Prioridade menor é atendida primeiro
+PRIORIDADES = {'interativa': 0, 'lote': 1}
+ESPERA_MAXIMA = {'interativa': GROQ_ESPERA_INTERATIVA, 'lote': GROQ_ESPERA_LOTE}
+# Tamanho típico da resposta, somado ao prompt na estimativa de tokens
+TOKENS_SAIDA_ESTIMADOS = {'interativa': 300, 'lote': 2500}
+
+
+def estimar_tokens(mensagem_user, mensagem_sistema, prioridade):
+    """Estimativa grosseira (~4 caracteres por token) do custo da chamada."""
+    return (len(mensagem_user) + len(mensagem_sistema)) // 4 + TOKENS_SAIDA_ESTIMADOS[prioridade]
+
+
+class BaldeTokens:
+    """Token bucket que enche `taxa_por_minuto` por minuto, até esse mesmo total."""
+
+    def __init__(self, taxa_por_minuto):
+        self.capacidade = taxa_por_minuto
+        self.taxa = taxa_por_minuto / 60
+        self._disponivel = taxa_por_minuto
+        self._atualizado_em = time.monotonic()
+
+    def _encher(self):
+        agora = time.monotonic()
+        self._disponivel = min(self.capacidade, self._disponivel + (agora - self._atualizado_em) * self.taxa)
+        self._atualizado_em = agora
+
+    def tempo_ate(self, quantidade):
+        """Segundos até haver `quantidade` disponível (0 se já há, ou se o balde é ilimitado)."""
+        if not self.capacidade:
+            return 0
+        self._encher()
+        falta = min(quantidade, self.capacidade) - self._disponivel
+        return max(falta / self.taxa, 0)
+
+    def consumir(self, quantidade):
+        if self.capacidade:
+            self._disponivel -= min(quantidade, self.capacidade)
+
+
+class _Pedido:
+    __slots__ = ('prioridade', 'tokens', 'concedido', 'desistiu', 'avisar')
+
+    def __init__(self, prioridade, tokens, avisar):
+        self.prioridade = prioridade
+        self.tokens = tokens
+        self.concedido = False
+        self.desistiu = False
+        self.avisar = avisar  # chamado (com o lock) quando o pedido é admitido
+
+
+class ControleAdmissao:
+    """
+    Controle de admissão das chamadas à Groq, compartilhado pelo processo.
+
+    Limita as chamadas simultâneas e, opcionalmente, as requisições e os
+    tokens estimados por minuto. Quem passa do limite espera numa fila por
+    prioridade ('interativa' antes de 'lote'), com prazo; algumas vagas
+    ficam reservadas para as interativas. Se a fila estiver cheia ou o
+    prazo acabar, o pedido é recusado na hora, para a rota partir logo para
+    o plano de contingência em vez de esperar um timeout da Groq.
+    """
+
+    def __init__(self, max_simultaneas=GROQ_MAX_SIMULTANEAS, reserva_interativas=GROQ_RESERVA_INTERATIVAS,
+                 requisicoes_por_minuto=GROQ_REQUISICOES_POR_MINUTO, tokens_por_minuto=GROQ_TOKENS_POR_MINUTO,
+                 fila_maxima=GROQ_FILA_MAXIMA):
+        self.max_simultaneas = max_simultaneas
+        self.reserva_interativas = min(reserva_interativas, max_simultaneas - 1)
+        self.fila_maxima = fila_maxima
+        self._requisicoes = BaldeTokens(requisicoes_por_minuto)
+        self._tokens = BaldeTokens(tokens_por_minuto)
+        self._ativas = 0
+        self._fila = []  # heap de (prioridade, ordem, pedido)
+        self._na_fila = 0  # pedidos esperando (sem contar os que desistiram)
+        self._ordem = itertools.count()
+        self._lock = threading.Lock()
+        self._timer = None
+        self._metricas = {'admitidas': 0, 'recusadas_fila_cheia': 0, 'recusadas_prazo': 0}
+
+    # ------------------------------------------------------------------
+    # Lógica interna (sempre com self._lock)
+    # ------------------------------------------------------------------
+    def _vagas_para(self, prioridade):
+        if prioridade == PRIORIDADES['interativa']:
+            return self.max_simultaneas
+        return self.max_simultaneas - self.reserva_interativas
+
+    def _despachar(self):
+        """Admite os primeiros da fila enquanto houver vaga e saldo nos baldes."""
+        while self._fila:
+            _, _, pedido = self._fila[0]
+            if pedido.desistiu:
+                heapq.heappop(self._fila)
+                continue
+            if self._ativas >= self._vagas_para(pedido.prioridade):
+                return
+
+            espera = max(self._requisicoes.tempo_ate(1), self._tokens.tempo_ate(pedido.tokens))
+            if espera > 0:
+                self._agendar(espera)
+                return
+
+            heapq.heappop(self._fila)
+            self._na_fila -= 1
+            self._conceder(pedido)
+
+    def _conceder(self, pedido):
+        self._requisicoes.consumir(1)
+        self._tokens.consumir(pedido.tokens)
+        self._ativas += 1
+        self._metricas['admitidas'] += 1
+        pedido.concedido = True
+        pedido.avisar()
+
+    def _agendar(self, espera):
+        """Tenta despachar de novo quando os baldes tiverem saldo."""
+        if self._timer is not None:
+            return
+
+        def acordar():
+            with self._lock:
+                self._timer = None
+                self._despachar()
+
+        self._timer = threading.Timer(espera, acordar)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _enfileirar(self, prioridade, tokens, avisar):
+        """Cria o pedido (ou None se a fila estiver cheia) e tenta admiti-lo já."""
+        with self._lock:
+            if self._na_fila >= self.fila_maxima:
+                self._metricas['recusadas_fila_cheia'] += 1
+                return None
+            pedido = _Pedido(PRIORIDADES[prioridade], tokens, avisar)
+            heapq.heappush(self._fila, (pedido.prioridade, next(self._ordem), pedido))
+            self._na_fila += 1
+            self._despachar()
+            return pedido
+
+    def _desistir(self, pedido):
+        """Retira o pedido da fila. Retorna True se ele já tinha sido admitido."""
+        with self._lock:
+            if pedido.concedido:
+                return True
+            pedido.desistiu = True
+            self._na_fila -= 1
+            self._metricas['recusadas_prazo'] += 1
+            return False
+
+    # ------------------------------------------------------------------
+    # Interface pública
+    # ------------------------------------------------------------------
+    def admitir(self, prioridade='interativa', tokens=0, espera_maxima=None):
+        """Espera uma vaga (bloqueando a thread). Retorna False se a chamada foi recusada."""
+        evento = threading.Event()
+        pedido = self._enfileirar(prioridade, tokens, evento.set)
+        if pedido is None:
+            return False
+        if evento.wait(ESPERA_MAXIMA[prioridade] if espera_maxima is None else espera_maxima):
+            return True
+        return self._desistir(pedido)
+
+    async def admitir_async(self, prioridade='interativa', tokens=0, espera_maxima=None):
+        """Versão para corrotinas: espera sem bloquear o loop de eventos."""
+        loop = asyncio.get_running_loop()
+        futuro = loop.create_future()
+
+        def avisar():
+            loop.call_soon_threadsafe(lambda: futuro.done() or futuro.set_result(True))
+
+        pedido = self._enfileirar(prioridade, tokens, avisar)
+        if pedido is None:
+            return False
+        try:
+            await asyncio.wait_for(futuro, ESPERA_MAXIMA[prioridade] if espera_maxima is None else espera_maxima)
+            return True
+        except asyncio.TimeoutError:
+            return self._desistir(pedido)
+        except asyncio.CancelledError:
+            # Quem chamou desistiu: devolve a vaga se ela já tinha sido concedida
+            if self._desistir(pedido):
+                self.liberar()
+            raise
+
+    def liberar(self):
+        """Devolve a vaga de uma chamada admitida (sempre chamar em um finally)."""
+        with self._lock:
+            self._ativas -= 1
+            self._despachar()
+
+    def estado(self):
+        with self._lock:
+            dados = dict(self._metricas)
+            dados['em_andamento'] = self._ativas
+            dados['na_fila'] = self._na_fila
+            dados['max_simultaneas'] = self.max_simultaneas
+        return dados
+
+
+controle_admissao = ControleAdmissao()
@@ -0,0 +1,137 @@
+# utils/correcao_local.py
+
+import difflib
+import re
+
+# Palavras e sinais de pontuação viram tokens separados (a pontuação também pode ser um erro)
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+_SEM_ESPACO_ANTES = set(",.;:!?)]}…")
+
+
+def tokenizar(texto):
+    return _TOKEN.findall(texto or '')
+
+
+def juntar_tokens(tokens):
+    """Remonta o texto a partir dos tokens (sem espaço antes da pontuação)."""
+    texto = ''
+    for token in tokens:
+        if texto and token not in _SEM_ESPACO_ANTES:
+            texto += ' '
+        texto += token
+    return texto
+
+
+def _normalizar(tokens):
+    return [token.lower() for token in tokens]
+
+
+def _contem(tokens, trecho):
+    """True se a sequência `trecho` aparece contígua em `tokens`."""
+    return any(tokens[i:i + len(trecho)] == trecho for i in range(len(tokens) - len(trecho) + 1))
+
+
+def _situacao(resposta_aluno, errado, correto):
+    """
+    Compara a região do aluno com o trecho errado e com a correção. A região
+    pode ser maior que o trecho (o diff junta alterações vizinhas), por isso
+    a comparação é por contenção. Se um dos dois contém o outro, o mais
+    longo é testado primeiro.
+    """
+    resposta_aluno, errado, correto = _normalizar(resposta_aluno), _normalizar(errado), _normalizar(correto)
+    if _contem(correto, errado):
+        ordem = ((correto, 'corrigido'), (errado, 'nao_corrigido'))
+    else:
+        ordem = ((errado, 'nao_corrigido'), (correto, 'corrigido'))
+    for sequencia, situacao in ordem:
+        if sequencia and _contem(resposta_aluno, sequencia):
+            return situacao
+    return 'alterado_diferente'
+
+
+def _localizar(tokens, trecho):
+    """Posição (inicio, fim) da primeira ocorrência de `trecho` nos tokens, ou None."""
+    alvo = _normalizar(tokenizar(trecho))
+    if not alvo:
+        return None
+    minusculos = _normalizar(tokens)
+    for inicio in range(len(tokens) - len(alvo) + 1):
+        if minusculos[inicio:inicio + len(alvo)] == alvo:
+            return inicio, inicio + len(alvo)
+    return None
+
+
+def _regiao_do_aluno(operacoes, inicio, fim):
+    """Converte o intervalo [inicio, fim) do original no intervalo correspondente do texto do aluno."""
+    posicoes = []
+    for tag, i1, i2, j1, j2 in operacoes:
+        if tag == 'insert':
+            if inicio <= i1 <= fim:
+                posicoes += [j1, j2]
+            continue
+        comeco, final = max(i1, inicio), min(i2, fim)
+        if comeco >= final:
+            continue
+        if tag == 'equal':
+            posicoes += [j1 + comeco - i1, j1 + final - i1]
+        else:
+            posicoes += [j1, j2]
+    return (min(posicoes), max(posicoes)) if posicoes else (0, 0)
+
+
+def avaliar_correcao(texto_original, texto_aluno, erros=None):
+    """
+    Compara o texto do aluno com o original palavra a palavra (difflib) e,
+    se houver gabarito (`erros`: lista de {'trecho', 'correcao'}), confere
+    cada erro. Retorna um dicionário com:
+      - inalterado: o aluno não mudou nada;
+      - alteracoes: trechos alterados [{'original', 'aluno'}];
+      - avaliacao_erros: situação de cada erro do gabarito
+        ('corrigido', 'nao_corrigido' ou 'alterado_diferente');
+      - alteracoes_extras: alterações fora dos trechos com erro;
+      - erros_corrigidos, total_erros e nota (0 a 10, None sem gabarito).
+    """
+    original = tokenizar(texto_original)
+    aluno = tokenizar(texto_aluno)
+    operacoes = difflib.SequenceMatcher(None, original, aluno, autojunk=False).get_opcodes()
+
+    alteracoes = [
+        {"original": juntar_tokens(original[i1:i2]), "aluno": juntar_tokens(aluno[j1:j2]), "_posicao": (i1, i2)}
+        for tag, i1, i2, j1, j2 in operacoes if tag != 'equal'
+    ]
+
+    avaliacao_erros = []
+    cobertos = []
+    for erro in erros or []:
+        posicao = _localizar(original, erro.get('trecho', ''))
+        if posicao is None:
+            continue
+        cobertos.append(posicao)
+        j1, j2 = _regiao_do_aluno(operacoes, *posicao)
+        resposta_aluno = aluno[j1:j2]
+        situacao = _situacao(resposta_aluno, original[posicao[0]:posicao[1]], tokenizar(erro.get('correcao', '')))
+        avaliacao_erros.append({
+            "trecho": erro.get('trecho'),
+            "correcao_esperada": erro.get('correcao'),
+            "resposta_aluno": juntar_tokens(resposta_aluno),
+            "situacao": situacao
+        })
+
+    def fora_dos_erros(alteracao):
+        i1, i2 = alteracao['_posicao']
+        return not any(inicio <= i2 and i1 <= fim for inicio, fim in cobertos)
+
+    alteracoes_extras = [a for a in alteracoes if fora_dos_erros(a)] if cobertos else []
+    for alteracao in alteracoes:
+        del alteracao['_posicao']
+
+    corrigidos = sum(1 for erro in avaliacao_erros if erro['situacao'] == 'corrigido')
+    return {
+        "inalterado": not alteracoes,
+        "alteracoes": alteracoes,
+        "avaliacao_erros": avaliacao_erros,
+        "alteracoes_extras": alteracoes_extras,
+        "erros_corrigidos": corrigidos,
+        "total_erros": len(avaliacao_erros),
+        "nota": round(10 * corrigidos / len(avaliacao_erros), 1) if avaliacao_erros else None
+    }
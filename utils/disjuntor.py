@@ -0,0 +1,136 @@
+# utils/disjuntor.py
+
+import os
+import threading
+import time
+from collections import deque
+
+GROQ_CIRCUITO_JANELA = int(os.getenv("GROQ_CIRCUITO_JANELA", "20"))
+GROQ_CIRCUITO_MINIMO = int(os.getenv("GROQ_CIRCUITO_MINIMO", "5"))
+GROQ_CIRCUITO_TAXA_ERRO = float(os.getenv("GROQ_CIRCUITO_TAXA_ERRO", "0.5"))
+GROQ_CIRCUITO_LATENCIA_LENTA = float(os.getenv("GROQ_CIRCUITO_LATENCIA_LENTA", "15"))
+GROQ_CIRCUITO_TEMPO_ABERTO = float(os.getenv("GROQ_CIRCUITO_TEMPO_ABERTO", "30"))
+GROQ_CIRCUITO_SONDAS = int(os.getenv("GROQ_CIRCUITO_SONDAS", "2"))
+
+# Status devolvido quando o circuito está aberto e a chamada nem é feita
+STATUS_CIRCUITO_ABERTO = 503
+# Respostas que indicam problema na Groq (e não na nossa requisição)
+STATUS_FALHA = {429, 500, 502, 503, 504}
+
+FECHADO, ABERTO, MEIO_ABERTO = 'fechado', 'aberto', 'meio_aberto'
+
+
+class Disjuntor:
+    """
+    Circuit breaker das chamadas à IA.
+
+    - fechado: as chamadas passam; o resultado das últimas `janela` chamadas
+      é acompanhado. Se a taxa de erro (falhas e chamadas lentas) passar do
+      limite, o circuito abre.
+    - aberto: as chamadas são recusadas na hora, por `tempo_aberto` segundos,
+      e as rotas vão direto para o plano de contingência.
+    - meio_aberto: só `sondas` chamadas de teste passam. Se todas derem
+      certo o circuito fecha; qualquer falha abre de novo.
+    """
+
+    def __init__(self, janela=GROQ_CIRCUITO_JANELA, minimo=GROQ_CIRCUITO_MINIMO, taxa_erro=GROQ_CIRCUITO_TAXA_ERRO,
+                 latencia_lenta=GROQ_CIRCUITO_LATENCIA_LENTA, tempo_aberto=GROQ_CIRCUITO_TEMPO_ABERTO,
+                 sondas=GROQ_CIRCUITO_SONDAS):
+        self.minimo = minimo
+        self.taxa_erro = taxa_erro
+        self.latencia_lenta = latencia_lenta
+        self.tempo_aberto = tempo_aberto
+        self.sondas = sondas
+        self._resultados = deque(maxlen=janela)  # True = falha
+        self._latencias = deque(maxlen=janela)
+        self._estado = FECHADO
+        self._aberto_ate = 0
+        self._sondas_em_andamento = 0
+        self._sondas_ok = 0
+        self._aberturas = 0
+        self._recusadas = 0
+        self._lock = threading.Lock()
+
+    def _abrir(self, motivo):
+        self._estado = ABERTO
+        self._aberto_ate = time.monotonic() + self.tempo_aberto
+        self._aberturas += 1
+        self._sondas_em_andamento = 0
+        print(f"🚨 Circuito da IA ABERTO ({motivo}). Usando contingência por {self.tempo_aberto:.0f}s.")
+
+    def _fechar(self):
+        self._estado = FECHADO
+        self._resultados.clear()
+        self._latencias.clear()
+        print("✅ Circuito da IA FECHADO: a Groq voltou a responder.")
+
+    def permitir(self):
+        """
+        Diz se a chamada pode ir à IA: None (recusada), 'normal' ou 'sonda'.
+        Quem não recebe None deve chamar registrar() com o valor recebido.
+        """
+        with self._lock:
+            if self._estado == ABERTO:
+                if time.monotonic() < self._aberto_ate:
+                    self._recusadas += 1
+                    return None
+                self._estado = MEIO_ABERTO
+                self._sondas_ok = 0
+                print("⚠️ Circuito da IA MEIO ABERTO: enviando chamadas de teste.")
+
+            if self._estado == MEIO_ABERTO:
+                if self._sondas_em_andamento + self._sondas_ok >= self.sondas:
+                    self._recusadas += 1
+                    return None
+                self._sondas_em_andamento += 1
+                return 'sonda'
+            return 'normal'
+
+    def registrar(self, permissao, status, latencia):
+        """
+        Registra o resultado de uma chamada permitida. `status` None significa
+        que a chamada não chegou a ser feita (não conta como sucesso nem falha).
+        """
+        with self._lock:
+            sonda = permissao == 'sonda' and self._estado == MEIO_ABERTO
+            if sonda:
+                self._sondas_em_andamento = max(self._sondas_em_andamento - 1, 0)
+            if status is None:
+                return
+
+            falha = status in STATUS_FALHA or latencia >= self.latencia_lenta
+            if sonda:
+                if falha:
+                    self._abrir(f"chamada de teste falhou com status {status}")
+                else:
+                    self._sondas_ok += 1
+                    if self._sondas_ok >= self.sondas:
+                        self._fechar()
+                return
+            if self._estado != FECHADO or permissao == 'sonda':
+                # Chamada que começou antes de o circuito mudar de estado
+                return
+
+            self._resultados.append(falha)
+            self._latencias.append(latencia)
+            falhas = sum(self._resultados)
+            if len(self._resultados) >= self.minimo and falhas / len(self._resultados) >= self.taxa_erro:
+                self._abrir(f"{falhas} de {len(self._resultados)} chamadas recentes falharam ou foram lentas")
+
+    def estado(self):
+        with self._lock:
+            latencias = sorted(self._latencias)
+            dados = {
+                "estado": self._estado,
+                "chamadas_recentes": len(self._resultados),
+                "falhas_recentes": sum(self._resultados),
+                "latencia_mediana": round(latencias[len(latencias) // 2], 3) if latencias else None,
+                "aberturas": self._aberturas,
+                "recusadas": self._recusadas,
+            }
+            if self._estado == ABERTO:
+                dados["proxima_sonda_em"] = round(max(self._aberto_ate - time.monotonic(), 0), 1)
+        return dados
+
+
+disjuntor_groq = Disjuntor()
@@ -0,0 +1,167 @@
+# utils/extrator_json.py
+
+import json
+import re
+
+ALTERNATIVAS_VALIDAS = ('A', 'B', 'C', 'D')
+CERCA_CODIGO = re.compile(r'```[a-zA-Z]*')
+
+
+def validar_pergunta(pergunta):
+    """Confere se a questão gerada tem todos os campos que o front-end precisa."""
+    if not isinstance(pergunta, dict):
+        return False
+    if not isinstance(pergunta.get('pergunta'), str) or not pergunta['pergunta'].strip():
+        return False
+
+    alternativas = pergunta.get('alternativas')
+    if not isinstance(alternativas, dict) or set(alternativas.keys()) != set(ALTERNATIVAS_VALIDAS):
+        return False
+    if not all(isinstance(texto, str) and texto.strip() for texto in alternativas.values()):
+        return False
+
+    resposta = pergunta.get('resposta')
+    if not isinstance(resposta, str) or resposta.strip().upper() not in ALTERNATIVAS_VALIDAS:
+        return False
+
+    return isinstance(pergunta.get('explicacao'), str) and bool(pergunta['explicacao'].strip())
+
+
+def remover_virgulas_finais(texto):
+    """
+    Remove vírgulas antes de '}' ou ']' (fora de strings), um erro comum da IA.
+    Passada única: a vírgula fica pendente até o próximo caractere que não é
+    espaço decidir se ela fica ou sai.
+    """
+    resultado = []
+    em_string = escape = False
+    virgula_pendente = None  # posição da vírgula em `resultado`
+    for caractere in texto:
+        if em_string:
+            if escape:
+                escape = False
+            elif caractere == '\\':
+                escape = True
+            elif caractere == '"':
+                em_string = False
+        elif not caractere.isspace():
+            if virgula_pendente is not None and caractere in '}]':
+                resultado[virgula_pendente] = ''
+            virgula_pendente = None
+            if caractere == '"':
+                em_string = True
+            elif caractere == ',':
+                virgula_pendente = len(resultado)
+        resultado.append(caractere)
+    return ''.join(resultado)
+
+
+def _carregar(texto):
+    try:
+        return json.loads(texto)
+    except json.JSONDecodeError:
+        return json.loads(remover_virgulas_finais(texto))
+
+
+def extrair_json(texto, tipo=None):
+    """
+    Extrai o JSON de uma resposta da IA, tolerando cercas ```json, texto antes
+    ou depois e vírgulas sobrando. `tipo` (dict ou list) restringe o que se
+    procura. Se um array vier truncado, devolve os objetos completos dele.
+    Lança ValueError se nada aproveitável for encontrado.
+    """
+    if not isinstance(texto, str):
+        raise ValueError("A resposta da IA está vazia.")
+    texto = CERCA_CODIGO.sub('', texto).strip()
+
+    aberturas = {dict: '{', list: '['}.get(tipo, '{[')
+    inicio = min((texto.find(c) for c in aberturas if c in texto), default=-1)
+    if inicio == -1:
+        raise ValueError("Nenhum JSON encontrado na resposta da IA.")
+    fechamento = '}' if texto[inicio] == '{' else ']'
+    fim = texto.rfind(fechamento)
+
+    if fim > inicio:
+        try:
+            return _carregar(texto[inicio:fim + 1])
+        except json.JSONDecodeError:
+            pass
+
+    # Array truncado ou com algum objeto quebrado: salva os objetos válidos
+    if texto[inicio] == '[':
+        objetos = ExtratorObjetosJSON().alimentar(texto[inicio:])
+        if objetos:
+            return objetos
+    raise ValueError("Não foi possível extrair um JSON válido da resposta da IA.")
+
+
+def extrair_perguntas(texto):
+    """
+    Extrai as questões de uma resposta da IA, descartando as que não passam
+    em validar_pergunta(). As questões são renumeradas a partir de 1.
+    """
+    dados = extrair_json(texto)
+    if isinstance(dados, dict):
+        # Alguns modelos embrulham o array: {"perguntas": [...]}
+        dados = next((valor for valor in dados.values() if isinstance(valor, list)), [dados])
+    if not isinstance(dados, list):
+        raise ValueError("A resposta da IA não é uma lista.")
+
+    perguntas = [pergunta for pergunta in dados if validar_pergunta(pergunta)]
+    if not perguntas:
+        raise ValueError("Nenhuma questão válida na resposta da IA.")
+
+    for i, pergunta in enumerate(perguntas):
+        pergunta['id'] = i + 1
+        pergunta['resposta'] = pergunta['resposta'].strip().upper()
+    return perguntas
+
+
+class ExtratorObjetosJSON:
+    """
+    Parser incremental para um array JSON de objetos que chega aos pedaços
+    (ex.: tokens da IA em streaming). A cada trecho recebido em alimentar(),
+    devolve os objetos de primeiro nível que acabaram de ser fechados, sem
+    esperar o array inteiro. Texto fora dos objetos (colchetes, vírgulas,
+    cercas ``` ou comentários) é ignorado.
+    """
+
+    def __init__(self):
+        self._buffer = []
+        self._profundidade = 0
+        self._em_string = False
+        self._escape = False
+
+    def alimentar(self, trecho):
+        objetos = []
+        for caractere in trecho:
+            if self._profundidade == 0:
+                # Fora de um objeto: só interessa o início do próximo
+                if caractere == '{':
+                    self._profundidade = 1
+                    self._buffer = ['{']
+                continue
+
+            self._buffer.append(caractere)
+            if self._em_string:
+                if self._escape:
+                    self._escape = False
+                elif caractere == '\\':
+                    self._escape = True
+                elif caractere == '"':
+                    self._em_string = False
+            elif caractere == '"':
+                self._em_string = True
+            elif caractere == '{':
+                self._profundidade += 1
+            elif caractere == '}':
+                self._profundidade -= 1
+                if self._profundidade == 0:
+                    texto = ''.join(self._buffer)
+                    self._buffer = []
+                    try:
+                        objetos.append(_carregar(texto))
+                    except json.JSONDecodeError:
+                        # Objeto malformado: descarta só ele e segue para o próximo
+                        pass
+        return objetos
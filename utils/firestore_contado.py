@@ -0,0 +1,164 @@
+# utils/firestore_contado.py
+
+from utils.metricas import contar_firestore
+
+# Métodos de consulta que devolvem outra consulta (e precisam continuar contados)
+_METODOS_DE_CONSULTA = (
+    'where', 'order_by', 'limit', 'limit_to_last', 'offset', 'select',
+    'start_at', 'start_after', 'end_at', 'end_before',
+)
+
+
+def _original(objeto):
+    """O objeto do Firestore por trás de um envoltório (ou o próprio objeto)."""
+    return objeto._original if isinstance(objeto, _Repasse) else objeto
+
+
+class _Repasse:
+    """Repassa ao objeto original tudo o que o envoltório não intercepta."""
+
+    def __init__(self, original):
+        self._original = original
+
+    def __getattr__(self, nome):
+        return getattr(self._original, nome)
+
+
+class ReferenciaContada(_Repasse):
+    """DocumentReference: cada get() é uma leitura; set/create/update/delete, uma escrita."""
+
+    def get(self, *args, **kwargs):
+        if 'transaction' in kwargs:
+            kwargs['transaction'] = _original(kwargs['transaction'])
+        documento = self._original.get(*args, **kwargs)
+        contar_firestore('leitura')
+        return documento
+
+    def _escrever(self, metodo, *args, **kwargs):
+        resultado = getattr(self._original, metodo)(*args, **kwargs)
+        contar_firestore('escrita')
+        return resultado
+
+    def set(self, *args, **kwargs):
+        return self._escrever('set', *args, **kwargs)
+
+    def create(self, *args, **kwargs):
+        return self._escrever('create', *args, **kwargs)
+
+    def update(self, *args, **kwargs):
+        return self._escrever('update', *args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        return self._escrever('delete', *args, **kwargs)
+
+    def collection(self, nome):
+        return ConsultaContada(self._original.collection(nome))
+
+
+class ConsultaContada(_Repasse):
+    """
+    CollectionReference ou Query: cada documento devolvido por stream()/get()
+    é uma leitura, e uma consulta sem resultado também conta uma (como o
+    Firestore cobra).
+    """
+
+    def __getattr__(self, nome):
+        atributo = getattr(self._original, nome)
+        if nome in _METODOS_DE_CONSULTA:
+            return lambda *args, **kwargs: ConsultaContada(atributo(*args, **kwargs))
+        return atributo
+
+    def document(self, *args):
+        return ReferenciaContada(self._original.document(*args))
+
+    def stream(self, *args, **kwargs):
+        lidos = 0
+        try:
+            for documento in self._original.stream(*args, **kwargs):
+                lidos += 1
+                yield documento
+        finally:
+            # Conta de uma vez no fim (ou quando quem consome para de ler, ex.: next(..., None))
+            contar_firestore('leitura', max(lidos, 1))
+
+    def get(self, *args, **kwargs):
+        documentos = self._original.get(*args, **kwargs)
+        contar_firestore('leitura', max(len(documentos), 1))
+        return documentos
+
+    def add(self, *args, **kwargs):
+        resultado = self._original.add(*args, **kwargs)
+        contar_firestore('escrita')
+        return resultado
+
+
+class LoteContado(_Repasse):
+    """WriteBatch: as escritas só contam depois do commit bem-sucedido."""
+
+    def __init__(self, original):
+        super().__init__(original)
+        self._pendentes = 0
+
+    def _enfileirar(self, metodo, referencia, *args, **kwargs):
+        getattr(self._original, metodo)(_original(referencia), *args, **kwargs)
+        self._pendentes += 1
+        return self
+
+    def set(self, referencia, *args, **kwargs):
+        return self._enfileirar('set', referencia, *args, **kwargs)
+
+    def create(self, referencia, *args, **kwargs):
+        return self._enfileirar('create', referencia, *args, **kwargs)
+
+    def update(self, referencia, *args, **kwargs):
+        return self._enfileirar('update', referencia, *args, **kwargs)
+
+    def delete(self, referencia, *args, **kwargs):
+        return self._enfileirar('delete', referencia, *args, **kwargs)
+
+    def commit(self, *args, **kwargs):
+        resultado = self._original.commit(*args, **kwargs)
+        contar_firestore('escrita', self._pendentes)
+        self._pendentes = 0
+        return resultado
+
+
+class TransacaoContada(LoteContado):
+    """
+    Transaction: o commit é feito pelo @firestore.transactional (em métodos
+    internos), então cada escrita conta ao ser enfileirada. Uma transação
+    repetida por conflito conta as escritas de novo, o que é raro.
+    """
+
+    def _enfileirar(self, metodo, referencia, *args, **kwargs):
+        getattr(self._original, metodo)(_original(referencia), *args, **kwargs)
+        contar_firestore('escrita')
+        return self
+
+
+class ClienteContado(_Repasse):
+    """
+    Cliente do Firestore que registra nas métricas (utils.metricas) todo
+    documento lido e escrito, em vez de cada rota contar as próprias operações.
+    Referências, consultas, batches e transações criadas a partir dele
+    também são contadas; o resto da API é repassado ao cliente original.
+    """
+
+    def collection(self, nome):
+        return ConsultaContada(self._original.collection(nome))
+
+    def document(self, *args):
+        return ReferenciaContada(self._original.document(*args))
+
+    def batch(self):
+        return LoteContado(self._original.batch())
+
+    def transaction(self, *args, **kwargs):
+        return TransacaoContada(self._original.transaction(*args, **kwargs))
+
+
+def contar_operacoes(cliente):
+    """Envolve o cliente do Firestore para contar as operações (None continua None)."""
+    if cliente is None or isinstance(cliente, ClienteContado):
+        return cliente
+    return ClienteContado(cliente)
@@ -0,0 +1,161 @@
+# utils/groq_async.py
+
+import asyncio
+import threading
+import time
+from utils.groq_firebase import (
+    GROQ_API_KEY, GROQ_URL, GROQ_MODELO, GROQ_PRAZO_TOTAL, GROQ_POOL_CONEXOES,
+    TentativasGroq, montar_corpo_groq
+)
+from utils.cache_respostas import cache_respostas
+from utils.controle_admissao import controle_admissao, estimar_tokens, ESPERA_MAXIMA, STATUS_RECUSADA
+from utils.disjuntor import disjuntor_groq, STATUS_CIRCUITO_ABERTO
+from utils.metricas import groq_chamadas, registrar_chamada_groq, registrar_uso_groq
+
+# 🔹 Loop de eventos dedicado às chamadas assíncronas da Groq
+# Usado para disparar várias chamadas ao mesmo tempo dentro de uma requisição
+# (ex.: a geração de perguntas em partes). O cliente httpx (e o pool de conexões
+# dele) vive nesse loop, compartilhado pelo processo. As views continuam
+# síncronas: sob WSGI, cada requisição ocupa uma thread do servidor de qualquer forma.
+_loop = None
+_cliente = None
+_loop_lock = threading.Lock()
+_em_andamento = {}  # chave do cache -> Task (só acessado dentro do loop dedicado)
+
+
+def _obter_loop():
+    global _loop
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="groq-async", daemon=True).start()
+                _loop = loop
+    return _loop
+
+
+def _obter_cliente():
+    """Cliente httpx assíncrono do processo (criado dentro do loop dedicado)."""
+    global _cliente
+    if _cliente is None:
+        import httpx  # só na primeira chamada (cold start mais rápido)
+
+        _cliente = httpx.AsyncClient(
+            headers={
+                "Authorization": f"Bearer {GROQ_API_KEY}",
+                "Content-Type": "application/json"
+            },
+            limits=httpx.Limits(max_connections=GROQ_POOL_CONEXOES * 10, max_keepalive_connections=GROQ_POOL_CONEXOES),
+        )
+    return _cliente
+
+
+async def _chamar_groq_admitida(mensagem_user, mensagem_sistema, prazo, temperatura, prioridade):
+    """Consulta o circuito, pede vaga ao controle de admissão (sem bloquear o loop) e chama a Groq."""
+    limite = time.monotonic() + (prazo or GROQ_PRAZO_TOTAL)
+    permissao = disjuntor_groq.permitir()
+    if permissao is None:
+        groq_chamadas.incrementar(modo='async', status=STATUS_CIRCUITO_ABERTO)
+        return None, STATUS_CIRCUITO_ABERTO
+
+    espera = min(ESPERA_MAXIMA[prioridade], prazo or GROQ_PRAZO_TOTAL)
+    try:
+        admitida = await controle_admissao.admitir_async(prioridade, estimar_tokens(mensagem_user, mensagem_sistema, prioridade), espera)
+    except asyncio.CancelledError:
+        disjuntor_groq.registrar(permissao, None, 0)
+        raise
+    if not admitida:
+        disjuntor_groq.registrar(permissao, None, 0)
+        print(f"🚨 Chamada à Groq ({prioridade}) recusada pelo controle de admissão: limite de carga atingido.")
+        groq_chamadas.incrementar(modo='async', status=STATUS_RECUSADA)
+        return None, STATUS_RECUSADA
+
+    inicio = time.monotonic()
+    status = None
+    try:
+        conteudo, status = await _chamar_groq_httpx(mensagem_user, mensagem_sistema, limite, temperatura)
+        return conteudo, status
+    finally:
+        controle_admissao.liberar()
+        # Chamada cancelada no meio (status None) não conta para o circuito
+        disjuntor_groq.registrar(permissao, status, time.monotonic() - inicio)
+        registrar_chamada_groq('async', status, time.monotonic() - inicio)
+
+
+async def _chamar_groq_httpx(mensagem_user, mensagem_sistema, limite, temperatura):
+    """Envio assíncrono (httpx) com a mesma política de TentativasGroq do cliente síncrono."""
+    import httpx
+
+    body = montar_corpo_groq(mensagem_user, mensagem_sistema, temperatura)
+    cliente = _obter_cliente()
+
+    tentativas = TentativasGroq(limite, 'async')
+    for _, restante in tentativas:
+        try:
+            conexao, leitura = tentativas.timeouts(restante)
+            timeout = httpx.Timeout(leitura, connect=conexao)
+            response = await asyncio.wait_for(cliente.post(GROQ_URL, json=body, timeout=timeout), restante)
+            if tentativas.aceitar(response.status_code):
+                response.raise_for_status()
+                resposta = response.json()
+                registrar_uso_groq(resposta)
+                return resposta['choices'][0]['message']['content'].strip(), 200
+            espera = tentativas.falhou(status=response.status_code, retry_after=response.headers.get("Retry-After"))
+        except Exception as e:
+            espera = tentativas.falhou(erro=e)
+        if espera is None:
+            break
+        await asyncio.sleep(espera)
+    return None, tentativas.status
+
+
+async def _executar_no_loop(chave, mensagem_user, mensagem_sistema, prazo, temperatura, prioridade):
+    """Roda no loop dedicado; chamadas com a mesma chave compartilham a mesma Task."""
+    if chave is None:
+        return await _chamar_groq_admitida(mensagem_user, mensagem_sistema, prazo, temperatura, prioridade)
+
+    async def chamar_e_guardar():
+        conteudo, status = await _chamar_groq_admitida(mensagem_user, mensagem_sistema, prazo, temperatura, prioridade)
+        if conteudo and status == 200:
+            # A gravação no SQLite é síncrona: fora do loop, para não travar as outras chamadas em andamento
+            await asyncio.to_thread(cache_respostas.definir, chave, conteudo)
+        return conteudo, status
+
+    tarefa = _em_andamento.get(chave)
+    if tarefa is None:
+        tarefa = asyncio.ensure_future(chamar_e_guardar())
+        _em_andamento[chave] = tarefa
+        tarefa.add_done_callback(lambda _: _em_andamento.pop(chave, None))
+    return await asyncio.shield(tarefa)
+
+
+async def chamar_groq_async(mensagem_user, mensagem_sistema="", prazo=None, usar_cache=True, temperatura=0.7,
+                            prioridade='interativa'):
+    """
+    Versão assíncrona de chamar_groq, para corrotinas que fazem várias
+    chamadas ao mesmo tempo (ver rodar_no_loop). A chamada roda no loop
+    dedicado, com um único cliente httpx (keep-alive) para o processo.
+    Retorna (conteudo, status), com as mesmas regras de cache e de
+    controle de admissão (prioridade) de chamar_groq.
+    """
+    chave = None
+    if usar_cache:
+        chave = cache_respostas.chave(GROQ_MODELO, mensagem_sistema, mensagem_user, temperatura)
+        conteudo = cache_respostas.obter(chave)
+        if conteudo is not None:
+            return conteudo, 200
+
+    futuro = asyncio.run_coroutine_threadsafe(
+        _executar_no_loop(chave, mensagem_user, mensagem_sistema, prazo, temperatura, prioridade),
+        _obter_loop()
+    )
+    return await asyncio.wrap_future(futuro)
+
+
+def rodar_no_loop(corrotina):
+    """
+    Roda a corrotina no loop dedicado e espera o resultado (bloqueando a
+    thread de quem chamou). É a ponte das views síncronas para as chamadas
+    simultâneas à Groq.
+    """
+    return asyncio.run_coroutine_threadsafe(corrotina, _obter_loop()).result()
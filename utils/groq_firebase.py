@@ -1,73 +1,393 @@
 # utils/groq_firebase.py
 
-import requests
 import os
 import json
 import random
+import sys
+import threading
+import time
 from dotenv import load_dotenv
+from utils.cache_reservas import cache_reservas
+from utils.cache_respostas import cache_respostas
+from utils.controle_admissao import controle_admissao, estimar_tokens, ESPERA_MAXIMA, STATUS_RECUSADA
+from utils.disjuntor import disjuntor_groq, STATUS_CIRCUITO_ABERTO
+from utils.metricas import groq_chamadas, registrar_chamada_groq, registrar_uso_groq
 
 load_dotenv()
 
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-GROQ_URL = "https://api.groq.com/openai/v1/chat/completions"
+GROQ_URL = os.getenv("GROQ_URL", "https://api.groq.com/openai/v1/chat/completions")
+GROQ_MODELO = "llama-3.1-8b-instant"
 
-def chamar_groq(mensagem_user, mensagem_sistema=""):
-    """Função para chamar a API Groq."""
-    headers = {
-        "Authorization": f"Bearer {GROQ_API_KEY}",
-        "Content-Type": "application/json"
-    }
+# 🔹 Limites da chamada à Groq (todos configuráveis pelo .env)
+GROQ_TIMEOUT_CONEXAO = float(os.getenv("GROQ_TIMEOUT_CONEXAO", "3.05"))
+GROQ_TIMEOUT_LEITURA = float(os.getenv("GROQ_TIMEOUT_LEITURA", "20"))
+GROQ_PRAZO_TOTAL = float(os.getenv("GROQ_PRAZO_TOTAL", "30"))
+GROQ_MAX_TENTATIVAS = int(os.getenv("GROQ_MAX_TENTATIVAS", "3"))
+GROQ_BACKOFF_BASE = float(os.getenv("GROQ_BACKOFF_BASE", "0.5"))
+GROQ_BACKOFF_MAXIMO = float(os.getenv("GROQ_BACKOFF_MAXIMO", "4"))
+GROQ_POOL_CONEXOES = int(os.getenv("GROQ_POOL_CONEXOES", "20"))
+
+# Status HTTP que valem uma nova tentativa (limite de taxa e falhas temporárias)
+STATUS_RETENTAVEIS = {429, 500, 502, 503, 504}
+
+_sessao = None
+_sessao_lock = threading.Lock()
+
+
+def obter_sessao_groq():
+    """
+    Retorna a sessão HTTP compartilhada pelo processo inteiro.
+    A sessão mantém as conexões TCP/TLS abertas (keep-alive), evitando um
+    novo handshake a cada chamada à Groq.
+    """
+    global _sessao
+    if _sessao is None:
+        with _sessao_lock:
+            if _sessao is None:
+                # requests só é importado na primeira chamada (cold start mais rápido)
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                sessao = requests.Session()
+                # As novas tentativas são controladas em chamar_groq (com prazo total),
+                # por isso o adapter não refaz requisições sozinho.
+                adapter = HTTPAdapter(
+                    pool_connections=GROQ_POOL_CONEXOES,
+                    pool_maxsize=GROQ_POOL_CONEXOES,
+                    max_retries=0,
+                )
+                sessao.mount("https://", adapter)
+                sessao.mount("http://", adapter)
+                sessao.headers.update({
+                    "Authorization": f"Bearer {GROQ_API_KEY}",
+                    "Content-Type": "application/json"
+                })
+                _sessao = sessao
+    return _sessao
+
+
+def tempo_de_espera(tentativa, retry_after=None):
+    """Backoff exponencial com jitter completo, respeitando o Retry-After da Groq."""
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+    return random.uniform(0, min(GROQ_BACKOFF_MAXIMO, GROQ_BACKOFF_BASE * (2 ** tentativa)))
+
+
+def status_do_erro(erro):
+    """
+    Status equivalente a uma exceção durante o envio: 504 para timeout e 503
+    para falha de rede (as duas valem nova tentativa), ou None para erros
+    definitivos. Reconhece as exceções do requests, do httpx e do asyncio sem
+    importá-los: se a exceção veio de um deles, o módulo já está carregado.
+    """
+    requests = sys.modules.get('requests')
+    httpx = sys.modules.get('httpx')
+    asyncio = sys.modules.get('asyncio')
+    if (isinstance(erro, TimeoutError)
+            or (asyncio and isinstance(erro, asyncio.TimeoutError))
+            or (requests and isinstance(erro, requests.exceptions.Timeout))
+            or (httpx and isinstance(erro, httpx.TimeoutException))):
+        return 504
+    if ((requests and isinstance(erro, requests.exceptions.ConnectionError))
+            or (httpx and isinstance(erro, httpx.TransportError))):
+        return 503
+    return None
+
+
+class TentativasGroq:
+    """
+    Política de novas tentativas comum aos três clientes da Groq (síncrono,
+    assíncrono e streaming): até GROQ_MAX_TENTATIVAS tentativas dentro do
+    prazo total `limite` (time.monotonic), com backoff e Retry-After entre
+    elas. Cada cliente só implementa o envio e a espera:
+
+        tentativas = TentativasGroq(limite)
+        for _, restante in tentativas:
+            try:
+                response = enviar(timeout=tentativas.timeouts(restante))
+                if tentativas.aceitar(response.status_code):
+                    return ler(response), 200
+                espera = tentativas.falhou(status=response.status_code, retry_after=...)
+            except Exception as e:
+                espera = tentativas.falhou(erro=e)
+            if espera is None:
+                break
+            time.sleep(espera)  # ou await asyncio.sleep(espera)
+        return None, tentativas.status
+    """
+
+    def __init__(self, limite, rotulo=''):
+        self.limite = limite
+        self.rotulo = f" ({rotulo})" if rotulo else ''
+        self.status = 500  # último status (o da falha, se nenhuma tentativa der certo)
+        self._tentativa = 0
+        self._encerrada = False
+
+    def __iter__(self):
+        for tentativa in range(GROQ_MAX_TENTATIVAS):
+            if self._encerrada:
+                return
+            restante = self.limite - time.monotonic()
+            if restante <= 0:
+                print(f"❌ Prazo total da Groq{self.rotulo} esgotado antes da tentativa {tentativa + 1}.")
+                return
+            self._tentativa = tentativa
+            yield tentativa, restante
+
+    @staticmethod
+    def timeouts(restante):
+        """(conexão, leitura) da tentativa, sem passar do prazo total."""
+        return min(GROQ_TIMEOUT_CONEXAO, restante), min(GROQ_TIMEOUT_LEITURA, restante)
+
+    @staticmethod
+    def aceitar(status_code):
+        """True se a resposta encerra as tentativas (sucesso ou erro que não vale repetir)."""
+        return status_code not in STATUS_RETENTAVEIS
+
+    def falhou(self, status=None, retry_after=None, erro=None):
+        """
+        Registra a falha da tentativa atual (status HTTP retentável ou exceção).
+        Retorna quantos segundos esperar antes da próxima tentativa, ou None
+        se não houver próxima (erro definitivo, tentativas ou prazo esgotados).
+        """
+        numero = f"tentativa {self._tentativa + 1}/{GROQ_MAX_TENTATIVAS}"
+        if erro is not None:
+            status = status_do_erro(erro)
+            if status is None:
+                print(f"❌ Erro ao chamar Groq API{self.rotulo}: {str(erro) or repr(erro)}")
+                self.status = 500
+                self._encerrada = True
+                return None
+            print(f"⚠️ Falha de rede ao chamar Groq{self.rotulo} ({numero}): {str(erro) or repr(erro)}")
+        else:
+            print(f"⚠️ Groq{self.rotulo} respondeu {status} ({numero}).")
+        self.status = status
+
+        espera = None
+        if self._tentativa + 1 < GROQ_MAX_TENTATIVAS:
+            espera = tempo_de_espera(self._tentativa, retry_after)
+            if time.monotonic() + espera >= self.limite:
+                espera = None
+        if espera is None:
+            print(f"❌ Groq{self.rotulo} indisponível após as tentativas dentro do prazo (último status: {status}).")
+            self._encerrada = True
+        return espera
+
+
+def chamar_groq(mensagem_user, mensagem_sistema="", prazo=None, usar_cache=True, temperatura=0.7,
+                prioridade='interativa'):
+    """
+    Função para chamar a API Groq.
+
+    Usa a sessão compartilhada, com timeouts de conexão/leitura, até
+    GROQ_MAX_TENTATIVAS tentativas com backoff e um prazo total (em segundos)
+    para a chamada inteira. Retorna (conteudo, status).
+
+    Com usar_cache=True, respostas bem-sucedidas ficam no cache por conteúdo
+    (utils.cache_respostas) e chamadas idênticas simultâneas compartilham uma
+    única requisição. Use usar_cache=False quando cada chamada deve gerar
+    conteúdo novo (ex.: geração de perguntas).
+
+    Toda chamada passa pelo controle de admissão (utils.controle_admissao):
+    use prioridade='lote' para gerações grandes, que cedem a vez às chamadas
+    'interativas'. Se a chamada for recusada, retorna (None, STATUS_RECUSADA)
+    sem esperar a Groq. Com o circuito aberto (utils.disjuntor), retorna
+    (None, STATUS_CIRCUITO_ABERTO) na hora.
+    """
+    if not usar_cache:
+        return _chamar_groq_sem_cache(mensagem_user, mensagem_sistema, prazo, temperatura, prioridade)
+
+    chave = cache_respostas.chave(GROQ_MODELO, mensagem_sistema, mensagem_user, temperatura)
+    conteudo = cache_respostas.obter(chave)
+    if conteudo is not None:
+        return conteudo, 200
+
+    def chamar_e_guardar():
+        conteudo, status = _chamar_groq_sem_cache(mensagem_user, mensagem_sistema, prazo, temperatura, prioridade)
+        if conteudo and status == 200:
+            cache_respostas.definir(chave, conteudo)
+        return conteudo, status
+
+    return cache_respostas.unico_voo(chave, chamar_e_guardar)
+
+
+def montar_corpo_groq(mensagem_user, mensagem_sistema, temperatura, stream=False):
+    """Corpo da requisição no formato de chat completions da Groq."""
     body = {
-        "model": "llama-3.1-8b-instant",
+        "model": GROQ_MODELO,
         "messages": [
             {"role": "system", "content": mensagem_sistema},
             {"role": "user", "content": mensagem_user}
         ],
-        "temperature": 0.7,
+        "temperature": temperatura,
     }
+    if stream:
+        body["stream"] = True
+    return body
+
+
+def admitir_chamada(mensagem_user, mensagem_sistema, prioridade, prazo_total):
+    """Pede vaga ao controle de admissão, esperando no máximo o prazo da chamada."""
+    espera = min(ESPERA_MAXIMA[prioridade], prazo_total)
+    if controle_admissao.admitir(prioridade, estimar_tokens(mensagem_user, mensagem_sistema, prioridade), espera):
+        return True
+    print(f"🚨 Chamada à Groq ({prioridade}) recusada pelo controle de admissão: limite de carga atingido.")
+    return False
+
+
+def _chamar_groq_sem_cache(mensagem_user, mensagem_sistema, prazo, temperatura, prioridade='interativa'):
+    limite = time.monotonic() + (prazo or GROQ_PRAZO_TOTAL)
+    permissao = disjuntor_groq.permitir()
+    if permissao is None:
+        groq_chamadas.incrementar(modo='sync', status=STATUS_CIRCUITO_ABERTO)
+        return None, STATUS_CIRCUITO_ABERTO
+    if not admitir_chamada(mensagem_user, mensagem_sistema, prioridade, prazo or GROQ_PRAZO_TOTAL):
+        disjuntor_groq.registrar(permissao, None, 0)
+        groq_chamadas.incrementar(modo='sync', status=STATUS_RECUSADA)
+        return None, STATUS_RECUSADA
+
+    inicio = time.monotonic()
+    status = None
     try:
-        response = requests.post(GROQ_URL, headers=headers, json=body)
-        response.raise_for_status()
-        resposta = response.json()
-        return resposta['choices'][0]['message']['content'].strip(), 200
-    except requests.exceptions.RequestException as e:
-        print(f"❌ Erro ao chamar Groq API: {e}")
-        return None, 500
-
-def obter_perguntas_reservas(db, nivel: str, tema: str, limite: int):
+        conteudo, status = _enviar_para_groq(mensagem_user, mensagem_sistema, limite, temperatura)
+        return conteudo, status
+    finally:
+        controle_admissao.liberar()
+        disjuntor_groq.registrar(permissao, status, time.monotonic() - inicio)
+        registrar_chamada_groq('sync', status, time.monotonic() - inicio)
+
+
+def _enviar_para_groq(mensagem_user, mensagem_sistema, limite, temperatura):
+    """Envio síncrono (requests) com a política de TentativasGroq. Retorna (conteudo, status)."""
+    body = montar_corpo_groq(mensagem_user, mensagem_sistema, temperatura)
+    sessao = obter_sessao_groq()
+
+    tentativas = TentativasGroq(limite)
+    for _, restante in tentativas:
+        try:
+            response = sessao.post(GROQ_URL, json=body, timeout=tentativas.timeouts(restante))
+            if tentativas.aceitar(response.status_code):
+                response.raise_for_status()
+                resposta = response.json()
+                registrar_uso_groq(resposta)
+                return resposta['choices'][0]['message']['content'].strip(), 200
+            espera = tentativas.falhou(status=response.status_code, retry_after=response.headers.get("Retry-After"))
+        except Exception as e:
+            espera = tentativas.falhou(erro=e)
+        if espera is None:
+            break
+        time.sleep(espera)
+    return None, tentativas.status
+
+def chamar_groq_stream(mensagem_user, mensagem_sistema="", prazo=None, temperatura=0.7, prioridade='interativa'):
+    """
+    Versão em streaming de chamar_groq: é um gerador que devolve os trechos
+    de texto à medida que a Groq os produz. Novas tentativas só acontecem
+    antes do primeiro trecho; se a chamada falhar (ou for recusada pelo
+    controle de admissão ou pelo circuito aberto), o gerador apenas termina.
+    """
+    limite = time.monotonic() + (prazo or GROQ_PRAZO_TOTAL)
+    permissao = disjuntor_groq.permitir()
+    if permissao is None:
+        print("🚨 Circuito da IA aberto: stream não iniciado.")
+        groq_chamadas.incrementar(modo='stream', status=STATUS_CIRCUITO_ABERTO)
+        return
+    if not admitir_chamada(mensagem_user, mensagem_sistema, prioridade, prazo or GROQ_PRAZO_TOTAL):
+        disjuntor_groq.registrar(permissao, None, 0)
+        groq_chamadas.incrementar(modo='stream', status=STATUS_RECUSADA)
+        return
+
+    # Para o circuito, o stream deu certo se chegou ao menos um trecho (latência até o primeiro)
+    inicio = time.monotonic()
+    latencia = None
+    status = 503
+    try:
+        for trecho in _stream_da_groq(mensagem_user, mensagem_sistema, limite, temperatura):
+            if latencia is None:
+                latencia, status = time.monotonic() - inicio, 200
+            yield trecho
+    except GeneratorExit:
+        # Cliente desconectou antes do primeiro trecho: não conta para o circuito
+        if latencia is None:
+            status = None
+        raise
+    finally:
+        # A vaga fica ocupada até o fim do stream (ou até o cliente desconectar)
+        controle_admissao.liberar()
+        disjuntor_groq.registrar(permissao, status, latencia if latencia is not None else time.monotonic() - inicio)
+        registrar_chamada_groq('stream', status, time.monotonic() - inicio)
+
+
+def _stream_da_groq(mensagem_user, mensagem_sistema, limite, temperatura):
+    import requests
+
+    body = montar_corpo_groq(mensagem_user, mensagem_sistema, temperatura, stream=True)
+    sessao = obter_sessao_groq()
+
+    response = None
+    tentativas = TentativasGroq(limite, 'stream')
+    for _, restante in tentativas:
+        try:
+            response = sessao.post(GROQ_URL, json=body, stream=True, timeout=tentativas.timeouts(restante))
+            if tentativas.aceitar(response.status_code):
+                response.raise_for_status()
+                break
+            espera = tentativas.falhou(status=response.status_code, retry_after=response.headers.get("Retry-After"))
+        except Exception as e:
+            espera = tentativas.falhou(erro=e)
+        if response is not None:
+            response.close()
+            response = None
+        if espera is None:
+            break
+        time.sleep(espera)
+
+    if response is None:
+        return
+
+    # Eventos SSE da Groq: linhas "data: {...}" e, no final, "data: [DONE]"
+    try:
+        with response:
+            for linha in response.iter_lines(decode_unicode=True):
+                if time.monotonic() > limite:
+                    print("⚠️ Prazo total da Groq (stream) esgotado.")
+                    return
+                if not linha or not linha.startswith("data:"):
+                    continue
+                dados = linha[len("data:"):].strip()
+                if dados == "[DONE]":
+                    return
+                evento = json.loads(dados)
+                registrar_uso_groq(evento)
+                if not evento.get('choices'):
+                    continue
+                trecho = evento['choices'][0].get('delta', {}).get('content')
+                if trecho:
+                    yield trecho
+    except (requests.exceptions.RequestException, ValueError, KeyError, IndexError) as e:
+        print(f"❌ Erro durante o streaming da Groq: {e}")
+
+def obter_perguntas_reservas(db, nivel: str, tema: str, limite: int, evitar=None):
     """
     Busca perguntas de reserva no Firebase (coleção 'perguntas_reservas')
     filtrando por nível e tema como plano de contingência.
+    As perguntas vêm do cache local (utils.cache_reservas), que só consulta
+    o Firestore quando a partição nível/tema está vencida. `evitar` é um
+    conjunto de impressões (utils.impressao_perguntas) a não repetir.
     """
     if not db:
         print("❌ Firebase DB não está conectado. Não foi possível buscar reservas.")
         return []
 
     try:
-        perguntas_ref = db.collection('perguntas_reserva')
-        # Filtra por NÍVEL e TEMA
-        query = perguntas_ref.where('nivel', '==', nivel).where('tema', '==', tema).stream()
-
-        perguntas_filtradas = []
-        for doc in query:
-            pergunta_data = doc.to_dict()
-            # Tenta converter o ID (nome do documento) para int, senão mantém como string
-            try:
-                pergunta_data['id'] = int(doc.id)
-            except ValueError:
-                pergunta_data['id'] = doc.id
-
-            perguntas_filtradas.append(pergunta_data)
-
-        # Seleciona aleatoriamente se houver mais do que o limite solicitado
-        if len(perguntas_filtradas) > limite:
-            perguntas_selecionadas = random.sample(perguntas_filtradas, limite)
-        else:
-            perguntas_selecionadas = perguntas_filtradas
-
+        perguntas_selecionadas = cache_reservas.sortear(db, nivel, tema, limite, evitar)
         print(f"✅ Perguntas de reserva obtidas do Firebase: {len(perguntas_selecionadas)} perguntas.")
         return perguntas_selecionadas
 
     except Exception as e:
         print(f"❌ Erro ao buscar perguntas de reserva no Firebase: {e}")
-        return []
\ No newline at end of file
+        return []
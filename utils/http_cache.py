@@ -0,0 +1,38 @@
+# utils/http_cache.py
+
+import hashlib
+import re
+from flask import request, jsonify, make_response
+
+CAMPO_VALIDO = re.compile(r'^[A-Za-z0-9_]+$')
+
+
+def campos_solicitados():
+    """
+    Lê o parâmetro ?campos=a,b,c da requisição.
+    Retorna a lista de campos (None se o parâmetro não foi enviado)
+    ou lança ValueError se algum nome de campo for inválido.
+    """
+    parametro = request.args.get('campos')
+    if parametro is None:
+        return None
+    campos = [campo.strip() for campo in parametro.split(',') if campo.strip()]
+    invalidos = [campo for campo in campos if not CAMPO_VALIDO.match(campo)]
+    if invalidos or not campos:
+        raise ValueError(f"Campos inválidos: {', '.join(invalidos) or parametro}")
+    return campos
+
+
+def etag_do_documento(doc, *partes):
+    """ETag derivado do ID e do horário da última alteração do documento no Firestore."""
+    atualizado_em = doc.update_time.isoformat() if getattr(doc, 'update_time', None) else ''
+    base = ':'.join([doc.id, atualizado_em, *map(str, partes)])
+    return hashlib.sha1(base.encode('utf-8')).hexdigest()
+
+
+def responder_com_etag(dados, etag, status=200):
+    """Responde em JSON com ETag; devolve 304 se o cliente já tem essa versão (If-None-Match)."""
+    resposta = make_response(jsonify(dados), status)
+    resposta.set_etag(etag)
+    resposta.headers['Cache-Control'] = 'private, no-cache'
+    return resposta.make_conditional(request)
@@ -0,0 +1,13 @@
+# utils/identidade.py
+
+from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+
+
+def aluno_atual():
+    """Identidade (email) do aluno se a requisição trouxer um token válido; senão None."""
+    try:
+        verify_jwt_in_request(optional=True)
+        return get_jwt_identity()
+    except Exception:
+        # Token inválido ou vencido: a rota continua pública, só sem histórico do aluno
+        return None
@@ -0,0 +1,136 @@
+# utils/impressao_perguntas.py
+
+import hashlib
+import os
+import random
+import re
+import threading
+import unicodedata
+from collections import deque
+from utils.cache_lru import CacheLRU
+
+# Perguntas com similaridade estimada (Jaccard) a partir deste valor são consideradas repetidas
+LIMIAR_SIMILARIDADE = float(os.getenv("LIMIAR_SIMILARIDADE_PERGUNTAS", "0.6"))
+VISTAS_RECENTES_MAX = int(os.getenv("VISTAS_RECENTES_MAX", "60"))
+VISTAS_RECENTES_TTL = float(os.getenv("VISTAS_RECENTES_TTL", str(7 * 24 * 3600)))
+VISTAS_RECENTES_ALUNOS = int(os.getenv("VISTAS_RECENTES_ALUNOS", "10000"))
+
+# 🔹 Parâmetros do MinHash: 64 permutações em 16 faixas de 4 linhas (LSH)
+NUM_PERMUTACOES = 64
+LINHAS_POR_FAIXA = 4
+_PRIMO = (1 << 61) - 1
+_sorteio = random.Random(20240521)  # semente fixa: a mesma assinatura em todos os processos
+_PERMUTACOES = [(_sorteio.randrange(1, _PRIMO), _sorteio.randrange(0, _PRIMO)) for _ in range(NUM_PERMUTACOES)]
+
+
+def normalizar_texto(texto):
+    """Minúsculas, sem acentos e sem pontuação, com espaços simples."""
+    texto = unicodedata.normalize('NFKD', str(texto or '')).encode('ascii', 'ignore').decode('ascii')
+    return ' '.join(re.sub(r'[^a-z0-9 ]', ' ', texto.lower()).split())
+
+
+def impressao(pergunta):
+    """Impressão digital exata da questão (hash do enunciado normalizado)."""
+    return hashlib.sha1(normalizar_texto(pergunta.get('pergunta')).encode('utf-8')).hexdigest()
+
+
+def _trechos(pergunta):
+    """Trechos de 3 palavras do enunciado e das alternativas."""
+    alternativas = pergunta.get('alternativas') or {}
+    texto = ' '.join([str(pergunta.get('pergunta', ''))] + [str(alternativas[letra]) for letra in sorted(alternativas)])
+    palavras = normalizar_texto(texto).split()
+    if len(palavras) < 3:
+        return {' '.join(palavras)}
+    return {' '.join(palavras[i:i + 3]) for i in range(len(palavras) - 2)}
+
+
+def assinatura(pergunta):
+    """Assinatura MinHash da questão (tupla de NUM_PERMUTACOES inteiros)."""
+    valores = [int.from_bytes(hashlib.blake2b(trecho.encode('utf-8'), digest_size=8).digest(), 'big')
+               for trecho in _trechos(pergunta)]
+    return tuple(min((a * valor + b) % _PRIMO for valor in valores) for a, b in _PERMUTACOES)
+
+
+def similaridade(assinatura_a, assinatura_b):
+    """Estimativa da similaridade de Jaccard entre duas questões."""
+    iguais = sum(1 for x, y in zip(assinatura_a, assinatura_b) if x == y)
+    return iguais / NUM_PERMUTACOES
+
+
+class IndiceSimilaridade:
+    """
+    Conjunto de assinaturas com busca de quase-repetidas por LSH: só as
+    assinaturas que coincidem em alguma faixa são comparadas, então a busca
+    não cresce com o tamanho do banco. Não é seguro para várias threads;
+    quem compartilha o índice deve protegê-lo com um lock.
+    """
+
+    def __init__(self, limiar=LIMIAR_SIMILARIDADE):
+        self.limiar = limiar
+        self._faixas = {}  # (faixa, valores) -> lista de assinaturas
+
+    def _chaves(self, assinatura_pergunta):
+        for inicio in range(0, NUM_PERMUTACOES, LINHAS_POR_FAIXA):
+            yield inicio, assinatura_pergunta[inicio:inicio + LINHAS_POR_FAIXA]
+
+    def similar(self, assinatura_pergunta):
+        """True se já existe no índice uma questão quase igual."""
+        for chave in self._chaves(assinatura_pergunta):
+            for candidata in self._faixas.get(chave, ()):
+                if similaridade(assinatura_pergunta, candidata) >= self.limiar:
+                    return True
+        return False
+
+    def adicionar(self, assinatura_pergunta):
+        for chave in self._chaves(assinatura_pergunta):
+            self._faixas.setdefault(chave, []).append(assinatura_pergunta)
+
+    def adicionar_se_inedita(self, assinatura_pergunta):
+        """Adiciona a assinatura se não houver quase-repetida. Retorna se foi adicionada."""
+        if self.similar(assinatura_pergunta):
+            return False
+        self.adicionar(assinatura_pergunta)
+        return True
+
+
+def filtrar_distintas(perguntas, existentes=(), limiar=LIMIAR_SIMILARIDADE):
+    """
+    Remove de `perguntas` as quase-repetidas entre si e as parecidas com
+    alguma de `existentes`, mantendo a ordem original.
+    """
+    indice = IndiceSimilaridade(limiar)
+    for pergunta in existentes:
+        indice.adicionar(assinatura(pergunta))
+    return [pergunta for pergunta in perguntas if indice.adicionar_se_inedita(assinatura(pergunta))]
+
+
+class VistasRecentemente:
+    """
+    Impressões das últimas questões entregues a cada aluno, para não repetir
+    a mesma questão em quizzes seguidos. Fica em memória (LRU por aluno).
+    """
+
+    def __init__(self, max_por_aluno=VISTAS_RECENTES_MAX, ttl=VISTAS_RECENTES_TTL, max_alunos=VISTAS_RECENTES_ALUNOS):
+        self.max_por_aluno = max_por_aluno
+        self._alunos = CacheLRU(max_alunos, ttl)
+        self._lock = threading.Lock()
+
+    def obter(self, aluno):
+        """Conjunto de impressões vistas recentemente pelo aluno (vazio se anônimo)."""
+        if not aluno:
+            return set()
+        with self._lock:
+            return set(self._alunos.obter(aluno, ()))
+
+    def registrar(self, aluno, perguntas):
+        if not aluno or not perguntas:
+            return
+        with self._lock:
+            vistas = self._alunos.obter(aluno)
+            if vistas is None:
+                vistas = deque(maxlen=self.max_por_aluno)
+            vistas.extend(impressao(pergunta) for pergunta in perguntas)
+            self._alunos.definir(aluno, vistas)
+
+
+vistas_recentes = VistasRecentemente()
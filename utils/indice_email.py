@@ -0,0 +1,73 @@
+# utils/indice_email.py
+
+import os
+from utils.cache_lru import CacheLRU
+
+INDICE_EMAIL_MAX_ITENS = int(os.getenv("INDICE_EMAIL_MAX_ITENS", "10000"))
+
+
+class IndiceEmail:
+    """
+    Índice local email -> ID do documento em 'alunos'.
+
+    Com o ID em cache, /login e /perfil fazem uma leitura direta do documento
+    em vez de uma consulta na coleção. O e-mail do documento lido é sempre
+    conferido, então um índice desatualizado (ex.: e-mail alterado por outro
+    processo) só custa uma consulta extra, nunca devolve o aluno errado.
+    """
+
+    def __init__(self, max_itens=INDICE_EMAIL_MAX_ITENS):
+        self._cache = CacheLRU(max_itens)
+
+    def buscar_aluno(self, db, email, campos=None):
+        """
+        Retorna o DocumentSnapshot do aluno com esse e-mail (ou None).
+        Se `campos` for informado, só esses campos (e o e-mail) são lidos.
+        """
+        field_paths = sorted(set(campos) | {'email'}) if campos else None
+
+        aluno_id = self._cache.obter(email)
+        if aluno_id is not None:
+            aluno_doc = db.collection('alunos').document(aluno_id).get(field_paths=field_paths)
+            if aluno_doc.exists and (aluno_doc.to_dict() or {}).get('email') == email:
+                return aluno_doc
+            self._cache.remover(email)
+
+        busca = db.collection('alunos').where('email', '==', email).limit(1)
+        if field_paths:
+            busca = busca.select(field_paths)
+        aluno_doc = next(busca.stream(), None)
+        if aluno_doc is not None:
+            self._cache.definir(email, aluno_doc.id)
+        return aluno_doc
+
+    def autenticar(self, db, email, senha):
+        """
+        Retorna o DocumentSnapshot do aluno com esse e-mail e senha (ou None).
+        O e-mail não é único na coleção (cadastros em lote e trocas de e-mail
+        podem repeti-lo), então o documento do índice só vale se a senha
+        conferir; senão a consulta filtra por e-mail e senha, como o login
+        sempre fez, e o índice passa a apontar para o documento encontrado.
+        """
+        aluno_id = self._cache.obter(email)
+        if aluno_id is not None:
+            aluno_doc = db.collection('alunos').document(aluno_id).get()
+            aluno_data = (aluno_doc.to_dict() or {}) if aluno_doc.exists else {}
+            if aluno_data.get('email') == email and aluno_data.get('senha') == senha:
+                return aluno_doc
+
+        busca = db.collection('alunos').where('email', '==', email).where('senha', '==', senha).limit(1)
+        aluno_doc = next(busca.stream(), None)
+        if aluno_doc is not None:
+            self._cache.definir(email, aluno_doc.id)
+        return aluno_doc
+
+    def invalidar_email(self, email):
+        self._cache.remover(email)
+
+    def invalidar_aluno(self, aluno_id):
+        """Remove do índice as entradas que apontam para esse aluno."""
+        self._cache.remover_se(lambda email, doc_id: doc_id == str(aluno_id))
+
+
+indice_email = IndiceEmail()
@@ -0,0 +1,103 @@
+# utils/inicializacao.py
+
+import functools
+import json
+import os
+import threading
+import time
+from flask import current_app
+from utils.firestore_contado import contar_operacoes
+
+FIREBASE_INTERVALO_RECONEXAO = float(os.getenv("FIREBASE_INTERVALO_RECONEXAO", "5"))
+
+_lock = threading.Lock()
+_proxima_tentativa = 0.0  # time.monotonic() a partir do qual uma conexão que falhou pode ser refeita
+tempos_inicializacao = {}  # etapa -> segundos
+
+
+def registrar_etapa(etapa, segundos):
+    tempos_inicializacao[etapa] = segundos
+
+
+def relatorio_inicializacao():
+    etapas = ', '.join(f"{etapa} {segundos * 1000:.0f}ms" for etapa, segundos in tempos_inicializacao.items())
+    return f"⏱️ Tempo de inicialização: {etapas}."
+
+
+def conectar_firestore():
+    """
+    Inicializa o firebase_admin com a CONFIG_FIREBASE do .env e retorna o
+    cliente do Firestore (ou None se não houver configuração ou der erro).
+    As bibliotecas do Firebase (gRPC, protobuf) só são importadas aqui.
+    """
+    inicio = time.perf_counter()
+    try:
+        firebase_config = os.getenv('CONFIG_FIREBASE')
+        if not firebase_config:
+            print("⚠️ CONFIG_FIREBASE não encontrado no .env. Firebase não conectado.")
+            return None
+
+        import firebase_admin
+        from firebase_admin import credentials, firestore
+
+        FBKEY = json.loads(firebase_config)
+        cred = credentials.Certificate(FBKEY)
+
+        # Inicializa apenas se não estiver inicializado
+        if not firebase_admin._apps:
+            firebase_admin.initialize_app(cred)
+
+        # Envolto para que toda leitura e escrita entre nas métricas (utils.firestore_contado)
+        db = contar_operacoes(firestore.client())
+        print("✅ Conectado ao Firebase com sucesso!")
+        return db
+    except Exception as e:
+        print(f"❌ Erro ao conectar ao Firebase: {e}")
+        return None
+    finally:
+        registrar_etapa('firestore', time.perf_counter() - inicio)
+
+
+def obter_db():
+    """
+    Cliente do Firestore do app atual. Na inicialização adiada, a conexão é
+    feita (uma única vez, mesmo com requisições simultâneas) na primeira
+    chamada; rotas que não usam o banco nunca pagam esse custo.
+
+    Uma falha na conexão não fica guardada: a requisição recebe None e uma
+    próxima tenta de novo, no máximo a cada FIREBASE_INTERVALO_RECONEXAO
+    segundos (para um Firebase fora do ar não atrasar todas as requisições).
+    """
+    global _proxima_tentativa
+    config = current_app.config
+    db = config.get('DB')
+    if db is not None:
+        return db
+    with _lock:
+        db = config.get('DB')
+        if db is None and time.monotonic() >= _proxima_tentativa:
+            db = conectar_firestore()
+            if db is not None:
+                config['DB'] = db
+                print(relatorio_inicializacao())
+            else:
+                _proxima_tentativa = time.monotonic() + FIREBASE_INTERVALO_RECONEXAO
+    return db
+
+
+def transacional(funcao):
+    """
+    Equivalente a @firestore.transactional, mas o firebase_admin só é
+    importado na primeira execução (e não na importação do módulo).
+    """
+    envolvida = None
+
+    @functools.wraps(funcao)
+    def executar(transaction, *args, **kwargs):
+        nonlocal envolvida
+        if envolvida is None:
+            from firebase_admin import firestore
+            envolvida = firestore.transactional(funcao)
+        return envolvida(transaction, *args, **kwargs)
+
+    return executar
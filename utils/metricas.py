@@ -0,0 +1,267 @@
+# utils/metricas.py
+
+import bisect
+import threading
+import time
+from flask import g, has_request_context, request
+
+# Limites (em segundos) dos histogramas de latência
+LIMITES_HTTP = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+LIMITES_GROQ = (0.25, 0.5, 1, 2, 4, 8, 15, 30, 60)
+LIMITES_OPERACOES = (0, 1, 2, 5, 10, 25, 50, 100, 500)
+
+TIPO_CONTEUDO_PROMETHEUS = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _formatar_rotulos(nomes, valores, extra=None):
+    pares = [f'{nome}="{_escapar(valor)}"' for nome, valor in zip(nomes, valores)]
+    if extra:
+        pares.append(f'{extra[0]}="{extra[1]}"')
+    return '{' + ','.join(pares) + '}' if pares else ''
+
+
+def _formatar_numero(valor):
+    if valor == float('inf'):
+        return '+Inf'
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+class _Metrica:
+    tipo = None
+
+    def __init__(self, nome, ajuda, rotulos=()):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self._valores = {}  # tupla com os valores dos rótulos -> valor (ou estado do histograma)
+        self._lock = threading.Lock()
+
+    def _chave(self, rotulos):
+        return tuple(str(rotulos.get(nome, '')) for nome in self.rotulos)
+
+    def cabecalho(self):
+        return [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} {self.tipo}"]
+
+
+class Contador(_Metrica):
+    """Contador que só cresce (ex.: total de chamadas), separado por rótulos."""
+    tipo = 'counter'
+
+    def incrementar(self, quantidade=1, **rotulos):
+        chave = self._chave(rotulos)
+        with self._lock:
+            self._valores[chave] = self._valores.get(chave, 0) + quantidade
+
+    def valor(self, **rotulos):
+        with self._lock:
+            return self._valores.get(self._chave(rotulos), 0)
+
+    def exportar(self):
+        with self._lock:
+            valores = sorted(self._valores.items())
+        return self.cabecalho() + [
+            f"{self.nome}{_formatar_rotulos(self.rotulos, chave)} {_formatar_numero(valor)}"
+            for chave, valor in valores
+        ]
+
+
+class Histograma(_Metrica):
+    """Distribuição de valores (ex.: latências) em faixas cumulativas, no formato do Prometheus."""
+    tipo = 'histogram'
+
+    def __init__(self, nome, ajuda, rotulos=(), limites=LIMITES_HTTP):
+        super().__init__(nome, ajuda, rotulos)
+        self.limites = tuple(sorted(limites))
+
+    def observar(self, valor, **rotulos):
+        chave = self._chave(rotulos)
+        indice = bisect.bisect_left(self.limites, valor)
+        with self._lock:
+            estado = self._valores.get(chave)
+            if estado is None:
+                # [contagem por faixa (a última é +Inf), soma, total]
+                estado = self._valores[chave] = [[0] * (len(self.limites) + 1), 0.0, 0]
+            estado[0][indice] += 1
+            estado[1] += valor
+            estado[2] += 1
+
+    def exportar(self):
+        with self._lock:
+            valores = sorted((chave, [list(estado[0]), estado[1], estado[2]]) for chave, estado in self._valores.items())
+        linhas = self.cabecalho()
+        for chave, (faixas, soma, total) in valores:
+            acumulado = 0
+            for limite, quantidade in zip(self.limites + (float('inf'),), faixas):
+                acumulado += quantidade
+                rotulos = _formatar_rotulos(self.rotulos, chave, ('le', _formatar_numero(limite)))
+                linhas.append(f"{self.nome}_bucket{rotulos} {acumulado}")
+            linhas.append(f"{self.nome}_sum{_formatar_rotulos(self.rotulos, chave)} {_formatar_numero(soma)}")
+            linhas.append(f"{self.nome}_count{_formatar_rotulos(self.rotulos, chave)} {total}")
+        return linhas
+
+
+class Medidor(_Metrica):
+    """
+    Valor instantâneo lido na hora da exportação (ex.: tamanho de uma fila).
+    `funcao` devolve um número ou um dicionário {tupla de rótulos: número}.
+    """
+    tipo = 'gauge'
+
+    def __init__(self, nome, ajuda, funcao, rotulos=()):
+        super().__init__(nome, ajuda, rotulos)
+        self._funcao = funcao
+
+    def exportar(self):
+        try:
+            valores = self._funcao()
+        except Exception as e:
+            print(f"⚠️ Erro ao ler a métrica {self.nome}: {e}")
+            return []
+        if not isinstance(valores, dict):
+            valores = {(): valores}
+        return self.cabecalho() + [
+            f"{self.nome}{_formatar_rotulos(self.rotulos, chave)} {_formatar_numero(valor)}"
+            for chave, valor in sorted(valores.items()) if valor is not None
+        ]
+
+
+class RegistroMetricas:
+    """Todas as métricas do processo, exportadas juntas em GET /metrics."""
+
+    def __init__(self):
+        self._metricas = {}
+        self._lock = threading.Lock()
+
+    def _registrar(self, metrica):
+        with self._lock:
+            return self._metricas.setdefault(metrica.nome, metrica)
+
+    def contador(self, nome, ajuda, rotulos=()):
+        return self._registrar(Contador(nome, ajuda, rotulos))
+
+    def histograma(self, nome, ajuda, rotulos=(), limites=LIMITES_HTTP):
+        return self._registrar(Histograma(nome, ajuda, rotulos, limites))
+
+    def medidor(self, nome, ajuda, funcao, rotulos=()):
+        return self._registrar(Medidor(nome, ajuda, funcao, rotulos))
+
+    def exportar(self):
+        """Texto no formato de exposição do Prometheus."""
+        with self._lock:
+            metricas = list(self._metricas.values())
+        linhas = []
+        for metrica in metricas:
+            linhas.extend(metrica.exportar())
+        return '\n'.join(linhas) + '\n'
+
+
+registro_metricas = RegistroMetricas()
+
+# ======================================================================
+# 🔹 Métricas do caminho crítico
+# ======================================================================
+http_requisicoes = registro_metricas.contador(
+    'http_requisicoes_total', 'Requisições HTTP atendidas.', ('rota', 'metodo', 'status'))
+http_duracao = registro_metricas.histograma(
+    'http_duracao_segundos', 'Tempo de resposta por rota (até o início do corpo, no caso de streams).',
+    ('rota', 'metodo'))
+
+groq_chamadas = registro_metricas.contador(
+    'groq_chamadas_total', 'Chamadas à Groq por modo (sync, async, stream) e status final.', ('modo', 'status'))
+groq_duracao = registro_metricas.histograma(
+    'groq_duracao_segundos', 'Duração das chamadas à Groq (com as novas tentativas).', ('modo',), LIMITES_GROQ)
+groq_tokens = registro_metricas.contador(
+    'groq_tokens_total', "Tokens consumidos na Groq (campo 'usage' da resposta).", ('tipo',))
+
+firestore_operacoes = registro_metricas.contador(
+    'firestore_operacoes_total', 'Documentos lidos e escritos no Firestore.', ('operacao',))
+firestore_por_requisicao = registro_metricas.histograma(
+    'firestore_operacoes_por_requisicao', 'Documentos lidos/escritos no Firestore em cada requisição.',
+    ('rota', 'operacao'), LIMITES_OPERACOES)
+
+perguntas_contingencia = registro_metricas.contador(
+    'perguntas_contingencia_total', 'Vezes em que /vialactea/perguntas usou o banco de reservas, por motivo.',
+    ('motivo',))
+ia_json_interpretacoes = registro_metricas.contador(
+    'ia_json_interpretacoes_total', 'Respostas da IA interpretadas como JSON, por origem e resultado.',
+    ('origem', 'resultado'))
+
+
+def contar_firestore(operacao, quantidade=1):
+    """
+    Registra `quantidade` documentos lidos ('leitura') ou escritos ('escrita').
+    Dentro de uma requisição, também soma no total da requisição. Chamado pelo
+    cliente envolto de utils.firestore_contado, não pelas rotas.
+    """
+    if not quantidade:
+        return
+    firestore_operacoes.incrementar(quantidade, operacao=operacao)
+    if has_request_context():
+        operacoes = g.setdefault('_firestore_operacoes', {})
+        operacoes[operacao] = operacoes.get(operacao, 0) + quantidade
+
+
+def registrar_uso_groq(resposta):
+    """Soma os tokens do campo 'usage' de uma resposta (ou do último evento de um stream) da Groq."""
+    if not isinstance(resposta, dict):
+        return
+    # No streaming, a Groq manda o uso no último evento, em 'x_groq'
+    uso = resposta.get('usage') or (resposta.get('x_groq') or {}).get('usage')
+    if not isinstance(uso, dict):
+        return
+    for tipo in ('prompt', 'completion'):
+        quantidade = uso.get(f'{tipo}_tokens')
+        if isinstance(quantidade, (int, float)) and quantidade > 0:
+            groq_tokens.incrementar(quantidade, tipo=tipo)
+
+
+def registrar_chamada_groq(modo, status, duracao):
+    groq_chamadas.incrementar(modo=modo, status=status if status is not None else 'cancelada')
+    groq_duracao.observar(duracao, modo=modo)
+
+
+def registrar_interpretacao(origem, sucesso):
+    ia_json_interpretacoes.incrementar(origem=origem, resultado='ok' if sucesso else 'falha')
+
+
+# ======================================================================
+# 🔹 Instrumentação das requisições
+# ======================================================================
+def _rota_atual():
+    # O molde da rota (ex.: /progresso/<usuario_id>/<jogo>) mantém poucas séries por métrica
+    return request.url_rule.rule if request.url_rule is not None else 'desconhecida'
+
+
+def _finalizar_requisicao(status):
+    inicio = g.pop('_metricas_inicio', None)
+    if inicio is None:
+        return
+    rota, metodo = _rota_atual(), request.method
+    http_requisicoes.incrementar(rota=rota, metodo=metodo, status=status)
+    http_duracao.observar(time.perf_counter() - inicio, rota=rota, metodo=metodo)
+    operacoes = g.pop('_firestore_operacoes', {})
+    for operacao in ('leitura', 'escrita'):
+        firestore_por_requisicao.observar(operacoes.get(operacao, 0), rota=rota, operacao=operacao)
+
+
+def instrumentar(app):
+    """Mede a latência, o status e as operações no Firestore de cada requisição do app."""
+
+    @app.before_request
+    def _iniciar_medicao():
+        g._metricas_inicio = time.perf_counter()
+
+    @app.after_request
+    def _medir_resposta(response):
+        _finalizar_requisicao(response.status_code)
+        return response
+
+    @app.teardown_request
+    def _medir_erro(erro):
+        # Só chega aqui com a medição aberta se a view lançou uma exceção não tratada
+        if erro is not None:
+            _finalizar_requisicao(500)
@@ -0,0 +1,132 @@
+# utils/pool_perguntas.py
+
+import os
+import threading
+import time
+from collections import deque
+from utils.extrator_json import validar_pergunta
+from utils.impressao_perguntas import IndiceSimilaridade, impressao, assinatura
+
+# Na Vercel (serverless) a thread de reposição fica congelada entre as invocações: desligado por padrão
+POOL_PERGUNTAS_ATIVO = os.getenv("POOL_PERGUNTAS_ATIVO", "0" if os.getenv("VERCEL") else "1") == "1"
+POOL_PERGUNTAS_ALVO = int(os.getenv("POOL_PERGUNTAS_ALVO", "36"))
+POOL_PERGUNTAS_MINIMO = int(os.getenv("POOL_PERGUNTAS_MINIMO", "12"))
+POOL_PERGUNTAS_INTERVALO = float(os.getenv("POOL_PERGUNTAS_INTERVALO", "5"))
+
+
+class PoolPerguntas:
+    """
+    Estoque de perguntas já geradas, separado por (nivel, tema).
+
+    As rotas retiram perguntas prontas com retirar(). Uma thread em segundo
+    plano repõe as filas que ficaram abaixo do mínimo, chamando o gerador
+    (nivel, tema) -> lista de perguntas. Só são repostas as chaves que já
+    foram pedidas ao menos uma vez, para não gastar cota da IA à toa.
+    Cada fila guarda (pergunta, impressão, assinatura MinHash), para recusar
+    quase-repetidas na entrada e pular as que o aluno já viu na saída.
+    """
+
+    def __init__(self, gerador, chaves, tamanho_alvo=POOL_PERGUNTAS_ALVO,
+                 minimo=POOL_PERGUNTAS_MINIMO, intervalo=POOL_PERGUNTAS_INTERVALO):
+        self._gerador = gerador
+        self._filas = {chave: deque() for chave in chaves}
+        self._chaves_ativas = set()
+        self.tamanho_alvo = tamanho_alvo
+        self.minimo = minimo
+        self.intervalo = intervalo
+        self._lock = threading.Lock()
+        self._acordar = threading.Event()
+        self._worker = None
+
+    def iniciar(self):
+        """Inicia a thread de reposição (uma única vez por processo)."""
+        if not POOL_PERGUNTAS_ATIVO or self._worker is not None:
+            return
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._executar, name="pool-perguntas", daemon=True)
+                self._worker.start()
+
+    def retirar(self, nivel, tema, quantidade, evitar=None):
+        """
+        Retira `quantidade` perguntas da fila (nivel, tema), pulando as
+        impressões em `evitar` (vistas recentemente pelo aluno).
+        Retorna None se não houver perguntas suficientes; nesse caso a
+        rota deve gerar as perguntas na hora.
+        """
+        evitar = evitar or set()
+        chave = (nivel, tema)
+        if chave not in self._filas:
+            return None
+
+        self.iniciar()
+        with self._lock:
+            self._chaves_ativas.add(chave)
+            fila = self._filas[chave]
+            escolhidas = [item for item in fila if item[1] not in evitar][:quantidade]
+            if len(escolhidas) < quantidade:
+                self._acordar.set()
+                return None
+
+            retiradas = {id(item) for item in escolhidas}
+            self._filas[chave] = fila = deque(item for item in fila if id(item) not in retiradas)
+            if len(fila) < self.minimo:
+                self._acordar.set()
+
+        # Renumera as perguntas para o quiz atual
+        return [dict(pergunta, id=i + 1) for i, (pergunta, _, _) in enumerate(escolhidas)]
+
+    def admitir(self, nivel, tema, perguntas):
+        """
+        Valida e adiciona perguntas à fila, sem passar do tamanho alvo e
+        recusando as quase iguais a alguma que já está na fila.
+        """
+        chave = (nivel, tema)
+        if chave not in self._filas:
+            return 0
+
+        candidatas = [(p, impressao(p), assinatura(p)) for p in perguntas if validar_pergunta(p)]
+        with self._lock:
+            fila = self._filas[chave]
+            indice = IndiceSimilaridade()
+            for _, _, assinatura_existente in fila:
+                indice.adicionar(assinatura_existente)
+
+            admitidas = 0
+            for item in candidatas:
+                if len(fila) >= self.tamanho_alvo:
+                    break
+                if indice.adicionar_se_inedita(item[2]):
+                    fila.append(item)
+                    admitidas += 1
+        return admitidas
+
+    def estado(self):
+        """Quantidade de perguntas disponíveis por 'nivel/tema'."""
+        with self._lock:
+            return {f"{nivel}/{tema}": len(fila) for (nivel, tema), fila in self._filas.items()}
+
+    def _chaves_para_repor(self):
+        with self._lock:
+            pendentes = [chave for chave in self._chaves_ativas if len(self._filas[chave]) < self.minimo]
+            # As filas mais vazias são repostas primeiro
+            return sorted(pendentes, key=lambda chave: len(self._filas[chave]))
+
+    def _executar(self):
+        print("✅ Reposição do pool de perguntas iniciada.")
+        while True:
+            self._acordar.wait(self.intervalo)
+            self._acordar.clear()
+
+            for nivel, tema in self._chaves_para_repor():
+                while len(self._filas[(nivel, tema)]) < self.tamanho_alvo:
+                    try:
+                        perguntas = self._gerador(nivel, tema)
+                    except Exception as e:
+                        print(f"❌ Erro ao repor pool de perguntas ({nivel}/{tema}): {e}")
+                        perguntas = []
+
+                    if not self.admitir(nivel, tema, perguntas or []):
+                        # Gerador falhou ou só devolveu perguntas inválidas: tenta mais tarde
+                        time.sleep(self.intervalo)
+                        break
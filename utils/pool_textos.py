@@ -0,0 +1,226 @@
+# utils/pool_textos.py
+
+import hashlib
+import os
+import random
+import threading
+import time
+from collections import deque
+from utils.cache_lru import CacheLRU
+
+# Na Vercel (serverless) a thread de reposição fica congelada entre as invocações: desligado por padrão
+POOL_TEXTOS_ATIVO = os.getenv("POOL_TEXTOS_ATIVO", "0" if os.getenv("VERCEL") else "1") == "1"
+POOL_TEXTOS_ALVO = int(os.getenv("POOL_TEXTOS_ALVO", "30"))
+POOL_TEXTOS_USOS = int(os.getenv("POOL_TEXTOS_USOS", "50"))
+POOL_TEXTOS_INTERVALO = float(os.getenv("POOL_TEXTOS_INTERVALO", "5"))
+POOL_TEXTOS_VISTOS = int(os.getenv("POOL_TEXTOS_VISTOS", "20"))
+
+COLECAO_TEXTOS = 'textos_andromeda'
+
+
+def id_do_texto(texto):
+    """ID do texto no pool e no Firestore (hash do conteúdo)."""
+    return hashlib.sha1(texto.strip().encode('utf-8')).hexdigest()
+
+
+class PoolTextos:
+    """
+    Textos com erros já gerados para a Andrômeda, guardados no Firestore
+    (coleção 'textos_andromeda') e espelhados em memória.
+
+    retirar() entrega um texto em O(1) (sem chamar a IA), evitando os
+    últimos textos vistos pelo aluno. Cada texto é usado no máximo
+    `usos_maximos` vezes e depois sai do pool; uma thread em segundo plano
+    carrega o pool do Firestore e gera textos novos até `tamanho_alvo`.
+    Os usos são contados em memória (recomeçam quando o processo reinicia).
+
+    Os textos aposentados continuam na coleção (com ativo=False), porque
+    guardam o gabarito ('erros') usado na correção de quem já os recebeu.
+    """
+
+    def __init__(self, gerador, tamanho_alvo=POOL_TEXTOS_ALVO, usos_maximos=POOL_TEXTOS_USOS,
+                 intervalo=POOL_TEXTOS_INTERVALO, vistos_por_aluno=POOL_TEXTOS_VISTOS):
+        self._gerador = gerador  # () -> dict com 'texto' (ou None se falhar)
+        self.tamanho_alvo = tamanho_alvo
+        self.usos_maximos = usos_maximos
+        self.intervalo = intervalo
+        self.vistos_por_aluno = vistos_por_aluno
+        self._textos = []   # lista de dicts {'id', 'texto', ...}
+        self._posicao = {}  # id -> índice em self._textos (remoção em O(1))
+        self._usos = {}
+        self._vistos = CacheLRU(max_itens=10000)  # aluno -> deque de ids
+        self._gabaritos = CacheLRU(max_itens=2000)  # id -> texto (dict) lido do Firestore
+        self._db = None
+        self._lock = threading.Lock()
+        self._acordar = threading.Event()
+        self._worker = None
+
+    def iniciar(self, db):
+        """Inicia a thread que carrega e repõe o pool (uma única vez por processo)."""
+        if not db or self._worker is not None:
+            return
+        # Mesmo sem a thread, o banco é guardado para persistir os gabaritos dos textos gerados na hora
+        self._db = self._db or db
+        if not POOL_TEXTOS_ATIVO:
+            return
+        with self._lock:
+            if self._worker is None:
+                self._db = db
+                self._worker = threading.Thread(target=self._executar, name="pool-textos", daemon=True)
+                self._worker.start()
+
+    def retirar(self, db, aluno=None):
+        """Retorna um texto do pool (dict) que o aluno não viu recentemente, ou None."""
+        self.iniciar(db)
+        with self._lock:
+            if not self._textos:
+                self._acordar.set()
+                return None
+
+            vistos = self._vistos.obter(aluno) if aluno else None
+            # Sorteia um ponto de partida e pula os textos já vistos (no máximo len(vistos) passos)
+            inicio = random.randrange(len(self._textos))
+            escolhido = None
+            for passo in range(min(len(self._textos), (len(vistos) if vistos else 0) + 1)):
+                candidato = self._textos[(inicio + passo) % len(self._textos)]
+                if not vistos or candidato['id'] not in vistos:
+                    escolhido = candidato
+                    break
+            if escolhido is None:
+                # O aluno já viu todos: melhor gerar um texto novo na hora
+                self._acordar.set()
+                return None
+
+            self._marcar_visto(aluno, escolhido['id'], vistos)
+
+            self._usos[escolhido['id']] = self._usos.get(escolhido['id'], 0) + 1
+            if self._usos[escolhido['id']] >= self.usos_maximos:
+                self._remover(escolhido['id'])
+                self._acordar.set()
+            return dict(escolhido)
+
+    def _marcar_visto(self, aluno, id_texto, vistos=None):
+        if not aluno:
+            return
+        if vistos is None:
+            vistos = self._vistos.obter(aluno) or deque(maxlen=self.vistos_por_aluno)
+        vistos.append(id_texto)
+        self._vistos.definir(aluno, vistos)
+
+    def marcar_visto(self, aluno, id_texto):
+        """Registra que o aluno recebeu o texto (ex.: um texto gerado na hora)."""
+        with self._lock:
+            self._marcar_visto(aluno, id_texto)
+
+    def admitir(self, texto, persistir=True):
+        """
+        Adiciona um texto gerado ao pool (e ao Firestore). Retorna False se já
+        existia ou o pool está cheio. Com o pool cheio, o texto não entra na
+        rotação, mas o gabarito é guardado mesmo assim (ativo=False), porque
+        o aluno que o recebeu ainda vai enviar a correção.
+        """
+        if not texto or not texto.get('texto'):
+            return False
+        item = dict(texto, id=texto.get('id') or id_do_texto(texto['texto']))
+        with self._lock:
+            if item['id'] in self._posicao:
+                return False
+            cabe = len(self._textos) < self.tamanho_alvo
+            if cabe:
+                self._posicao[item['id']] = len(self._textos)
+                self._textos.append(item)
+        if not cabe:
+            self._gabaritos.definir(item['id'], item)
+
+        if persistir and self._db is not None:
+            dados = {chave: valor for chave, valor in item.items() if chave != 'id'}
+            dados['ativo'] = cabe
+            from firebase_admin import firestore
+            dados['criado_em'] = firestore.SERVER_TIMESTAMP
+            try:
+                self._db.collection(COLECAO_TEXTOS).document(item['id']).set(dados)
+            except Exception as e:
+                print(f"⚠️ Texto da Andrômeda não foi salvo no Firestore (fica só em memória): {e}")
+        return cabe
+
+    def _remover(self, id_texto):
+        """Tira o texto da lista em O(1) (troca com o último). Chamar com o lock."""
+        indice = self._posicao.pop(id_texto)
+        ultimo = self._textos.pop()
+        if ultimo['id'] != id_texto:
+            self._textos[indice] = ultimo
+            self._posicao[ultimo['id']] = indice
+        self._usos.pop(id_texto, None)
+
+        # O texto aposentado é marcado no Firestore em segundo plano
+        if self._db is not None:
+            threading.Thread(target=self._aposentar, args=(id_texto,), daemon=True).start()
+
+    def _aposentar(self, id_texto):
+        try:
+            self._db.collection(COLECAO_TEXTOS).document(id_texto).update({'ativo': False})
+        except Exception as e:
+            print(f"⚠️ Erro ao aposentar texto da Andrômeda ({id_texto}): {e}")
+
+    def obter_gabarito(self, db, texto=None, id_texto=None):
+        """
+        Texto (dict com 'texto' e, se houver, 'erros') com o `id_texto` entregue
+        ao aluno ou, sem ele, cujo conteúdo é `texto`: procura no pool, depois
+        no cache e por fim no Firestore. None se não achar.
+        """
+        id_texto = id_texto or id_do_texto(texto)
+        with self._lock:
+            indice = self._posicao.get(id_texto)
+            if indice is not None:
+                return dict(self._textos[indice])
+
+        gabarito = self._gabaritos.obter(id_texto)
+        if gabarito is not None or not db:
+            return gabarito
+        try:
+            doc = db.collection(COLECAO_TEXTOS).document(id_texto).get()
+        except Exception as e:
+            print(f"⚠️ Erro ao buscar gabarito da Andrômeda ({id_texto}): {e}")
+            return None
+        if not doc.exists:
+            return None
+        gabarito = dict(doc.to_dict(), id=id_texto)
+        gabarito.pop('criado_em', None)
+        gabarito.pop('ativo', None)
+        self._gabaritos.definir(id_texto, gabarito)
+        return gabarito
+
+    def _carregar(self):
+        """Carrega os textos salvos no Firestore (até o tamanho alvo)."""
+        try:
+            documentos = self._db.collection(COLECAO_TEXTOS).where('ativo', '==', True).limit(self.tamanho_alvo).stream()
+            carregados = 0
+            for doc in documentos:
+                dados = doc.to_dict() or {}
+                dados.pop('criado_em', None)
+                dados.pop('ativo', None)
+                carregados += self.admitir(dict(dados, id=doc.id), persistir=False)
+            print(f"✅ Pool de textos da Andrômeda carregado do Firestore: {carregados} textos.")
+        except Exception as e:
+            print(f"❌ Erro ao carregar textos da Andrômeda do Firestore: {e}")
+
+    def estado(self):
+        with self._lock:
+            return {"textos": len(self._textos), "tamanho_alvo": self.tamanho_alvo, "usos": sum(self._usos.values())}
+
+    def _executar(self):
+        self._carregar()
+        while True:
+            while len(self._textos) < self.tamanho_alvo:
+                try:
+                    texto = self._gerador()
+                except Exception as e:
+                    print(f"❌ Erro ao repor pool de textos da Andrômeda: {e}")
+                    texto = None
+                if not self.admitir(texto):
+                    # Gerador falhou (ou repetiu um texto): tenta mais tarde
+                    time.sleep(self.intervalo)
+                    break
+
+            self._acordar.wait(self.intervalo)
+            self._acordar.clear()
@@ -0,0 +1,40 @@
+# utils/registro_jogos.py
+
+from bisect import bisect_right
+from config_data import trilhas_de_atividades, metas_por_jogo
+
+
+class Jogo:
+    """
+    Dados pré-calculados de uma trilha: níveis ordenados, metas de pontuação,
+    nomes dos planetas e fases. Montado uma única vez na importação, para que
+    as rotas não precisem reordenar as metas a cada requisição.
+    """
+
+    def __init__(self, nome, metas, fases):
+        self.nome = nome
+        self.fases = fases
+        self.niveis = sorted(metas)
+        self.limiares = [metas[nivel]['meta'] for nivel in self.niveis]
+        self.planetas = {nivel: metas[nivel]['nome'] for nivel in self.niveis}
+        self.planeta_padrao = self.planetas[self.niveis[0]]
+
+    def nivel_para(self, pontuacao):
+        """Cada meta atingida avança um nível, até o último (busca binária)."""
+        metas_atingidas = bisect_right(self.limiares, pontuacao)
+        return self.niveis[min(metas_atingidas, len(self.niveis) - 1)]
+
+    def nome_planeta(self, nivel):
+        return self.planetas.get(nivel, self.planeta_padrao)
+
+
+REGISTRO_JOGOS = {
+    nome: Jogo(nome, metas_por_jogo[nome], fases)
+    for nome, fases in trilhas_de_atividades.items()
+    if nome in metas_por_jogo
+}
+
+
+def obter_jogo(nome):
+    """Retorna o Jogo registrado com esse nome (ou None)."""
+    return REGISTRO_JOGOS.get(nome)